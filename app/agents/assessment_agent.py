@@ -0,0 +1,90 @@
+#assessment_agent.py
+# Evaluation and decision in one LLM call (EVALUATION_MODE=merged). The
+# decision prompt only needs the evaluation plus state we already have, so
+# asking for both at once saves a round-trip and a prompt per turn.
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel
+
+from app.agents.decision_agent import DECISION_RULES, STATE_INPUTS
+from app.agents.evaluation_agent import ANSWER_INPUTS, EVALUATION_INSTRUCTIONS
+from app.services.evaluation_cache import (
+    EvaluationCache,
+    EvaluationCaches,
+    SemanticEvaluationCache,
+)
+from app.services.llm_service import cached_chain, get_chat_model
+from app.services.memory_service import memory_service
+from app.utils.cache import content_key
+
+
+class AssessmentOutput(BaseModel):
+    correctness_score: float
+    depth_level: str
+    follow_up_needed: bool
+    decision: str
+
+    def evaluation(self) -> dict:
+        # the knowledge_evaluation part, same shape as EvaluationOutput
+        return self.model_dump(exclude={"decision"})
+
+
+json_parser = PydanticOutputParser(pydantic_object=AssessmentOutput)
+
+# built from the evaluation and decision prompts' own sections, so the
+# merged prompt follows their edits
+template = """
+You are a strict technical evaluator and decision engine conducting a Level-0 interview.
+
+Your task:
+1. Evaluate the candidate's answer ONLY for technical quality.
+2. From that evaluation, decide the NEXT ACTION the interviewer should take.
+""" + EVALUATION_INSTRUCTIONS + DECISION_RULES + ANSWER_INPUTS + STATE_INPUTS + """
+{format_instructions}
+"""
+
+ASSESSMENT_PROMPT = PromptTemplate(
+    input_variables=[
+        "question",
+        "answer",
+        "confidence_score",
+        "emotion_state",
+        "topics_covered",
+        "interview_round",
+        "max_rounds"
+    ],
+    partial_variables={
+        "format_instructions": json_parser.get_format_instructions()
+    },
+    template=template
+)
+
+# merged-mode evaluations come from this prompt, not the evaluation one: they
+# are cached under its own version, apart from evaluation_agent's entries
+PROMPT_VERSION = "assessment-v1:" + content_key(template, json_parser.get_format_instructions())[:12]
+
+assessment_caches = EvaluationCaches(
+    EvaluationCache(PROMPT_VERSION),
+    SemanticEvaluationCache(memory_service.embedding_dim)
+)
+
+@cached_chain
+def get_assessment_chain():
+    return ASSESSMENT_PROMPT | get_chat_model("assessment", temperature=0.1, max_tokens=150) | json_parser
+
+def _assessment_inputs(context: dict) -> dict:
+    return {
+        "question": context.get("question", ""),
+        "answer": context.get("answer", ""),
+        "confidence_score": context.get("confidence_score", 0.5),
+        "emotion_state": context.get("emotion_state", "calm"),
+        "topics_covered": context.get("topics_covered", []),
+        "interview_round": context.get("interview_round", 1),
+        "max_rounds": context.get("max_rounds", 5)
+    }
+
+def assess_answer(context: dict) -> AssessmentOutput:
+    return get_assessment_chain().invoke(_assessment_inputs(context))
+
+async def aassess_answer(context: dict) -> AssessmentOutput:
+    return await get_assessment_chain().ainvoke(_assessment_inputs(context))
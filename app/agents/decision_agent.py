@@ -2,41 +2,38 @@
 import os
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel
+from typing import NamedTuple
+
+from app.models.interview_state import DecisionType
+from app.services.llm_service import cached_chain, get_chat_model
+from app.utils.config import (
+    DECISION_LOW_SCORE,
+    DECISION_HIGH_SCORE,
+    DECISION_LOW_CONFIDENCE,
+)
 
 load_dotenv()
 
 api_key = os.getenv("GROQ_API_KEY")
 
+# from langchain_google_genai import ChatGoogleGenerativeAI
 # llm = ChatGoogleGenerativeAI(
 #     model="gemini-2.5-flash-lite",
 #     temperature=0.1,
 #     max_output_tokens=100
 # )
 
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.1,
-    max_tokens=100,
-)
-
-
 class DecisionOutput(BaseModel):
     decision: str
 
 #json_parser = JsonOutputParser()
 json_parser = PydanticOutputParser(pydantic_object=DecisionOutput)
 
-template= """
-You are an interview decision engine for a Level-0 technical interview.
-
-Your task:
-Decide the NEXT ACTION the interviewer should take.
-
+# shared with the merged evaluate+decide prompt (assessment_agent)
+DECISION_RULES = """
 You must choose ONLY ONE of the following decisions:
 - ASK_FOLLOWUP
 - NEXT_TOPIC
@@ -50,11 +47,9 @@ Decision rules (internal, do NOT explain):
 - If correctness_score is high AND depth_level is "good" → INCREASE_DIFFICULTY
 - If candidate seems nervous or confidence is low → ASK_FOLLOWUP (simpler)
 - Otherwise → NEXT_TOPIC
+"""
 
-Inputs:
-Knowledge Evaluation:
-{knowledge_evaluation}
-
+STATE_INPUTS = """
 Confidence Score:
 {confidence_score}
 
@@ -69,7 +64,18 @@ Interview Round:
 
 Maximum Rounds:
 {max_rounds}
+"""
 
+template= """
+You are an interview decision engine for a Level-0 technical interview.
+
+Your task:
+Decide the NEXT ACTION the interviewer should take.
+""" + DECISION_RULES + """
+Inputs:
+Knowledge Evaluation:
+{knowledge_evaluation}
+""" + STATE_INPUTS + """
 Output rules:
 - Output JSON only
 - Do NOT add explanations
@@ -93,22 +99,81 @@ DECISION_PROMPT = PromptTemplate(
     template=template
 )
 
-decision_chain = DECISION_PROMPT | llm | json_parser
+@cached_chain
+def get_decision_chain():
+    return DECISION_PROMPT | get_chat_model("decision", temperature=0.1, max_tokens=100) | json_parser
 
-def decide_next_step(context: dict)-> dict:
-    decision = decision_chain.invoke(
-        {
+def _decision_inputs(context: dict) -> dict:
+    return {
         "knowledge_evaluation": context.get("knowledge_evaluation", {}),
         "confidence_score": context.get("confidence_score", 0.5),
         "emotion_state": context.get("emotion_state", "calm"),
         "topics_covered": context.get("topics_covered", []),
         "interview_round": context.get("interview_round", 1),
         "max_rounds": context.get("max_rounds", 5)
-        }
-    )
+    }
+
+def decide_next_step(context: dict)-> dict:
+    decision = get_decision_chain().invoke(_decision_inputs(context))
 
     return decision
 
+async def adecide_next_step(context: dict)-> dict:
+    decision = await get_decision_chain().ainvoke(_decision_inputs(context))
+
+    return decision
+
+
+# LOCAL RULE ENGINE
+# Same rules as the prompt above, evaluated in order, without a network call.
+
+DEPTH_LEVELS = {"poor", "basic", "good"}
+NERVOUS_STATES = {"nervous", "anxious", "stressed"}
+
+class RuleDecision(NamedTuple):
+    decision: str
+    # True when the evaluation signals conflict and the LLM may judge better
+    ambiguous: bool = False
+
+def apply_decision_rules(context: dict) -> RuleDecision:
+    evaluation = context.get("knowledge_evaluation") or {}
+    interview_round = context.get("interview_round", 1)
+    max_rounds = context.get("max_rounds", 5)
+
+    if interview_round >= max_rounds:
+        return RuleDecision(DecisionType.END_INTERVIEW.value)
+
+    score = evaluation.get("correctness_score")
+    depth = evaluation.get("depth_level")
+    follow_up_needed = bool(evaluation.get("follow_up_needed", False))
+    confidence = context.get("confidence_score", 0.5)
+    emotion = str(context.get("emotion_state", "calm")).lower()
+
+    # malformed evaluation: nothing to reason about
+    if not isinstance(score, (int, float)) or depth not in DEPTH_LEVELS:
+        return RuleDecision(DecisionType.NEXT_TOPIC.value, ambiguous=True)
+
+    low_score = score < DECISION_LOW_SCORE
+    high_score = score >= DECISION_HIGH_SCORE
+    conflicting = (
+        (high_score and (follow_up_needed or depth == "poor"))
+        or (low_score and depth == "good")
+    )
+
+    if low_score or depth == "poor":
+        return RuleDecision(DecisionType.ASK_FOLLOWUP.value, conflicting)
+
+    if follow_up_needed:
+        return RuleDecision(DecisionType.ASK_FOLLOWUP.value, conflicting)
+
+    if high_score and depth == "good":
+        return RuleDecision(DecisionType.INCREASE_DIFFICULTY.value)
+
+    if confidence < DECISION_LOW_CONFIDENCE or emotion in NERVOUS_STATES:
+        return RuleDecision(DecisionType.ASK_FOLLOWUP.value)
+
+    return RuleDecision(DecisionType.NEXT_TOPIC.value)
+
 
 
 
@@ -2,11 +2,20 @@
 import os
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.runnables import RunnableSequence
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_groq import ChatGroq
 from pydantic import BaseModel
+from typing import NamedTuple, Optional
+
+from app.services.evaluation_cache import (
+    EvaluationCache,
+    EvaluationCaches,
+    SemanticEvaluationCache,
+)
+from app.services.llm_service import cached_chain, get_chat_model
+from app.services.memory_service import memory_service
+from app.utils.cache import content_key
+from app.utils.config import EVALUATION_SEMANTIC_CACHE
 
 
 
@@ -14,18 +23,13 @@ load_dotenv()
 
 api_key = os.getenv("GROQ_API_KEY")
 
+# from langchain_google_genai import ChatGoogleGenerativeAI
 # llm = ChatGoogleGenerativeAI(
 #     model="gemini-2.5-flash-lite",
 #     temperature=0.1,
 #     max_output_tokens=300
 # )
 
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.1,
-    max_tokens=100,
-)
-
 class EvaluationOutput(BaseModel):
     correctness_score: float
     depth_level: str
@@ -38,12 +42,8 @@ class EvaluationOutput(BaseModel):
 
 json_parser = PydanticOutputParser(pydantic_object=EvaluationOutput)
 
-template = """
-You are a strict technical evaluator conducting a Level-0 interview.
-
-Your task:
-Evaluate the candidate's answer ONLY for technical quality.
-
+# shared with the merged evaluate+decide prompt (assessment_agent)
+EVALUATION_INSTRUCTIONS = """
 You must:
 - Judge correctness of the answer
 - Judge depth of understanding
@@ -70,13 +70,22 @@ Evaluation guidelines:
 - follow_up_needed:
     true if answer is shallow or partially correct
     false if answer is sufficient for L0
+"""
 
+ANSWER_INPUTS = """
 Question:
 {question}
 
 Candidate Answer:
 {answer}
+"""
+
+template = """
+You are a strict technical evaluator conducting a Level-0 interview.
 
+Your task:
+Evaluate the candidate's answer ONLY for technical quality.
+""" + EVALUATION_INSTRUCTIONS + ANSWER_INPUTS + """
 {format_instructions}
 """
 
@@ -88,24 +97,134 @@ EVALUATION_PROMPT = PromptTemplate(
     template= template
 )
 
-evaluation_chain = EVALUATION_PROMPT | llm | json_parser
-
-def evaluate_knowledge(context: dict) -> dict:
-    
-    evaluation =  evaluation_chain.invoke(
-        {
-            "question": context.get("question", ""),
-            "answer": context.get("answer","")
-        }
+@cached_chain
+def get_evaluation_chain():
+    return EVALUATION_PROMPT | get_chat_model("evaluation", temperature=0.1, max_tokens=100) | json_parser
+
+# part of every cache key: editing the prompt starts a fresh cache, bump the
+# prefix when a model / temperature change should do the same
+PROMPT_VERSION = "v1:" + content_key(template, json_parser.get_format_instructions())[:12]
+
+evaluation_cache = EvaluationCache(PROMPT_VERSION)
+semantic_cache = SemanticEvaluationCache(memory_service.embedding_dim)
+
+def _evaluation_inputs(context: dict) -> dict:
+    return {
+        "question": context.get("question", ""),
+        "answer": context.get("answer","")
+    }
+
+# CACHES
+# exact pair -> semantic (paraphrase) pair -> model. A sampled semantic hit
+# is still sent to the model and compared, to measure false hits.
+
+class EvaluationLookup(NamedTuple):
+    # reusable evaluation; None means the model has to be called
+    evaluation: Optional[EvaluationOutput] = None
+    # (question, answer) embeddings to store the fresh result under
+    vectors: Optional[tuple] = None
+    # semantic hit being audited against the fresh result
+    audited: Optional[dict] = None
+
+def _caches(caches: Optional[EvaluationCaches]) -> EvaluationCaches:
+    # this prompt's caches unless another prompt (e.g. the merged assessment)
+    # passes its own; looked up per call so tests can swap them
+    return caches if caches is not None else EvaluationCaches(evaluation_cache, semantic_cache)
+
+def _cache_key(context: dict, caches: EvaluationCaches) -> str:
+    return caches.exact.key(context.get("question", ""), context.get("answer", ""))
+
+def _exact_lookup(context: dict, caches: EvaluationCaches) -> Optional[EvaluationLookup]:
+    evaluation = caches.exact.get(_cache_key(context, caches))
+    if evaluation is None:
+        return None
+    return EvaluationLookup(EvaluationOutput(**evaluation))
+
+def _semantic_lookup(context: dict, vectors: tuple, caches: EvaluationCaches) -> EvaluationLookup:
+    similar = caches.semantic.get(*vectors)
+    if similar is None:
+        return EvaluationLookup(vectors=vectors)
+    if caches.semantic.should_audit():
+        return EvaluationLookup(vectors=vectors, audited=similar)
+
+    # exact repeats of this pair can now skip the embedding too
+    caches.exact.put(_cache_key(context, caches), similar)
+    return EvaluationLookup(EvaluationOutput(**similar))
+
+def lookup_evaluation(context: dict, caches: Optional[EvaluationCaches] = None) -> EvaluationLookup:
+    caches = _caches(caches)
+    lookup = _exact_lookup(context, caches)
+    if lookup is not None:
+        return lookup
+    if not EVALUATION_SEMANTIC_CACHE:
+        return EvaluationLookup()
+
+    vectors = (
+        memory_service.embed(context.get("question") or ""),
+        memory_service.embed(context.get("answer") or "")
+    )
+    return _semantic_lookup(context, vectors, caches)
+
+async def alookup_evaluation(
+        context: dict,
+        caches: Optional[EvaluationCaches] = None
+) -> EvaluationLookup:
+    caches = _caches(caches)
+    lookup = _exact_lookup(context, caches)
+    if lookup is not None:
+        return lookup
+    if not EVALUATION_SEMANTIC_CACHE:
+        return EvaluationLookup()
+
+    vectors = (
+        await memory_service.aembed(context.get("question") or ""),
+        await memory_service.aembed(context.get("answer") or "")
     )
+    return _semantic_lookup(context, vectors, caches)
+
+def remember_evaluation(
+        context: dict,
+        lookup: EvaluationLookup,
+        evaluation: EvaluationOutput,
+        caches: Optional[EvaluationCaches] = None
+):
+    caches = _caches(caches)
+    evaluation = evaluation.model_dump()
+    caches.exact.put(_cache_key(context, caches), evaluation)
+
+    if lookup.vectors is not None:
+        caches.semantic.put(*lookup.vectors, evaluation)
+    if lookup.audited is not None:
+        caches.semantic.record_audit(lookup.audited, evaluation)
+
+def evaluate_knowledge(context: dict) -> EvaluationOutput:
+    
+    lookup = lookup_evaluation(context)
+    if lookup.evaluation is not None:
+        return lookup.evaluation
+
+    evaluation =  get_evaluation_chain().invoke(_evaluation_inputs(context))
+    remember_evaluation(context, lookup, evaluation)
 
     return evaluation
 
+async def aevaluate_knowledge(context: dict) -> EvaluationOutput:
+
+    lookup = await alookup_evaluation(context)
+    if lookup.evaluation is not None:
+        return lookup.evaluation
+
+    evaluation = await get_evaluation_chain().ainvoke(_evaluation_inputs(context))
+    remember_evaluation(context, lookup, evaluation)
+
+    return evaluation
+
+
+# TESTING THE AGENT
 
-test_context = {
-    "question": "What is Python?",
-    "answer": "Python is a programming language used for many things."
-}
+# test_context = {
+#     "question": "What is Python?",
+#     "answer": "Python is a programming language used for many things."
+# }
 
-result = evaluate_knowledge(test_context)
-print(result)
+# print(evaluate_knowledge(test_context))
@@ -1,19 +1,261 @@
 #orchestrator.py
-from typing import Optional
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
 
-from app.graph.interview_graph import build_interview_graph
-from app.models.interview_state import InterviewState , create_initial_state
+from app.graph.interview_graph import get_interview_graph
+from app.models.interview_state import (
+    GraphState,
+    InterviewState,
+    InterviewStatus,
+    create_initial_state,
+    interview_state_from_graph,
+)
+from app.services.checkpointer import session_config
 from app.services.memory_service import memory_service
+from app.services.question_bank import get_question_bank
+from app.services.session_store import SessionStore, create_session_store
+from app.utils.config import (
+    SESSION_IDLE_TTL,
+    SESSION_ENDED_TTL,
+    SESSION_MAX_ACTIVE,
+    SESSION_ORPHAN_TTL,
+)
+from app.utils.metrics import TURN_SECONDS, increment, set_gauge
 
 
 
 
 class InterviewOrchestrator:
+    """
+    Drives every interview session in the process. The compiled graph is
+    shared; the only per-session cost is the InterviewState itself, kept in
+    a SessionStore (in-memory, SQLite or Redis), plus the graph checkpoints
+    of a turn while it is in flight (thread_id = session id).
+    """
 
-    def __init__(self):
-        #langgraph compilation (it is static)
-        self.graph = build_interview_graph()
-        self.sessions: dict[str, InterviewState] = {}
+    def __init__(self, session_store: Optional[SessionStore] = None):
+        self._sessions = session_store
+        self._sessions_lock = threading.Lock()
+        # session id -> turns running in this process, and the sessions the
+        # sweeper is archiving; a turn waits for the archive, the sweeper
+        # skips a session with a turn
+        self._in_flight: Dict[str, int] = {}
+        self._archiving: set[str] = set()
+        self._turns = threading.Condition()
+
+    @property
+    def sessions(self) -> SessionStore:
+        # the configured store is created on first use, so importing the
+        # registry opens no SQLite file or Redis connection. An empty store
+        # is falsy (len 0), so test for None explicitly
+        if self._sessions is None:
+            with self._sessions_lock:
+                if self._sessions is None:
+                    self._sessions = create_session_store()
+        return self._sessions
+
+    @property
+    def graph(self):
+        #langgraph compilation (it is static, compiled once per process on first use)
+        return get_interview_graph()
+
+    def load_state(self, session_id: str) -> Optional[InterviewState]:
+        return self.sessions.get(session_id)
+
+    def save_state(self, session_id: str, state: InterviewState):
+        self.sessions.set(session_id, state)
+
+    # event-loop variants: the store may be SQLite or Redis
+    async def aload_state(self, session_id: str) -> Optional[InterviewState]:
+        return await self.sessions.aget(session_id)
+
+    async def asave_state(self, session_id: str, state: InterviewState):
+        await self.sessions.aset(session_id, state)
+
+    def _initial_state(self, session_id: str) -> InterviewState:
+        state = create_initial_state(session_id)
+
+        # open with a bank question, so the first answer has a question to
+        # be evaluated against and no model call is needed to start
+        first = get_question_bank().pick(session_id, state.difficulty_level)
+        if first is not None:
+            state.current_question = first.question
+            state.next_question = first.question
+            state.past_questions.append(first.question)
+            state.topics_covered.append(first.topic)
+
+        return state
+
+    def start_session(self, session_id: str) -> InterviewState:
+        state = self._initial_state(session_id)
+        self.save_state(session_id, state)
+        return state
+
+    async def astart_session(self, session_id: str) -> InterviewState:
+        state = self._initial_state(session_id)
+        await self.asave_state(session_id, state)
+        return state
+
+    def get_session(self, session_id: str) -> Optional[InterviewState]:
+        return self.load_state(session_id)
+
+    async def aget_session(self, session_id: str) -> Optional[InterviewState]:
+        return await self.aload_state(session_id)
+
+    def has_session(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    async def ahas_session(self, session_id: str) -> bool:
+        return await self.sessions.acontains(session_id)
+
+    def active_sessions(self) -> list[str]:
+        return self.sessions.keys()
+
+    def end_session(self, session_id: str) -> bool:
+        # drop the state and the session's semantic memory
+        deleted = self.sessions.delete(session_id)
+        memory_service.drop_session(session_id)
+        self._drop_checkpoints(session_id)
+        return deleted
+
+    def get_archived(self, session_id: str) -> Optional[dict]:
+        # kept in the session store, so every worker sees it
+        return self.sessions.get_archived(session_id)
+
+    def archive_session(self, session_id: str) -> Optional[dict]:
+        """
+        Replace a session's state and memory with a compact summary.
+        """
+        state = self.load_state(session_id)
+        if state is None:
+            return None
+
+        # the profile saved with the state: the semantic memory may live in
+        # another worker
+        summary = {
+            "session_id": session_id,
+            "status": state.interview_status,
+            "round": state.interview_round,
+            "strengths": state.candidate_profile.get("strengths", []),
+            "weaknesses": state.candidate_profile.get("weaknesses", []),
+            "archived_at": time.time()
+        }
+        self.sessions.archive(session_id, summary)
+        self.end_session(session_id)
+        increment("sessions.archived")
+        return summary
+
+    def _try_begin_turn(self, session_id: str) -> bool:
+        with self._turns:
+            if session_id in self._archiving:
+                return False
+            self._in_flight[session_id] = self._in_flight.get(session_id, 0) + 1
+            return True
+
+    def _begin_turn(self, session_id: str):
+        with self._turns:
+            self._turns.wait_for(lambda: session_id not in self._archiving)
+            self._in_flight[session_id] = self._in_flight.get(session_id, 0) + 1
+
+    def _end_turn(self, session_id: str):
+        with self._turns:
+            count = self._in_flight.pop(session_id) - 1
+            if count:
+                self._in_flight[session_id] = count
+
+    @contextmanager
+    def _turn(self, session_id: str):
+        self._begin_turn(session_id)
+        try:
+            yield
+        finally:
+            self._end_turn(session_id)
+
+    @asynccontextmanager
+    async def _aturn(self, session_id: str):
+        # only block a thread (not the loop) when the sweeper holds the session
+        if not self._try_begin_turn(session_id):
+            await asyncio.to_thread(self._begin_turn, session_id)
+        try:
+            yield
+        finally:
+            self._end_turn(session_id)
+
+    def _claim_for_archive(self, session_id: str) -> bool:
+        with self._turns:
+            if self._in_flight.get(session_id):
+                return False
+            self._archiving.add(session_id)
+            return True
+
+    def _release_archive(self, session_id: str):
+        with self._turns:
+            self._archiving.discard(session_id)
+            self._turns.notify_all()
+
+    def sweep_sessions(self, now: Optional[float] = None) -> list[str]:
+        """
+        Archive idle, finished and over-limit sessions and refresh the
+        session gauges. Returns the archived session ids.
+
+        A session with a turn running in this process is skipped, and a
+        turn that starts while its session is being archived waits for the
+        archive. With a shared store, each worker sweeps the sessions it
+        saved last (SESSION_MAX_ACTIVE applies to those); another worker's
+        sessions only once idle past SESSION_ORPHAN_TTL, i.e. when that
+        worker is gone. A turn running in another worker is not visible
+        here, so SESSION_ORPHAN_TTL must stay well above the longest turn.
+        """
+        now = now if now is not None else time.time()
+        last_updated = self.sessions.last_updated()
+        own = self.sessions.last_updated(owner=self.sessions.owner)
+
+        expired = []
+        for session_id, updated_at in last_updated.items():
+            idle = now - updated_at
+            if session_id not in own:
+                if idle > SESSION_ORPHAN_TTL:
+                    expired.append(session_id)
+            elif idle > SESSION_IDLE_TTL:
+                expired.append(session_id)
+            elif idle > SESSION_ENDED_TTL:
+                state = self.load_state(session_id)
+                if state is not None and state.interview_status == InterviewStatus.ENDED:
+                    expired.append(session_id)
+
+        # least recently updated first beyond the live-session cap
+        remaining = sorted(
+            (updated_at, session_id)
+            for session_id, updated_at in own.items()
+            if session_id not in expired
+        )
+        overflow = len(remaining) - SESSION_MAX_ACTIVE
+        if overflow > 0:
+            expired.extend(session_id for _, session_id in remaining[:overflow])
+
+        archived = []
+        for session_id in expired:
+            if not self._claim_for_archive(session_id):
+                continue
+            try:
+                if self.archive_session(session_id) is not None:
+                    archived.append(session_id)
+            finally:
+                self._release_archive(session_id)
+
+        self.update_gauges()
+        return archived
+
+    def update_gauges(self):
+        set_gauge("sessions.active", len(self.sessions))
+        set_gauge("sessions.archived_summaries", self.sessions.archived_count())
+        set_gauge(
+            "sessions.resident_bytes",
+            self.sessions.resident_bytes() + memory_service.resident_bytes()
+        )
 
     def _is_repeat_request(self, text: str) -> bool:
         text = text.lower()
@@ -27,24 +269,16 @@ class InterviewOrchestrator:
         ]
         return any(phrase in text for phrase in repeat_phrases)
 
-    def run_step(
+    def _prepare_state(
             self,
-            candidate_id: str,
+            state: InterviewState,
             candidate_answer: str,
-            confidence_score: float = 0.5,
-            emotion_state: str = "calm"
-    ) -> dict:
-        
-        #loading the state
-        if candidate_id not in self.sessions:
-            self.sessions[candidate_id] = create_initial_state(candidate_id)
-        
-        state = self.sessions[candidate_id]
-        
-        #state: InterviewState = load_state(candidate_id)    
-        
+            confidence_score: float,
+            emotion_state: str
+    ) -> tuple[InterviewState, Optional[dict]]:
+
         if self._is_repeat_request(candidate_answer):
-            return {
+            return state, {
                 "next_question": state.current_question,
                 "interview_status": state.interview_status,
                 "interview_round": state.interview_round
@@ -58,46 +292,78 @@ class InterviewOrchestrator:
         state.confidence_score = confidence_score
         state.emotion_state = emotion_state
 
-        #execute langgraph
-        updated_state_dict = self.graph.invoke(state)
-        updated_state = InterviewState(**updated_state_dict)
-        
-        # if updated_state.decision == updated_state.DecisionType.END_INTERVIEW:
-        #     updated_state.interview_status = updated_state.InterviewStatus.ENDED
-        
-        # # 🔴 HARD STOP CONDITION (MANDATORY)
-        # if updated_state.interview_round >= updated_state.max_rounds:
-        #     updated_state.interview_status = InterviewStatus.ENDED
+        return state, None
 
+    def _drop_checkpoints(self, session_id: str):
+        checkpointer = self.graph.checkpointer
+        if checkpointer is not None:
+            checkpointer.delete_thread(session_id)
 
+    def _resumes(self, snapshot, state: InterviewState) -> bool:
+        """
+        True if the session's last graph run stopped part way through this
+        same turn (it raised, or the worker died with a SQLite checkpointer):
+        the run is then resumed from its last completed node rather than
+        started over, so e.g. a failed question generation does not pay for
+        the evaluation again.
+        """
+        if not snapshot.next:
+            return False
 
-        # write to semantic memory
-        if updated_state.knowledge_evaluation:
-            memory_service.store_interaction(
-                question=state.current_question,
-                answer=candidate_answer,
-                evaluation=updated_state.knowledge_evaluation,
-                topic=(
-                    updated_state.topics_covered[-1]
-                    if updated_state.topics_covered
-                    else "general"
-                ),
-                interview_round=updated_state.interview_round
-            )
+        values = snapshot.values
+        return (
+            values.get("current_question") == state.current_question
+            and values.get("candidate_answer") == state.candidate_answer
+            and len(values.get("past_questions", ())) == len(state.past_questions)
+        )
 
-        #save it
-        #save_state(candidate_id , updated_state)
+    def _graph_input(self, snapshot, state: InterviewState) -> Optional[GraphState]:
+        # None makes LangGraph continue the thread from its checkpoint
+        if snapshot is not None and self._resumes(snapshot, state):
+            increment("graph.turns_resumed")
+            return None
+        return GraphState.from_interview_state(state)
 
-        #read from memory and inject into state
-        memory_summary = memory_service.summarize_candidate_profile()
-        weak_topics = memory_service.get_weak_topics()
-        
-        updated_state.knowledge_evaluation["memory_summary"] = memory_summary
-        updated_state.knowledge_evaluation["weak_topics"] = weak_topics
+    def _interaction_record(
+            self,
+            state: InterviewState,
+            updated_state: InterviewState,
+            candidate_answer: str
+    ) -> dict:
+        return {
+            "session_id": state.candidate_id,
+            "question": state.current_question,
+            "answer": candidate_answer,
+            "evaluation": updated_state.knowledge_evaluation,
+            # the topic of the question just answered; after a topic switch
+            # the updated state already ends with the next question's topic
+            "topic": (
+                state.topics_covered[-1]
+                if state.topics_covered
+                else "general"
+            ),
+            "interview_round": updated_state.interview_round
+        }
+
+    def _refresh_profile(self, candidate_id: str, updated_state: InterviewState):
+        #read from memory and inject into state (kept out of
+        #knowledge_evaluation, which is the model's evaluation only)
+        updated_state.candidate_profile = memory_service.summarize_candidate_profile(candidate_id)
+        updated_state.weak_topics = memory_service.get_weak_topics(candidate_id)
+
+    def _finish_step(self, candidate_id: str, updated_state: InterviewState) -> dict:
+        self._refresh_profile(candidate_id, updated_state)
 
         #save updated state
-        self.sessions[candidate_id] = updated_state
-        
+        self.save_state(candidate_id, updated_state)
+        return self._step_response(updated_state)
+
+    async def _afinish_step(self, candidate_id: str, updated_state: InterviewState) -> dict:
+        self._refresh_profile(candidate_id, updated_state)
+        await self.asave_state(candidate_id, updated_state)
+        return self._step_response(updated_state)
+
+    def _step_response(self, updated_state: InterviewState) -> dict:
         #return minimal response
         # return {
         #     "next_question": updated_state.get("next_question"),
@@ -111,6 +377,125 @@ class InterviewOrchestrator:
             "interview_round": updated_state.interview_round
         }
 
+    def run_step(
+            self,
+            candidate_id: str,
+            candidate_answer: str,
+            confidence_score: float = 0.5,
+            emotion_state: str = "calm"
+    ) -> dict:
+        # the sweeper leaves the session alone while the turn runs
+        with self._turn(candidate_id):
+            return self._run_step(
+                candidate_id, candidate_answer, confidence_score, emotion_state
+            )
+
+    def _run_step(
+            self,
+            candidate_id: str,
+            candidate_answer: str,
+            confidence_score: float,
+            emotion_state: str
+    ) -> dict:
+        
+        #loading the state
+        state = self.load_state(candidate_id)
+        if state is None:
+            state = self.start_session(candidate_id)
+
+        state, early_response = self._prepare_state(
+            state, candidate_answer, confidence_score, emotion_state
+        )
+        if early_response is not None:
+            return early_response
+
+        #execute langgraph
+        graph = self.graph
+        config = session_config(candidate_id)
+        snapshot = graph.get_state(config) if graph.checkpointer is not None else None
+        with TURN_SECONDS.time(mode="sync"):
+            updated_state_dict = graph.invoke(self._graph_input(snapshot, state), config=config)
+        updated_state = interview_state_from_graph(updated_state_dict)
+        # the turn is complete; its state goes to the session store below
+        self._drop_checkpoints(candidate_id)
+        
+        # if updated_state.decision == updated_state.DecisionType.END_INTERVIEW:
+        #     updated_state.interview_status = updated_state.InterviewStatus.ENDED
+        
+        # # 🔴 HARD STOP CONDITION (MANDATORY)
+        # if updated_state.interview_round >= updated_state.max_rounds:
+        #     updated_state.interview_status = InterviewStatus.ENDED
+
+
+
+        # write to semantic memory
+        if updated_state.knowledge_evaluation:
+            memory_service.store_interaction(
+                **self._interaction_record(state, updated_state, candidate_answer)
+            )
+
+        return self._finish_step(candidate_id, updated_state)
+
+    async def arun_step(
+            self,
+            candidate_id: str,
+            candidate_answer: str,
+            confidence_score: float = 0.5,
+            emotion_state: str = "calm",
+            on_question_delta=None
+    ) -> dict:
+        """
+        Async variant of run_step for the websocket: LLM calls are awaited and
+        the embedding forward pass runs on the memory service's thread pool.
+        If on_question_delta is given, it is awaited with each chunk of the
+        next question while it is being generated.
+        """
+        async with self._aturn(candidate_id):
+            return await self._arun_step(
+                candidate_id, candidate_answer, confidence_score, emotion_state,
+                on_question_delta
+            )
+
+    async def _arun_step(
+            self,
+            candidate_id: str,
+            candidate_answer: str,
+            confidence_score: float,
+            emotion_state: str,
+            on_question_delta
+    ) -> dict:
+
+        #loading the state (off the loop for SQLite / Redis stores)
+        state = await self.aload_state(candidate_id)
+        if state is None:
+            state = await self.astart_session(candidate_id)
+
+        state, early_response = self._prepare_state(
+            state, candidate_answer, confidence_score, emotion_state
+        )
+        if early_response is not None:
+            return early_response
+
+        #execute langgraph
+        graph = self.graph
+        config = session_config(candidate_id, on_question_delta=on_question_delta)
+        snapshot = await graph.aget_state(config) if graph.checkpointer is not None else None
+        with TURN_SECONDS.time(mode="async"):
+            updated_state_dict = await graph.ainvoke(
+                self._graph_input(snapshot, state), config=config
+            )
+        updated_state = interview_state_from_graph(updated_state_dict)
+        if graph.checkpointer is not None:
+            await graph.checkpointer.adelete_thread(candidate_id)
+
+        # write to semantic memory
+        if updated_state.knowledge_evaluation:
+            await memory_service.astore_interaction(
+                **self._interaction_record(state, updated_state, candidate_answer)
+            )
+
+        return await self._afinish_step(candidate_id, updated_state)
+
 
  # even if we did not write the : InterviewState, ig it would work, but for sustaining the InterviewState structure and its variables, we should put : InterviewState
         
\ No newline at end of file
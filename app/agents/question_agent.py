@@ -3,27 +3,21 @@ import os
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate 
 from langchain_core.runnables import RunnableSequence
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
+
+from app.services.llm_service import cached_chain, get_chat_model
 
 
 load_dotenv()
 
 api_key = os.getenv("GROQ_API_KEY")
 
+# from langchain_google_genai import ChatGoogleGenerativeAI
 # llm = ChatGoogleGenerativeAI(
 #     model="gemini-2.5-flash-lite",
 #     temperature=0.35,
 #     max_output_tokens=100
 # )
 
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0.35,
-    max_tokens=100,
-)
-
-
 template = """
 You are a human technical interviewer conducting a Level-0 interview.
 Your task:
@@ -49,12 +43,18 @@ Previous Questions:
 Candidate Answer Summary:
 {answer_summary}
 
+Relevant Earlier Answers:
+{relevant_history}
+
 Topics Already Covered:
 {covered_topics}
 
 Difficulty Level:
 {difficulty_level}
 
+Focus:
+{focus}
+
 Output format:
 <question only>
 """
@@ -64,25 +64,64 @@ QUESTION_PROMPT = PromptTemplate(
     input_variables=[
         "previous_questions",
         "answer_summary",
+        "relevant_history",
         "covered_topics",
-        "difficulty_level"
+        "difficulty_level",
+        "focus"
     ],
     template=template
 )
 
-question_chain = QUESTION_PROMPT | llm
+# focus hints, used when a question is generated for a known decision
+DEFAULT_FOCUS = "Follow the decision logic above."
+FOLLOWUP_FOCUS = "Ask a FOLLOW-UP question that probes the candidate's last answer more deeply."
+NEW_TOPIC_FOCUS = "Move to a NEW topic that has NOT been covered yet."
 
-def generate_question(context: dict) -> str:
+@cached_chain
+def get_question_chain():
+    return QUESTION_PROMPT | get_chat_model("question", temperature=0.35, max_tokens=100)
 
-    response = question_chain.invoke({
+def _question_inputs(context: dict) -> dict:
+    return {
         "previous_questions": context.get("previous_questions", []),
         "answer_summary": context.get("answer_summary", ""),
+        "relevant_history": context.get("relevant_history", "None"),
         "covered_topics": context.get("covered_topics", []),
-        "difficulty_level": context.get("difficulty_level", "easy")
-    })
+        "difficulty_level": context.get("difficulty_level", "easy"),
+        "focus": context.get("focus", DEFAULT_FOCUS)
+    }
+
+def generate_question(context: dict) -> str:
+
+    response = get_question_chain().invoke(_question_inputs(context))
+
+    return response.content.strip()
+
+async def agenerate_question(context: dict) -> str:
+
+    response = await get_question_chain().ainvoke(_question_inputs(context))
 
     return response.content.strip()
 
+async def astream_question(context: dict, on_delta) -> str:
+    """
+    Streams the question token by token, awaiting on_delta(text) for every
+    non-empty chunk, and returns the full stripped question.
+    """
+    parts = []
+
+    async for chunk in get_question_chain().astream(_question_inputs(context)):
+        text = chunk.content
+        if not parts:
+            text = text.lstrip()
+        if not text:
+            continue
+
+        parts.append(text)
+        await on_delta(text)
+
+    return "".join(parts).strip()
+
 
 
 
@@ -1,10 +1,12 @@
 # app/api/interview_routes.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 
-from app.services.orchestrator_registry import orchestrators
-from app.services.memory_service import memory_service
+from app.services.orchestrator_registry import orchestrator
+from app.utils.config import LLM_MAX_CONCURRENCY
 
 router = APIRouter(prefix="/interviews", tags=["Interviews"])
 
@@ -17,6 +19,7 @@ class StartInterviewResponse(BaseModel):
     session_id: str
     status: str
     max_rounds: int
+    first_question: Optional[str] = None
 
 
 class InterviewStatusResponse(BaseModel):
@@ -43,24 +46,15 @@ def start_interview():
     Create a new interview session.
     """
     import uuid
-    from app.agents.orchestrator import InterviewOrchestrator
-    from app.models.interview_state import create_initial_state
 
     session_id = str(uuid.uuid4())
-    #orchestrators[session_id] = InterviewOrchestrator()
-    
-    orchestrator = InterviewOrchestrator()
-    orchestrator.sessions[session_id] = create_initial_state(session_id)
-
-    orchestrators[session_id] = orchestrator
-
-
-
+    state = orchestrator.start_session(session_id)
 
     return {
         "session_id": session_id,
-        "status": "ongoing",
-        "max_rounds": 5
+        "status": state.interview_status,
+        "max_rounds": state.max_rounds,
+        "first_question": state.current_question
     }
 
 
@@ -69,13 +63,12 @@ def get_interview_status(session_id: str):
     """
     Get current status of an interview.
     """
-    orchestrator = orchestrators.get(session_id)
-    if not orchestrator:
-        raise HTTPException(status_code=404, detail="Interview not found")
-
-    state = orchestrator.sessions.get(session_id)
+    state = orchestrator.get_session(session_id)
     if not state:
-        raise HTTPException(status_code=404, detail="Interview state not found")
+        archived = orchestrator.get_archived(session_id)
+        if not archived:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        return archived
 
     return {
         "session_id": session_id,
@@ -89,32 +82,66 @@ def get_interview_summary(session_id: str):
     """
     Fetch post-interview summary.
     """
-    orchestrator = orchestrators.get(session_id)
-    if not orchestrator:
-        raise HTTPException(status_code=404, detail="Interview not found")
-
-    state = orchestrator.sessions.get(session_id)
+    state = orchestrator.get_session(session_id)
     if not state:
-        raise HTTPException(status_code=404, detail="Interview state not found")
+        archived = orchestrator.get_archived(session_id)
+        if not archived:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        return {**archived, "total_rounds": archived["round"]}
 
-    profile = memory_service.summarize_candidate_profile()
+    # refreshed into the state on every turn, so any worker can answer
+    profile = state.candidate_profile
 
     return {
         "session_id": session_id,
         "status": state.interview_status,
-        "strengths": profile["strengths"],
-        "weaknesses": profile["weaknesses"],
+        "strengths": profile.get("strengths", []),
+        "weaknesses": profile.get("weaknesses", []),
         "total_rounds": state.interview_round
     }
 
 
+@router.delete("/{session_id}")
+def end_interview(session_id: str):
+    """
+    Close an interview and release its state and memory.
+    """
+    if not orchestrator.end_session(session_id):
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+    return {"session_id": session_id, "status": "deleted"}
+
+
+@router.post("/evaluate/batch")
+async def evaluate_batch(request: Request, max_concurrency: int = 8):
+    """
+    Score recorded turns offline (see services/batch_evaluation.py). The
+    body is JSONL of {"session_id", "question", "answer", "topic"?,
+    "round"?}; the response streams one JSONL line per scored turn, then
+    one {"session_id", "profile"} line per candidate. max_concurrency is
+    clamped to LLM_MAX_CONCURRENCY, the cap shared with live interviews.
+    """
+    from app.services.batch_evaluation import astream_jsonl, parse_turns
+
+    body = (await request.body()).decode("utf-8")
+    try:
+        turns = list(parse_turns(body.splitlines()))
+    except (ValueError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid turn: {exc}")
+
+    return StreamingResponse(
+        astream_jsonl(turns, min(max(1, max_concurrency), LLM_MAX_CONCURRENCY)),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get("/active")
 def get_active_interviews():
     """
     List active interview session IDs.
     """
     return {
-        "active_sessions": list(orchestrators.keys())
+        "active_sessions": orchestrator.active_sessions()
     }
 
 
@@ -0,0 +1,24 @@
+# app/api/metrics_routes.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import render_prometheus
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    from app.services.orchestrator_registry import orchestrator
+
+    # session gauges are otherwise only refreshed by the sweeper
+    orchestrator.update_gauges()
+
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,100 +1,236 @@
 # app/api/websocket_routes.py
 
+import asyncio
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import uuid
-from app.services.orchestrator_registry import orchestrators
-
-from app.agents.orchestrator import InterviewOrchestrator
+from app.services.orchestrator_registry import orchestrator
+from app.utils.config import WS_QUEUE_SIZE, WS_OVERFLOW_POLICY
+from app.utils.logger import get_logger
+from app.utils.metrics import increment
 
 router = APIRouter()
+logger = get_logger(__name__)
 
-# Active WebSocket interview sessions
-#active_sessions: dict[str, InterviewOrchestrator] = {}
-active_sessions = orchestrators
 
-@router.websocket("/ws/interview/{session_id}")
-async def interview_websocket(websocket: WebSocket, session_id: str):
+class InterviewConnection:
     """
-    WebSocket endpoint for live AI interview.
+    One websocket client. A reader task answers pings straight away and puts
+    answers on a bounded queue; a turn worker runs them one at a time, so a
+    slow LLM call never holds up keepalives. Both send through one lock, so
+    frames never interleave.
     """
 
-    await websocket.accept()
-
-    # Create a unique session ID
-    #session_id = str(uuid.uuid4())
-
-    # Create orchestrator for this interview
-    #orchestrator = InterviewOrchestrator()
-
-    orchestrator = orchestrators.get(session_id)
-    if not orchestrator:
-        await websocket.close(code=1008)
-        return
-
-
-    #active_sessions[session_id] = orchestrator
-
-    try:
-        # 🔹 Send initial greeting / first question trigger
-        await websocket.send_json({
-            "type": "info",
-            "payload": {
-                "message": "Interview started. Please answer the first question."
-            }
-        })
-
+    def __init__(
+            self,
+            websocket: WebSocket,
+            session_id: str,
+            stream: bool = True,
+            queue_size: int = WS_QUEUE_SIZE,
+            overflow_policy: str = WS_OVERFLOW_POLICY
+    ):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.stream = stream
+        self.overflow_policy = overflow_policy
+        # maxsize=0 would make the queue unbounded
+        self.answers: "asyncio.Queue[str | None]" = asyncio.Queue(maxsize=max(1, queue_size))
+        self._send_lock = asyncio.Lock()
+        self.disconnected = False
+        # whether the running turn has sent question deltas yet
+        self._streamed = False
+
+    async def send(self, message_type: str, payload: dict):
+        async with self._send_lock:
+            if self.disconnected:
+                return
+            try:
+                await self.websocket.send_json({"type": message_type, "payload": payload})
+            except (WebSocketDisconnect, RuntimeError):
+                # the client is gone; a turn in flight still finishes and is saved
+                self.disconnected = True
+
+    async def send_error(self, message: str, **extra):
+        await self.send("error", {"message": message, **extra})
+
+    # INBOUND
+    def _enqueue(self, answer: str) -> bool:
+        """
+        False if the answer was rejected because the queue is full.
+        """
+        try:
+            self.answers.put_nowait(answer)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy != "coalesce":
+            increment("websocket.answers_rejected")
+            return False
+
+        # merge everything still waiting, plus this answer, into one turn
+        queued = []
+        while not self.answers.empty():
+            queued.append(self.answers.get_nowait())
+        self.answers.put_nowait(" ".join(queued + [answer]))
+        increment("websocket.answers_coalesced")
+        return True
+
+    async def read_messages(self):
         while True:
-            # 🔹 Receive candidate message
-            data = await websocket.receive_json()
+            data = await self.websocket.receive_json()
 
             msg_type = data.get("type")
             payload = data.get("payload", {})
 
+            if msg_type == "ping":
+                await self.send("pong", payload)
+                continue
+
             if msg_type != "answer":
-                await websocket.send_json({
-                    "type": "error",
-                    "payload": {"message": "Invalid message type"}
-                })
+                await self.send_error("Invalid message type")
                 continue
 
             candidate_answer = payload.get("text", "").strip()
 
             if not candidate_answer:
-                await websocket.send_json({
-                    "type": "error",
-                    "payload": {"message": "Answer cannot be empty"}
-                })
+                await self.send_error("Answer cannot be empty")
                 continue
 
+            if not self._enqueue(candidate_answer):
+                await self.send_error(
+                    "Previous answer is still being processed", code="queue_full"
+                )
+
+    # TURNS
+    async def send_question_delta(self, text: str):
+        self._streamed = True
+        await self.send("question_delta", {"text": text})
+
+    async def run_turns(self):
+        while True:
+            candidate_answer = await self.answers.get()
+            if candidate_answer is None:
+                return
+
             # 🔹 Run one interview step
-            response = orchestrator.run_step(
-                candidate_id=session_id,
-                candidate_answer=candidate_answer
-            )
+            self._streamed = False
+            try:
+                response = await orchestrator.arun_step(
+                    candidate_id=self.session_id,
+                    candidate_answer=candidate_answer,
+                    on_question_delta=self.send_question_delta if self.stream else None
+                )
+            except Exception:
+                # the same answer sent again resumes the turn from its checkpoint
+                logger.exception("Turn failed: %s", self.session_id)
+                if self._streamed:
+                    # the resumed turn streams the question again from the start
+                    await self.send("question_reset", {})
+                await self.send_error(
+                    "Could not process the answer, please send it again", code="turn_failed"
+                )
+                continue
 
             # 🔹 Check interview status
             if response["interview_status"] == "ended":
-                await websocket.send_json({
-                    "type": "interview_end",
-                    "payload": {
-                        "message": "Interview completed. Thank you!"
-                    }
-                })
-                break
+                await self.send("interview_end", {"message": "Interview completed. Thank you!"})
+                return
 
             # 🔹 Send next question
-            await websocket.send_json({
-                "type": "question",
-                "payload": {
-                    "text": response["next_question"],
-                    "round": response["interview_round"]
-                }
+            await self.send("question", {
+                "text": response["next_question"],
+                "round": response["interview_round"]
             })
 
+    async def run(self):
+        worker = asyncio.create_task(self.run_turns())
+        reader = asyncio.create_task(self.read_messages())
+        try:
+            await asyncio.wait({worker, reader}, return_when=asyncio.FIRST_COMPLETED)
+
+            if reader.done():
+                # the client left: drop answers not started yet, but let the
+                # running turn finish so its state is saved
+                if isinstance(reader.exception(), WebSocketDisconnect):
+                    self.disconnected = True
+                while not self.answers.empty():
+                    self.answers.get_nowait()
+                self.answers.put_nowait(None)
+                await worker
+                reader.result()
+            else:
+                # interview over: stop reading
+                reader.cancel()
+                await asyncio.gather(reader, return_exceptions=True)
+                worker.result()
+        finally:
+            for task in (worker, reader):
+                if not task.done():
+                    task.cancel()
+
+
+@router.websocket("/ws/interview/{session_id}")
+async def interview_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    stream: bool = True
+):
+    """
+    WebSocket endpoint for live AI interview.
+
+    While the next question is generated it is streamed as "question_delta"
+    frames; the complete text always follows in a final "question" frame, so
+    clients that only understand "question" can ignore the deltas (or connect
+    with ?stream=false to not receive them at all). If a turn fails after
+    deltas were sent, a "question_reset" frame comes before the "turn_failed"
+    error: the partial text is to be discarded, and resending the answer
+    streams the question again from its first delta.
+
+    {"type": "ping"} is answered with a "pong" (echoing the payload) at any
+    time, also while a turn is running. Answers sent during a turn wait in
+    a bounded queue; beyond WS_QUEUE_SIZE they get an error frame with code
+    "queue_full", or with WS_OVERFLOW_POLICY=coalesce are merged into the
+    queued answer.
+    """
+
+    await websocket.accept()
+
+    # Create a unique session ID
+    #session_id = str(uuid.uuid4())
+
+    if not await orchestrator.ahas_session(session_id):
+        await websocket.close(code=1008)
+        return
+
+    connection = InterviewConnection(websocket, session_id, stream)
+
+    try:
+        # 🔹 Send initial greeting / first question trigger
+        await connection.send("info", {
+            "message": "Interview started. Please answer the first question."
+        })
+
+        # 🔹 Send the question to answer (first question, or the pending
+        # one when reconnecting)
+        state = await orchestrator.aget_session(session_id)
+        if state is not None and state.current_question and state.interview_status != "ended":
+            await connection.send("question", {
+                "text": state.current_question,
+                "round": state.interview_round
+            })
+
+        await connection.run()
+
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected: {session_id}")
+        logger.info("WebSocket disconnected: %s", session_id)
 
     finally:
-        # 🔹 Cleanup session
-        #active_sessions.pop(session_id, None)
-        await websocket.close()
+        # 🔹 Cleanup session: a finished interview is archived right away,
+        # an unfinished one stays for reconnects until the idle TTL sweeps it
+        state = await orchestrator.aget_session(session_id)
+        if state is not None and state.interview_status == "ended":
+            # store, memory and checkpointer cleanup, off the loop
+            await asyncio.to_thread(orchestrator.archive_session, session_id)
+        if not connection.disconnected:
+            await websocket.close()
@@ -0,0 +1,84 @@
+# app/benchmarks/bench_embedding.py
+"""
+Embedding throughput with and without micro-batching.
+
+N concurrent sessions each embed --texts strings one after another.
+"unbatched" encodes every request on its own (the old per-call path, on a
+2-thread pool), "batched" goes through memory_service.batcher.
+
+--fake swaps the sentence transformer for the fake embedder
+(app/benchmarks/fakes.py), with a fixed cost per forward pass plus a cost
+per text, so the script also runs offline.
+
+    python -m app.benchmarks.bench_embedding --sessions 1 8 64 --texts 20
+    python -m app.benchmarks.bench_embedding --fake --fake-batch-latency 0.01
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.benchmarks.fakes import install_fakes
+from app.services.memory_service import memory_service
+
+
+def _texts(session: int, count: int) -> list[str]:
+    return [f"Question {i} from session {session}: what is a Python list?"
+            for i in range(count)]
+
+
+async def _run_unbatched(sessions: int, texts: int) -> float:
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=2)
+    embedder = memory_service.embedder
+
+    async def session(i):
+        for text in _texts(i, texts):
+            await loop.run_in_executor(pool, embedder.encode, text)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return sessions * texts / elapsed
+
+
+async def _run_batched(sessions: int, texts: int) -> float:
+    batcher = memory_service.batcher
+
+    async def session(i):
+        for text in _texts(i, texts):
+            await batcher.aembed(text)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return sessions * texts / (time.perf_counter() - start)
+
+
+async def main(sessions: list[int], texts: int):
+    # load the model outside the measurement
+    memory_service.warm_up()
+
+    print(f"{'sessions':>8} {'unbatched/s':>12} {'batched/s':>10}")
+    for n in sessions:
+        unbatched = await _run_unbatched(n, texts)
+        batched = await _run_batched(n, texts)
+        print(f"{n:>8} {unbatched:>12.1f} {batched:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--texts", type=int, default=20)
+    parser.add_argument("--fake", action="store_true", help="no model download")
+    parser.add_argument("--fake-batch-latency", type=float, default=0.005)
+    parser.add_argument("--fake-per-text-latency", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    if args.fake:
+        install_fakes(
+            embed_batch_latency=args.fake_batch_latency,
+            embed_per_text_latency=args.fake_per_text_latency,
+        )
+
+    asyncio.run(main(args.sessions, args.texts))
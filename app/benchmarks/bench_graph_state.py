@@ -0,0 +1,92 @@
+# app/benchmarks/bench_graph_state.py
+"""
+Per-turn CPU cost of graph execution with the agents stubbed out (no LLM,
+no embedding, no question bank), for the GraphState dataclass against the
+validated InterviewState model as the graph's state schema. Each turn
+includes the conversion at the orchestrator boundary.
+
+    python -m app.benchmarks.bench_graph_state --turns 2000
+"""
+import argparse
+import time
+
+from app.agents.evaluation_agent import EvaluationOutput
+from app.graph import interview_graph
+from app.models.interview_state import (
+    GraphState,
+    InterviewState,
+    interview_state_from_graph,
+)
+from app.services.question_bank import QuestionBank
+
+
+def stub_agents():
+    interview_graph.evaluate_knowledge = lambda context: EvaluationOutput(
+        correctness_score=0.5, depth_level="basic", follow_up_needed=True
+    )
+    interview_graph.generate_question = lambda context: "What is a Python decorator?"
+    interview_graph.get_question_bank = QuestionBank
+    interview_graph.QUESTION_CONTEXT_TOP_K = 0
+
+
+def start_state() -> InterviewState:
+    return InterviewState(
+        candidate_id="bench",
+        max_rounds=10**9,
+        current_question="What is Python?",
+        candidate_answer="Python is a programming language.",
+        past_questions=["What is Python?"] * 5,
+        topics_covered=["python basics"],
+    )
+
+
+def run_validated(graph, state: InterviewState) -> InterviewState:
+    # before: the model is the graph state, rebuilt from the output dict
+    return InterviewState(**graph.invoke(state))
+
+
+def run_lean(graph, state: InterviewState) -> InterviewState:
+    return interview_state_from_graph(graph.invoke(GraphState.from_interview_state(state)))
+
+
+def measure(run, graph, turns: int) -> float:
+    state = start_state()
+    start = time.perf_counter()
+    for _ in range(turns):
+        run(graph, state)
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5, help="alternating rounds; the best is reported")
+    args = parser.parse_args()
+
+    stub_agents()
+    variants = {
+        "InterviewState (validated)": (
+            run_validated,
+            interview_graph.build_interview_graph(speculative=False, state_schema=InterviewState)
+        ),
+        "GraphState (dataclass)": (
+            run_lean,
+            interview_graph.build_interview_graph(speculative=False, state_schema=GraphState)
+        ),
+    }
+
+    best = {name: float("inf") for name in variants}
+    for name, (run, graph) in variants.items():
+        measure(run, graph, 50)
+    for _ in range(args.rounds):
+        for name, (run, graph) in variants.items():
+            best[name] = min(best[name], measure(run, graph, args.turns))
+
+    for name, seconds in best.items():
+        print(f"{name:28s} {seconds * 1e6:8.1f} us/turn")
+    validated, lean = best.values()
+    print(f"speedup: {validated / lean:.2f}x ({(validated - lean) * 1e6:.0f} us/turn saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# app/benchmarks/bench_import_time.py
+"""
+Cold-start time of `import app.main` in a fresh interpreter.
+
+Importing must not build LLM clients, load the sentence transformer or touch
+the network; with --max-seconds the script exits non-zero when the median
+import time exceeds the budget, so it can guard against regressions in CI.
+
+    python -m app.benchmarks.bench_import_time --runs 5 --max-seconds 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import app.main
+print(time.perf_counter() - t0)
+"""
+
+
+def measure_import(runs: int) -> list[float]:
+    # no API key, so any eager client construction or network call would fail
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    timings = measure_import(args.runs)
+    median = statistics.median(timings)
+    print(f"import app.main: median {median * 1000:.1f} ms "
+          f"(min {min(timings) * 1000:.1f} ms, runs={args.runs})")
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: exceeds budget of {args.max_seconds:.2f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# app/benchmarks/bench_interview.py
+"""
+Offline end-to-end interview benchmark.
+
+Drives N simulated candidates through a full interview with the fake LLM
+and embedder (app/benchmarks/fakes.py), either via
+InterviewOrchestrator.run_step (one thread per candidate), arun_step or
+the websocket route (one task per candidate, in-process fake socket).
+Reports turns/sec, p50/p95/p99 turn latency and RSS growth, and writes
+them as JSON so runs on different commits can be compared.
+
+    python -m app.benchmarks.bench_interview --mode websocket --candidates 64 \
+        --llm-latency 0.2 --output bench_results/ws.json --compare bench_results/prev.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.benchmarks.fakes import install_fakes
+
+ANSWERS = [
+    "Python is a programming language.",
+    "A list is mutable and a tuple is not.",
+    "I am not sure, maybe it caches something?",
+    "Decorators wrap a function to extend its behaviour without changing it.",
+    "Generators yield values lazily, one at a time.",
+]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # peak RSS; KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+# drivers, each returns the list of turn latencies in seconds
+def _run_step_candidate(orchestrator, session_id: str, turns: int) -> list[float]:
+    latencies = []
+    orchestrator.start_session(session_id)
+    for turn in range(turns):
+        start = time.perf_counter()
+        response = orchestrator.run_step(
+            candidate_id=session_id,
+            candidate_answer=ANSWERS[turn % len(ANSWERS)]
+        )
+        latencies.append(time.perf_counter() - start)
+        if response["interview_status"] == "ended":
+            break
+    return latencies
+
+
+def drive_run_step(orchestrator, candidates: int, turns: int) -> list[float]:
+    with ThreadPoolExecutor(max_workers=candidates) as pool:
+        futures = [
+            pool.submit(_run_step_candidate, orchestrator, f"bench-{i}", turns)
+            for i in range(candidates)
+        ]
+        return [latency for future in futures for latency in future.result()]
+
+
+async def drive_arun_step(orchestrator, candidates: int, turns: int) -> list[float]:
+    async def candidate(session_id: str) -> list[float]:
+        latencies = []
+        orchestrator.start_session(session_id)
+        for turn in range(turns):
+            start = time.perf_counter()
+            response = await orchestrator.arun_step(
+                candidate_id=session_id,
+                candidate_answer=ANSWERS[turn % len(ANSWERS)]
+            )
+            latencies.append(time.perf_counter() - start)
+            if response["interview_status"] == "ended":
+                break
+        return latencies
+
+    results = await asyncio.gather(*(candidate(f"bench-{i}") for i in range(candidates)))
+    return [latency for result in results for latency in result]
+
+
+class FakeWebSocket:
+    """
+    Just enough of starlette's WebSocket for interview_websocket: answers
+    are fed one per turn, and each turn's latency is measured from handing
+    the answer over to the final question / interview_end frame.
+    """
+
+    def __init__(self, turns: int):
+        self.turns = turns
+        self.sent = 0
+        self.latencies: list[float] = []
+        self._turn_started = None
+        self._reply = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_json(self, message: dict):
+        if message["type"] in ("question", "interview_end", "error"):
+            if self._turn_started is not None:
+                self.latencies.append(time.perf_counter() - self._turn_started)
+                self._turn_started = None
+            self._reply.set()
+
+    async def receive_json(self) -> dict:
+        from fastapi import WebSocketDisconnect
+
+        if self.sent:
+            await self._reply.wait()
+        self._reply.clear()
+
+        # leave once the last turn has been answered
+        if self.sent >= self.turns:
+            raise WebSocketDisconnect(code=1000)
+
+        answer = ANSWERS[self.sent % len(ANSWERS)]
+        self.sent += 1
+        self._turn_started = time.perf_counter()
+        return {"type": "answer", "payload": {"text": answer}}
+
+
+async def drive_websocket(orchestrator, candidates: int, turns: int) -> list[float]:
+    from app.api.websocket_routes import interview_websocket
+
+    async def candidate(session_id: str) -> list[float]:
+        orchestrator.start_session(session_id)
+        socket = FakeWebSocket(turns)
+        await interview_websocket(socket, session_id)
+        return socket.latencies
+
+    results = await asyncio.gather(*(candidate(f"bench-ws-{i}") for i in range(candidates)))
+    return [latency for result in results for latency in result]
+
+
+def run(args) -> dict:
+    install_fakes(
+        llm_latency=args.llm_latency,
+        embed_batch_latency=args.embed_latency,
+    )
+    from app.services.orchestrator_registry import orchestrator
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+
+    if args.mode == "run_step":
+        latencies = drive_run_step(orchestrator, args.candidates, args.turns)
+    elif args.mode == "arun_step":
+        latencies = asyncio.run(drive_arun_step(orchestrator, args.candidates, args.turns))
+    else:
+        latencies = asyncio.run(drive_websocket(orchestrator, args.candidates, args.turns))
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "config": {
+            "mode": args.mode,
+            "candidates": args.candidates,
+            "turns": args.turns,
+            "llm_latency": args.llm_latency,
+            "embed_latency": args.embed_latency,
+        },
+        "turns": len(latencies),
+        "turns_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+        },
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "after": round(rss_mb(), 1),
+            "growth": round(rss_mb() - rss_before, 1),
+        },
+    }
+
+
+def compare(result: dict, previous: dict):
+    def delta(new, old):
+        return f"{new} ({(new - old) / old * 100:+.1f}%)" if old else str(new)
+
+    print(f"vs {previous.get('commit')}:")
+    print("  turns/sec:", delta(result["turns_per_sec"], previous["turns_per_sec"]))
+    for key in ("p50", "p95", "p99"):
+        print(f"  {key} ms:", delta(result["latency_ms"][key], previous["latency_ms"][key]))
+    print("  rss growth MB:", delta(result["rss_mb"]["growth"], previous["rss_mb"]["growth"]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["run_step", "arun_step", "websocket"], default="arun_step")
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--embed-latency", type=float, default=0.002)
+    parser.add_argument("--output", default=None, help="write the result JSON here")
+    parser.add_argument("--compare", default=None, help="previous result JSON to diff against")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# app/benchmarks/bench_start_interview.py
+"""
+Latency and memory of creating an interview session.
+
+"before" reproduces the old per-session path (a fresh compiled graph for
+every session), "after" goes through the /interviews/start route handler,
+which now only creates an InterviewState on the shared orchestrator.
+
+    python -m app.benchmarks.bench_start_interview --sessions 200
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from app.api.interview_routes import start_interview
+from app.graph.interview_graph import build_interview_graph
+from app.models.interview_state import create_initial_state
+
+
+def _old_start(registry: dict, i: int):
+    # what start_interview used to do: orchestrator + graph per session
+    session_id = f"old-{i}"
+    registry[session_id] = (build_interview_graph(), create_initial_state(session_id))
+
+
+def _new_start(registry: dict, i: int):
+    registry[i] = start_interview()
+
+
+def _measure(fn, sessions: int) -> dict:
+    registry = {}
+    timings = []
+
+    tracemalloc.start()
+    for i in range(sessions):
+        t0 = time.perf_counter()
+        fn(registry, i)
+        timings.append((time.perf_counter() - t0) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "kib_per_session": round(peak / 1024 / sessions, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    # warm the shared graph so "after" measures steady state
+    start_interview()
+
+    print("before:", _measure(_old_start, args.sessions))
+    print("after: ", _measure(_new_start, args.sessions))
+
+
+if __name__ == "__main__":
+    main()
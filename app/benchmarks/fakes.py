@@ -0,0 +1,163 @@
+# app/benchmarks/fakes.py
+"""
+Deterministic local stand-ins for ChatGroq and SentenceTransformer with
+configurable latency, so benchmarks (and manual runs) need no network, no
+API key and no model download.
+
+    from app.benchmarks.fakes import install_fakes
+    install_fakes(llm_latency=0.2, embed_batch_latency=0.005)
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Iterator, AsyncIterator, List, Optional
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_QUESTIONS = [
+    "What is the difference between a list and a tuple in Python?",
+    "How does a Python dictionary handle key lookups?",
+    "What is a decorator in Python?",
+    "Can you explain what a generator is?",
+    "What does the GIL do in CPython?",
+    "How would you handle exceptions in Python?",
+]
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def fake_reply(prompt: str) -> str:
+    """
+    Answer like the real agents would, derived only from the prompt text.
+    """
+    seed = _digest(prompt)
+
+    if "evaluator and decision engine" in prompt:
+        score = [0.0, 0.5, 1.0][seed % 3]
+        decisions = ["ASK_FOLLOWUP", "NEXT_TOPIC", "INCREASE_DIFFICULTY"]
+        return json.dumps({
+            "correctness_score": score,
+            "depth_level": ["poor", "basic", "good"][seed % 3],
+            "follow_up_needed": score < 1.0,
+            "decision": decisions[seed % 3]
+        })
+
+    if "interview decision engine" in prompt:
+        decisions = ["ASK_FOLLOWUP", "NEXT_TOPIC", "INCREASE_DIFFICULTY"]
+        return json.dumps({"decision": decisions[seed % len(decisions)]})
+
+    if "strict technical evaluator" in prompt:
+        score = [0.0, 0.5, 1.0][seed % 3]
+        depth = ["poor", "basic", "good"][seed % 3]
+        return json.dumps({
+            "correctness_score": score,
+            "depth_level": depth,
+            "follow_up_needed": score < 1.0
+        })
+
+    return FAKE_QUESTIONS[seed % len(FAKE_QUESTIONS)]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model returning fake_reply(prompt) after `latency` seconds.
+    """
+
+    latency: float = 0.0
+    model_name: str = "fake-llm"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _prompt(self, messages: List[BaseMessage]) -> str:
+        return "\n".join(str(message.content) for message in messages)
+
+    def _result(self, prompt: str) -> ChatResult:
+        reply = fake_reply(prompt)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(reply) // 4}
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=reply))],
+            llm_output={"token_usage": usage, "model_name": self.model_name}
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(self._prompt(messages))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(self._prompt(messages))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        words = fake_reply(self._prompt(messages)).split(" ")
+        for word in words:
+            time.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        words = fake_reply(self._prompt(messages)).split(" ")
+        for word in words:
+            await asyncio.sleep(self.latency / len(words))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+class FakeSentenceTransformer:
+    """
+    encode() returns unit vectors seeded by the text, after
+    batch_latency + per_text_latency * len(texts) seconds.
+    """
+
+    def __init__(self, dim: int = 384, batch_latency: float = 0.0, per_text_latency: float = 0.0):
+        self.dim = dim
+        self.batch_latency = batch_latency
+        self.per_text_latency = per_text_latency
+
+    def _vector(self, text: str) -> np.ndarray:
+        rng = np.random.default_rng(_digest(" ".join(text.lower().split())))
+        vector = rng.standard_normal(self.dim).astype("float32")
+        return vector / np.linalg.norm(vector)
+
+    def encode(self, texts, batch_size: Optional[int] = None, **kwargs: Any) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+
+        time.sleep(self.batch_latency + self.per_text_latency * len(texts))
+
+        vectors = np.stack([self._vector(text) for text in texts])
+        return vectors[0] if single else vectors
+
+
+def install_fakes(
+        llm_latency: float = 0.0,
+        embed_batch_latency: float = 0.0,
+        embed_per_text_latency: float = 0.0
+):
+    """
+    Point every agent and the memory service at the fakes.
+    """
+    from app.agents import assessment_agent, evaluation_agent
+    from app.services import llm_service
+    from app.services.memory_service import memory_service
+
+    # fakes still go through the shared limiter and retries; the agents'
+    # chains are rebuilt on their next use
+    llm_service.set_model_factory(
+        lambda model, callbacks, **kwargs: FakeChatModel(
+            latency=llm_latency, model_name=model, callbacks=callbacks
+        )
+    )
+
+    memory_service._embedder = FakeSentenceTransformer(
+        memory_service.embedding_dim, embed_batch_latency, embed_per_text_latency
+    )
+    memory_service.embedding_cache.memory.clear()
+    evaluation_agent.evaluation_cache.clear()
+    evaluation_agent.semantic_cache.clear()
+    assessment_agent.assessment_caches.clear()
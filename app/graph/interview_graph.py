@@ -1,76 +1,512 @@
 #interview_graph.py
-from langgraph.graph import StateGraph, END
-from app.models.interview_state import InterviewState , InterviewStatus , DecisionType
-from app.agents.evaluation_agent import evaluate_knowledge
-from app.agents.decision_agent import decide_next_step
-from app.agents.question_agent import generate_question
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph, END
+from app.models.interview_state import GraphState , InterviewStatus , DecisionType
+from app.agents.evaluation_agent import (
+    evaluate_knowledge,
+    aevaluate_knowledge,
+    lookup_evaluation,
+    alookup_evaluation,
+    remember_evaluation,
+    EvaluationOutput,
+)
+from app.agents.assessment_agent import assess_answer, aassess_answer, assessment_caches
+from app.agents.decision_agent import (
+    decide_next_step,
+    adecide_next_step,
+    apply_decision_rules,
+)
+from app.agents.question_agent import (
+    generate_question,
+    agenerate_question,
+    astream_question,
+    FOLLOWUP_FOCUS,
+    NEW_TOPIC_FOCUS,
+)
+from app.services.checkpointer import create_checkpointer
+from app.services.context_builder import build_question_context, relevant_query
+from app.services.memory_service import memory_service
+from app.services.question_bank import get_question_bank, next_difficulty
+from app.utils.config import (
+    DECISION_MODE,
+    EVALUATION_MODE,
+    QUESTION_CONTEXT_TOP_K,
+    SPECULATIVE_QUESTIONS,
+    SPECULATION_MAX_WORKERS,
+)
+from app.utils.metrics import timed, timed_node, increment
+
+
+# Every node has a sync and an async variant. graph.invoke() runs the sync
+# ones, graph.ainvoke() the async ones, so the websocket never blocks the loop.
+# Nodes work on a GraphState and return only the fields they changed.
+
+def _updates(state: GraphState, *fields: str) -> dict:
+    return {name: getattr(state, name) for name in fields}
 
 # NODE 1 : evaluate answer
-def evaluate_answer_node(state: InterviewState)-> InterviewState:
-    evaluation = evaluate_knowledge(
-        {
+# With EVALUATION_MODE=merged the evaluation and the LLM decision come from
+# one call (assessment_agent); the decision is stored on the state and the
+# decision node uses it wherever it would otherwise have called the model.
+# DECISION_MODE=rules never uses the model's decision, so there the plain
+# evaluation prompt is asked instead.
+def _evaluation_mode() -> str:
+    if EVALUATION_MODE == "merged" and DECISION_MODE != "rules":
+        return "merged"
+    return "separate"
+
+def _evaluation_context(state: GraphState) -> dict:
+    if _evaluation_mode() != "merged":
+        return {
             "question": state.current_question,
             "answer": state.candidate_answer
         }
+
+    return {
+        "question": state.current_question,
+        "answer": state.candidate_answer,
+        "confidence_score": state.confidence_score,
+        "emotion_state": state.emotion_state,
+        "topics_covered": state.topics_covered,
+        # the round this answer completes, as the decision node will see it
+        "interview_round": state.interview_round + 1,
+        "max_rounds": state.max_rounds
+    }
+
+def _evaluate(state: GraphState):
+    """
+    Returns (evaluation dict, LLM decision or None).
+    """
+    context = _evaluation_context(state)
+    if _evaluation_mode() != "merged":
+        return evaluate_knowledge(context).model_dump(), None
+
+    # a cached assessment still wins: the decision node then only calls
+    # the model if DECISION_MODE needs it
+    lookup = lookup_evaluation(context, assessment_caches)
+    if lookup.evaluation is not None:
+        return lookup.evaluation.model_dump(), None
+
+    assessment = assess_answer(context)
+    remember_evaluation(
+        context, lookup, EvaluationOutput(**assessment.evaluation()), assessment_caches
     )
+    return assessment.evaluation(), assessment.decision
+
+async def _aevaluate(state: GraphState):
+    context = _evaluation_context(state)
+    if _evaluation_mode() != "merged":
+        return (await aevaluate_knowledge(context)).model_dump(), None
+
+    lookup = await alookup_evaluation(context, assessment_caches)
+    if lookup.evaluation is not None:
+        return lookup.evaluation.model_dump(), None
 
+    assessment = await aassess_answer(context)
+    remember_evaluation(
+        context, lookup, EvaluationOutput(**assessment.evaluation()), assessment_caches
+    )
+    return assessment.evaluation(), assessment.decision
+
+EVALUATION_FIELDS = ("knowledge_evaluation", "decision", "interview_round")
+
+def _apply_evaluation(state: GraphState, evaluation: dict, decision=None) -> GraphState:
     #state.knowledge_evaluation = evaluation
-    state.knowledge_evaluation = evaluation.model_dump()
+    state.knowledge_evaluation = evaluation
+    # the previous turn's decision must not leak into this one
+    state.decision = DecisionType(decision).value if decision is not None else None
 
     state.interview_round += 1
 
     return state
 
+@timed_node("evaluate_answer")
+def evaluate_answer_node(state: GraphState)-> dict:
+    with timed(f"evaluation.{_evaluation_mode()}"):
+        evaluation, decision = _evaluate(state)
+    return _updates(_apply_evaluation(state, evaluation, decision), *EVALUATION_FIELDS)
+
+@timed_node("evaluate_answer")
+async def aevaluate_answer_node(state: GraphState)-> dict:
+    with timed(f"evaluation.{_evaluation_mode()}"):
+        evaluation, decision = await _aevaluate(state)
+    return _updates(_apply_evaluation(state, evaluation, decision), *EVALUATION_FIELDS)
+
 # NODE 2 : decision making
-def decision_node(state: InterviewState)-> InterviewState:
+def _decision_context(state: GraphState) -> dict:
+    return {
+        "knowledge_evaluation": state.knowledge_evaluation,
+        "confidence_score": state.confidence_score,
+        "emotion_state": state.emotion_state,
+        "topics_covered": state.topics_covered,
+        "interview_round": state.interview_round,
+        "max_rounds": state.max_rounds
+    }
+
+def _needs_llm_decision(context: dict):
+    """
+    Returns (needs_llm, rule_decision) for the configured DECISION_MODE.
+    """
+    if DECISION_MODE == "llm":
+        return True, None
+
+    rule_decision = apply_decision_rules(context)
+    needs_llm = DECISION_MODE == "hybrid" and rule_decision.ambiguous
+    return needs_llm, rule_decision
+
+@timed_node("decide")
+def decision_node(state: GraphState)-> dict:
 
     if state.interview_round >= state.max_rounds:
-        state.decision = DecisionType.END_INTERVIEW
-        return state
+        return {"decision": DecisionType.END_INTERVIEW.value}
 
-    decision_result = decide_next_step(
-        {
-            "knowledge_evaluation": state.knowledge_evaluation,
-            "confidence_score": state.confidence_score,
-            "emotion_state": state.emotion_state,
-            "topics_covered": state.topics_covered,
-            "interview_round": state.interview_round,
-            "max_rounds": state.max_rounds
-        }
-    )
+    context = _decision_context(state)
+
+    with timed(f"decision.{DECISION_MODE}"):
+        needs_llm, rule_decision = _needs_llm_decision(context)
+        if not needs_llm:
+            decision = rule_decision.decision
+        elif state.decision is not None:
+            # already decided by the merged assessment call
+            decision = state.decision
+        else:
+            decision = decide_next_step(context).decision
 
     # state.decision = DecisionType(decision_result["decision"])
-    state.decision = DecisionType(decision_result.decision)
-    return state
+    return {"decision": DecisionType(decision).value}
+
+@timed_node("decide")
+async def adecision_node(state: GraphState)-> dict:
+
+    if state.interview_round >= state.max_rounds:
+        return {"decision": DecisionType.END_INTERVIEW.value}
+
+    context = _decision_context(state)
+
+    with timed(f"decision.{DECISION_MODE}"):
+        needs_llm, rule_decision = _needs_llm_decision(context)
+        if not needs_llm:
+            decision = rule_decision.decision
+        elif state.decision is not None:
+            decision = state.decision
+        else:
+            decision = (await adecide_next_step(context)).decision
+
+    return {"decision": DecisionType(decision).value}
 
 # NODE 3 : Question generation
-def question_generation_node(state: InterviewState)-> InterviewState:
-    question = generate_question(
-        {
-            "previous_questions": state.past_questions,
-            "answer_summary": state.knowledge_evaluation,
-            "covered_topics": state.topics_covered,
-            "difficulty_level": "easy"  # can evolve later
-        }
+# Topic switches are served from the question bank when it has a question
+# for an uncovered topic at the current difficulty; the model is only asked
+# for follow-ups and when the bank runs out.
+BANK_DECISIONS = {DecisionType.NEXT_TOPIC.value, DecisionType.INCREASE_DIFFICULTY.value}
+# topic recorded for a topic switch the model made up: the next answer is
+# then not filed under the previous topic
+GENERATED_TOPIC = "general"
+
+def _question_context(state: GraphState, relevant=()) -> dict:
+    context = build_question_context(
+        state.past_questions,
+        state.topics_covered,
+        state.knowledge_evaluation,
+        state.weak_topics,
+        relevant
+    )
+    context["difficulty_level"] = state.difficulty_level
+    return context
+
+def _relevant_history(state: GraphState) -> list:
+    if QUESTION_CONTEXT_TOP_K <= 0:
+        return []
+    return memory_service.get_relevant_context(
+        state.candidate_id,
+        relevant_query(state.candidate_answer, state.current_question),
+        QUESTION_CONTEXT_TOP_K
+    )
+
+async def _arelevant_history(state: GraphState) -> list:
+    if QUESTION_CONTEXT_TOP_K <= 0:
+        return []
+    return await memory_service.aget_relevant_context(
+        state.candidate_id,
+        relevant_query(state.candidate_answer, state.current_question),
+        QUESTION_CONTEXT_TOP_K
     )
 
+def _raises_difficulty(decision, difficulty: str) -> bool:
+    # False at the top level, where the difficulty saturates
+    return (
+        decision == DecisionType.INCREASE_DIFFICULTY
+        and next_difficulty(difficulty) != difficulty
+    )
+
+def _advance_difficulty(state: GraphState) -> bool:
+    if not _raises_difficulty(state.decision, state.difficulty_level):
+        return False
+    state.difficulty_level = next_difficulty(state.difficulty_level)
+    return True
+
+def _pick_bank_question(state: GraphState):
+    return get_question_bank().pick(
+        state.candidate_id,
+        state.difficulty_level,
+        state.topics_covered,
+        state.past_questions
+    )
+
+def _bank_question(state: GraphState) -> Optional[str]:
+    if state.decision not in BANK_DECISIONS:
+        return None
+
+    picked = _pick_bank_question(state)
+    if picked is None:
+        increment("question_bank.misses")
+        return None
+
+    increment("question_bank.served")
+    state.topics_covered = state.topics_covered + [picked.topic]
+    return picked.question
+
+def _record_generated_topic(state: GraphState):
+    if state.decision == DecisionType.NEXT_TOPIC:
+        state.topics_covered = state.topics_covered + [GENERATED_TOPIC]
+
+def _next_question(state: GraphState) -> Optional[str]:
+    """
+    The bank or a speculative candidate, if either can serve this decision.
+    """
+    raised = _advance_difficulty(state)
+
+    question = _bank_question(state)
+    if question is not None or raised:
+        # candidates were generated at the previous difficulty
+        _discard_candidates(state)
+        return question
+
+    question = _take_candidate(state)
+    if question is not None:
+        _record_generated_topic(state)
+    return question
+
+QUESTION_FIELDS = (
+    "next_question",
+    "current_question",
+    "past_questions",
+    "topics_covered",
+    "difficulty_level",
+    "question_candidates",
+)
+
+def _apply_question(state: GraphState, question: str) -> dict:
     state.next_question = question
     state.current_question = question
-    state.past_questions.append(question)
-
-    return state
+    state.past_questions = state.past_questions + [question]
+
+    return _updates(state, *QUESTION_FIELDS)
+
+@timed_node("generate_question")
+def question_generation_node(state: GraphState)-> dict:
+    question = _next_question(state)
+    if question is None:
+        question = generate_question(_question_context(state, _relevant_history(state)))
+        _record_generated_topic(state)
+    return _apply_question(state, question)
+
+@timed_node("generate_question")
+async def aquestion_generation_node(
+        state: GraphState,
+        config: RunnableConfig
+)-> dict:
+    # optional async callback receiving question text as it is generated
+    on_delta = config.get("configurable", {}).get("on_question_delta")
+
+    question = _next_question(state)
+    if question is not None:
+        if on_delta is not None:
+            await on_delta(question)
+    else:
+        context = _question_context(state, await _arelevant_history(state))
+        if on_delta is not None:
+            question = await astream_question(context, on_delta)
+        else:
+            question = await agenerate_question(context)
+        _record_generated_topic(state)
+
+    return _apply_question(state, question)
 
 # NODE 4 : End interview
-def end_interview_node(state: InterviewState)-> InterviewState:
-    state.interview_status = InterviewStatus.ENDED
+@timed_node("end_interview")
+def end_interview_node(state: GraphState)-> dict:
+    _discard_candidates(state)
+    state.interview_status = InterviewStatus.ENDED.value
     state.next_question = None
 
-    return state
+    return _updates(state, "question_candidates", "interview_status", "next_question")
+
+
+# SPECULATIVE MODE
+# Candidate questions for the follow-up and next-topic branches are generated
+# while the answer is being evaluated; the decision then just picks one.
+# As soon as the evaluation is known the rule engine predicts the branch and
+# the other candidate is cancelled. Metrics: speculation.candidates / used /
+# wasted / miss / failed.
+
+SPECULATIVE_BRANCHES = {
+    DecisionType.ASK_FOLLOWUP.value: FOLLOWUP_FOCUS,
+    DecisionType.NEXT_TOPIC.value: NEW_TOPIC_FOCUS,
+}
+
+_speculation_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_speculation_pool() -> ThreadPoolExecutor:
+    global _speculation_pool
+
+    if _speculation_pool is None:
+        with _compiled_graph_lock:
+            if _speculation_pool is None:
+                _speculation_pool = ThreadPoolExecutor(
+                    max_workers=SPECULATION_MAX_WORKERS,
+                    thread_name_prefix="speculation"
+                )
+
+    return _speculation_pool
+
+def _candidate_branch(decision) -> Optional[str]:
+    if decision == DecisionType.ASK_FOLLOWUP:
+        return DecisionType.ASK_FOLLOWUP.value
+    if decision in (DecisionType.NEXT_TOPIC, DecisionType.INCREASE_DIFFICULTY):
+        return DecisionType.NEXT_TOPIC.value
+    return None
+
+def _candidate_context(state: GraphState, focus: str) -> dict:
+    # no memory lookup: candidates are generated before the evaluation and
+    # have to be quick
+    context = _question_context(state)
+    context["answer_summary"] = f"(not evaluated yet) {state.candidate_answer}"
+    context["focus"] = focus
+    return context
+
+def _speculative_branches(state: GraphState) -> dict:
+    # no need to generate a next-topic candidate the bank can serve
+    if _pick_bank_question(state) is None:
+        return SPECULATIVE_BRANCHES
+    return {
+        branch: focus for branch, focus in SPECULATIVE_BRANCHES.items()
+        if branch != DecisionType.NEXT_TOPIC.value
+    }
+
+def _branches_to_keep(state: GraphState) -> set[str]:
+    # called right after the evaluation, before the decision node runs
+    if state.interview_round >= state.max_rounds:
+        return set()
+
+    needs_llm, rule_decision = _needs_llm_decision(_decision_context(state))
+    if needs_llm and state.decision is None:
+        return set(SPECULATIVE_BRANCHES)
+
+    decision = state.decision if needs_llm else rule_decision.decision
+    if _raises_difficulty(decision, state.difficulty_level):
+        # the next question is asked a level up, the candidates are not
+        return set()
+
+    branch = _candidate_branch(decision)
+    return {branch} if branch else set()
+
+@timed_node("evaluate_answer")
+def speculative_evaluate_node(state: GraphState)-> dict:
+    pool = _get_speculation_pool()
+    futures = {
+        branch: pool.submit(generate_question, _candidate_context(state, focus))
+        for branch, focus in _speculative_branches(state).items()
+    }
+    increment("speculation.candidates", len(futures))
+
+    try:
+        evaluation, decision = _evaluate(state)
+    except Exception:
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    state = _apply_evaluation(state, evaluation, decision)
+    keep = _branches_to_keep(state)
+
+    candidates = {}
+    for branch, future in futures.items():
+        if branch not in keep:
+            future.cancel()
+            increment("speculation.wasted")
+            continue
+        try:
+            candidates[branch] = future.result()
+        except Exception:
+            increment("speculation.failed")
+
+    state.question_candidates = candidates
+    return _updates(state, *EVALUATION_FIELDS, "question_candidates")
+
+@timed_node("evaluate_answer")
+async def aspeculative_evaluate_node(state: GraphState)-> dict:
+    tasks = {
+        branch: asyncio.create_task(
+            agenerate_question(_candidate_context(state, focus))
+        )
+        for branch, focus in _speculative_branches(state).items()
+    }
+    increment("speculation.candidates", len(tasks))
+
+    try:
+        evaluation, decision = await _aevaluate(state)
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    state = _apply_evaluation(state, evaluation, decision)
+    keep = _branches_to_keep(state)
+
+    candidates = {}
+    for branch, task in tasks.items():
+        if branch not in keep:
+            task.cancel()
+            increment("speculation.wasted")
+            continue
+        try:
+            candidates[branch] = await task
+        except Exception:
+            increment("speculation.failed")
+
+    state.question_candidates = candidates
+    return _updates(state, *EVALUATION_FIELDS, "question_candidates")
+
+def _take_candidate(state: GraphState) -> Optional[str]:
+    candidates = state.question_candidates
+    if not candidates:
+        return None
+
+    question = candidates.get(_candidate_branch(state.decision))
+    if question is None:
+        # the decision disagreed with the prediction (llm / hybrid mode)
+        increment("speculation.miss")
+    else:
+        increment("speculation.used")
+
+    increment("speculation.wasted", len(candidates) - (question is not None))
+    state.question_candidates = {}
+    return question
+
+def _discard_candidates(state: GraphState):
+    if state.question_candidates:
+        increment("speculation.wasted", len(state.question_candidates))
+        state.question_candidates = {}
 
 
 #routes
-def route_decision(state: InterviewState)-> str:
+def route_decision(state: GraphState)-> str:
     if state.decision == DecisionType.END_INTERVIEW:
         return "end_interview"
     
@@ -78,12 +514,29 @@ def route_decision(state: InterviewState)-> str:
 
 
 # Building graph and compilation
-def build_interview_graph():
-    graph = StateGraph(InterviewState)
-
-    graph.add_node("evaluate_answer", evaluate_answer_node)
-    graph.add_node("decide", decision_node)
-    graph.add_node("generate_question", question_generation_node)
+def build_interview_graph(
+        speculative: bool = SPECULATIVE_QUESTIONS,
+        state_schema=GraphState,
+        checkpointer=None
+):
+    # state_schema=InterviewState is only for comparing against the validated
+    # model (see benchmarks/bench_graph_state.py). With a checkpointer, runs
+    # need a thread_id (the session id, see services/checkpointer.py)
+    graph = StateGraph(state_schema)
+
+    if speculative:
+        evaluate = RunnableLambda(
+            speculative_evaluate_node, afunc=aspeculative_evaluate_node
+        )
+    else:
+        evaluate = RunnableLambda(evaluate_answer_node, afunc=aevaluate_answer_node)
+
+    graph.add_node("evaluate_answer", evaluate)
+    graph.add_node("decide", RunnableLambda(decision_node, afunc=adecision_node))
+    graph.add_node(
+        "generate_question",
+        RunnableLambda(question_generation_node, afunc=aquestion_generation_node)
+    )
     graph.add_node("end_interview", end_interview_node)
 
     graph.set_entry_point("evaluate_answer")
@@ -103,7 +556,22 @@ def build_interview_graph():
     graph.add_edge("end_interview", END)
 
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+# process-wide compiled graph, shared by every session
+_compiled_graph = None
+_compiled_graph_lock = threading.Lock()
+
+def get_interview_graph():
+    global _compiled_graph
+
+    if _compiled_graph is None:
+        with _compiled_graph_lock:
+            if _compiled_graph is None:
+                _compiled_graph = build_interview_graph(checkpointer=create_checkpointer())
+
+    return _compiled_graph
 
 
 
@@ -1,15 +1,94 @@
 # app/main.py
 
+import asyncio
+
 from fastapi import FastAPI
 from app.api.websocket_routes import router as websocket_router
 from app.api.interview_routes import router as interview_router
+from app.api.metrics_routes import router as metrics_router
+from app.utils.config import (
+    WARMUP_ON_STARTUP,
+    MEMORY_STORE_DIR,
+    SESSION_SWEEP_INTERVAL,
+)
+from app.utils.logger import get_logger
 
 app = FastAPI()
 
 app.include_router(interview_router)
 app.include_router(websocket_router)
+app.include_router(metrics_router)
+
+logger = get_logger(__name__)
 
 @app.on_event("startup")
 def debug_routes():
     for route in app.routes:
-        print(route.path)
+        # newer FastAPI versions also list included routers, which have no path
+        if hasattr(route, "path"):
+            logger.info("route %s", route.path)
+
+
+def warm_up():
+    """
+    Build everything that is otherwise created lazily on the first turn.
+    """
+    from app.agents.assessment_agent import get_assessment_chain
+    from app.agents.decision_agent import get_decision_chain
+    from app.agents.evaluation_agent import get_evaluation_chain
+    from app.agents.question_agent import get_question_chain
+    from app.graph.interview_graph import get_interview_graph
+    from app.services.memory_service import memory_service
+
+    get_evaluation_chain()
+    get_assessment_chain()
+    get_decision_chain()
+    get_question_chain()
+    get_interview_graph()
+    memory_service.warm_up()
+
+@app.on_event("startup")
+async def warm_up_on_startup():
+    if WARMUP_ON_STARTUP:
+        await asyncio.to_thread(warm_up)
+
+@app.on_event("startup")
+def load_memory_store():
+    if MEMORY_STORE_DIR:
+        from app.services.memory_service import memory_service
+        memory_service.load(MEMORY_STORE_DIR)
+
+@app.on_event("shutdown")
+def stop_embedding_batcher():
+    # before saving, so embeddings still queued reach the memory first
+    from app.services.memory_service import memory_service
+    memory_service.batcher.shutdown(timeout=5.0)
+
+@app.on_event("shutdown")
+def save_memory_store():
+    if MEMORY_STORE_DIR:
+        from app.services.memory_service import memory_service
+        memory_service.save(MEMORY_STORE_DIR)
+
+async def sweep_sessions_forever():
+    from app.services.orchestrator_registry import orchestrator
+
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await asyncio.to_thread(orchestrator.sweep_sessions)
+        except Exception:
+            logger.exception("Session sweep failed")
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    app.state.session_sweeper = asyncio.create_task(sweep_sessions_forever())
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    app.state.session_sweeper.cancel()
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    from app.services.llm_service import aclose_http_clients
+    await aclose_http_clients()
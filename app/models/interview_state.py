@@ -1,4 +1,5 @@
 #interview_state.py
+from dataclasses import field, make_dataclass
 from enum import Enum
 from typing import List, Optional , Any , Dict
 from pydantic import BaseModel, Field
@@ -25,19 +26,81 @@ class InterviewState(BaseModel):
     past_questions: List[str] = Field(default_factory=list)
 
     knowledge_evaluation: Dict[str, Any] = Field(default_factory=dict)
+    # from the session's memory, refreshed after every turn
+    weak_topics: List[str] = Field(default_factory=list)
+    candidate_profile: Dict[str, Any] = Field(default_factory=dict)
     confidence_score: float = 0.5
     emotion_state: str = "calm"
 
     topics_covered: List[str] = Field(default_factory=list)
+    # "easy" -> "medium" -> "hard", raised on INCREASE_DIFFICULTY
+    difficulty_level: str = "easy"
 
     decision: Optional[DecisionType] = None
     next_question : Optional[str] = None
 
+    # speculative questions keyed by the decision branch they serve
+    question_candidates: Dict[str, str] = Field(default_factory=dict)
+
     class Config:
         validate_assignment = True
         use_enum_values = True
 
 
+def _plain(value):
+    # use_enum_values does not apply to defaults, which stay enum members
+    return value.value if isinstance(value, Enum) else value
+
+
+def _graph_state_fields() -> list:
+    # one dataclass field per model field, same defaults, so the two can
+    # not drift apart (test_graph_state_mirrors_interview_state)
+    required, optional = [], []
+    for name, info in InterviewState.model_fields.items():
+        if info.default_factory is not None:
+            optional.append((name, info.annotation, field(default_factory=info.default_factory)))
+        elif info.is_required():
+            required.append((name, info.annotation))
+        else:
+            optional.append((name, info.annotation, field(default=_plain(info.default))))
+    return required + optional
+
+
+def _from_interview_state(cls, state: InterviewState) -> "GraphState":
+    # shallow: nothing in the graph mutates containers in place
+    return cls(**{name: _plain(getattr(state, name)) for name in cls.__dataclass_fields__})
+
+
+GraphState = make_dataclass(
+    "GraphState",
+    _graph_state_fields(),
+    slots=True,
+    namespace={
+        "__doc__": """
+    Unvalidated mirror of InterviewState used while the graph runs, built
+    from InterviewState's fields.
+
+    InterviewState is validated where data enters (API input, the session
+    store); inside the graph, nodes read and set plain attributes and return
+    only the fields they changed. Enum fields hold their string values and
+    list/dict fields are replaced, never mutated in place, since they are
+    shared with the InterviewState the run started from.
+    """,
+        "__module__": __name__,
+        "from_interview_state": classmethod(_from_interview_state),
+    },
+)
+
+
+def interview_state_from_graph(values: Dict[str, Any]) -> InterviewState:
+    """
+    InterviewState from a graph run's output. The state is validated here,
+    once per turn, rather than on every node input and field assignment
+    inside the graph (model_construct is no cheaper in pydantic 2).
+    """
+    return InterviewState(**values)
+
+
 def create_initial_state(
         candidate_id: str,
         max_rounds: int = 5
@@ -0,0 +1,229 @@
+#batch_evaluation.py
+"""
+Offline scoring of recorded interviews.
+
+The input is JSONL, one answered turn per line:
+
+    {"session_id": "c1", "question": "...", "answer": "...", "topic": "lists"}
+
+(topic and round are optional). Turns skip the graph: cached evaluations
+are reused and the rest go through the evaluation chain's
+abatch_as_completed, at most max_concurrency at a time, so a file costs
+about len(turns) / max_concurrency model latencies rather than len(turns).
+Results stream out as JSONL in completion order, the scored turns are
+bulk-inserted into a MemoryService of the run's own and a profile is
+built per candidate:
+
+    python -m app.services.batch_evaluation --input turns.jsonl \
+        --output scores.jsonl --profiles profiles.json --max-concurrency 16 \
+        --memory-dir offline_memory/
+
+The run's memory is kept apart from the live interviews' one: it has no
+interaction budget, so no candidate is evicted before its profile is
+built, and recorded session ids cannot collide with live sessions.
+
+The per-model limit in llm_service (LLM_MODEL_MAX_CONCURRENCY) still
+applies on top of max_concurrency.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, Iterator, List
+
+from app.agents.evaluation_agent import (
+    _evaluation_inputs,
+    alookup_evaluation,
+    get_evaluation_chain,
+    remember_evaluation,
+)
+from app.services.memory_service import MemoryService, memory_service
+from app.utils.logger import get_logger
+from app.utils.metrics import increment
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+# turns looked up, scored and stored per step; bounds memory on big files
+DEFAULT_CHUNK_SIZE = 500
+
+
+def offline_memory() -> MemoryService:
+    # shares the loaded sentence transformer with the live memory service
+    return MemoryService(max_interactions=sys.maxsize, embedder=memory_service.embedder)
+
+
+def parse_turns(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Turns from JSONL lines. A turn without a round gets the next one of its
+    session, in file order. Raises ValueError / KeyError on a bad line.
+    """
+    rounds: Dict[str, int] = {}
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError(f"line {number} is not a JSON object")
+        session_id = str(item["session_id"])
+        interview_round = item.get("round") or rounds.get(session_id, 0) + 1
+        rounds[session_id] = interview_round
+
+        yield {
+            "session_id": session_id,
+            "question": item.get("question") or "",
+            "answer": item.get("answer") or "",
+            "topic": item.get("topic") or "general",
+            "interview_round": interview_round
+        }
+
+
+def _chunks(turns: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    turns = iter(turns)
+    while chunk := list(islice(turns, size)):
+        yield chunk
+
+
+def _context(turn: dict) -> dict:
+    return {"question": turn["question"], "answer": turn["answer"]}
+
+
+async def ascore_turns(
+        turns: Iterable[dict],
+        memory: MemoryService,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[dict]:
+    """
+    Yields each turn with its "evaluation" (or an "error") as soon as it is
+    scored. Every scored turn is stored in `memory` before the next chunk
+    starts.
+    """
+    chain = get_evaluation_chain()
+
+    for chunk in _chunks(turns, chunk_size):
+        contexts = [_context(turn) for turn in chunk]
+        lookups = await asyncio.gather(*(alookup_evaluation(context) for context in contexts))
+
+        scored = []
+        pending = []
+        for position, (turn, lookup) in enumerate(zip(chunk, lookups)):
+            if lookup.evaluation is None:
+                pending.append(position)
+                continue
+            scored.append({**turn, "evaluation": lookup.evaluation.model_dump()})
+            yield scored[-1]
+
+        inputs = [_evaluation_inputs(contexts[position]) for position in pending]
+        async for i, output in chain.abatch_as_completed(
+            inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+        ):
+            position = pending[i]
+            if isinstance(output, Exception):
+                increment("batch_evaluation.errors")
+                logger.warning("scoring failed for %s: %s", chunk[position]["session_id"], output)
+                yield {**chunk[position], "error": f"{type(output).__name__}: {output}"}
+                continue
+
+            remember_evaluation(contexts[position], lookups[position], output)
+            scored.append({**chunk[position], "evaluation": output.model_dump()})
+            yield scored[-1]
+
+        increment("batch_evaluation.turns", len(chunk))
+        await memory.astore_interactions(scored)
+
+
+def candidate_profiles(memory: MemoryService, session_ids: Iterable[str]) -> Dict[str, dict]:
+    return {
+        session_id: {
+            **memory.summarize_candidate_profile(session_id),
+            "weak_topics": memory.get_weak_topics(session_id)
+        }
+        for session_id in dict.fromkeys(session_ids)
+    }
+
+
+async def astream_jsonl(
+        turns: Iterable[dict],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> AsyncIterator[str]:
+    """
+    JSONL for the API: one line per scored turn, then one
+    {"session_id", "profile"} line per candidate.
+    """
+    # loading the sentence transformer (first use) stays off the event loop
+    memory = await asyncio.to_thread(offline_memory)
+    session_ids = []
+    async for result in ascore_turns(turns, memory, max_concurrency):
+        session_ids.append(result["session_id"])
+        yield json.dumps(result) + "\n"
+
+    for session_id, profile in candidate_profiles(memory, session_ids).items():
+        yield json.dumps({"session_id": session_id, "profile": profile}) + "\n"
+
+
+async def ascore_file(
+        input_path: str,
+        output,
+        memory: MemoryService,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> tuple[int, Dict[str, dict]]:
+    """
+    Score input_path, writing result lines to the output file object as
+    they arrive. Returns the number of turns scored and the candidate
+    profiles.
+    """
+    scored = 0
+    session_ids = []
+    with open(input_path) as f:
+        async for result in ascore_turns(parse_turns(f), memory, max_concurrency, chunk_size):
+            session_ids.append(result["session_id"])
+            scored += "evaluation" in result
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    return scored, candidate_profiles(memory, session_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score recorded interview turns offline.")
+    parser.add_argument("--input", required=True, help="turns (.jsonl)")
+    parser.add_argument("--output", help="scored turns (.jsonl, default: stdout)")
+    parser.add_argument("--profiles", help="per-candidate profiles (.json)")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--memory-dir", help="save the scored turns' memory here (MEMORY_STORE_DIR layout)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    memory = offline_memory()
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        turns, profiles = asyncio.run(
+            ascore_file(args.input, output, memory, args.max_concurrency, args.chunk_size)
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if args.profiles:
+        with open(args.profiles, "w") as f:
+            json.dump(profiles, f, indent=2)
+
+    if args.memory_dir:
+        memory.save(args.memory_dir)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{turns} turns, {len(profiles)} candidates in {elapsed:.1f}s "
+        f"({turns / max(elapsed, 1e-9):.1f} turns/s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#checkpointer.py
+"""
+LangGraph checkpointers for the interview graph, keyed by session id
+(thread_id). A checkpoint is written after every completed node, so a turn
+that fails half way (an LLM timeout in question generation, a worker
+restart with the SQLite backend) can be resumed from the last completed
+node instead of paying for the evaluation again.
+
+Checkpoints only matter while a turn is in flight: the orchestrator drops a
+session's thread once the turn's state is in the session store.
+"""
+import asyncio
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.utils.config import GRAPH_CHECKPOINTER, GRAPH_CHECKPOINT_PATH
+
+
+def session_config(session_id: str, **configurable) -> dict:
+    return {"configurable": {"thread_id": session_id, **configurable}}
+
+
+def _sqlite_saver(path: str) -> BaseCheckpointSaver:
+    # optional dependency: pip install langgraph-checkpoint-sqlite
+    import sqlite3
+
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    class ThreadedSqliteSaver(SqliteSaver):
+        """
+        SqliteSaver with the async interface run on a worker thread, so one
+        compiled graph serves both graph.invoke() and graph.ainvoke().
+        (AsyncSqliteSaver is bound to a single event loop and refuses sync
+        calls from it.)
+        """
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id):
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    saver = ThreadedSqliteSaver(conn)
+    saver.setup()
+    return saver
+
+
+def create_checkpointer(
+        backend: str = GRAPH_CHECKPOINTER,
+        path: Optional[str] = GRAPH_CHECKPOINT_PATH
+) -> Optional[BaseCheckpointSaver]:
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return InMemorySaver()
+    if backend == "sqlite":
+        return _sqlite_saver(path or "checkpoints.db")
+
+    raise ValueError(f"Unknown graph checkpointer backend: {backend}")
@@ -0,0 +1,131 @@
+#context_builder.py
+"""
+Bounded context for the question prompt.
+
+Instead of every past question and the raw evaluation dict, the prompt
+gets a fixed window of recent questions, a one-line digest of the earlier
+ones, a compact answer summary and the most relevant earlier answers from
+the session's memory. The result is trimmed to a token budget, so prompt
+size stays flat however long the interview runs.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.utils.config import (
+    QUESTION_CONTEXT_WINDOW,
+    QUESTION_CONTEXT_TOP_K,
+    QUESTION_CONTEXT_TOKEN_BUDGET,
+)
+from app.utils.metrics import histogram
+
+PROMPT_TOKENS = histogram(
+    "interview_question_context_tokens",
+    "Estimated tokens of each question prompt context built.",
+    buckets=(32, 64, 128, 256, 512, 1024, 2048, 4096)
+)
+
+# answers and questions quoted from memory are cut to this many characters
+SNIPPET_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; good enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def _snippet(text: Optional[str], limit: int = SNIPPET_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _question_window(past_questions: Sequence[str], window: int) -> str:
+    recent = past_questions[-window:] if window > 0 else []
+    return "\n".join(f"- {_snippet(question)}" for question in recent) or "None"
+
+
+def _earlier_digest(past_questions: Sequence[str], window: int, covered_topics: Sequence[str]) -> str:
+    earlier = len(past_questions) - max(window, 0)
+    if earlier <= 0:
+        return ""
+    topics = ", ".join(covered_topics) if covered_topics else "general"
+    return f"(plus {earlier} earlier questions; topics so far: {topics})"
+
+
+def _answer_summary(evaluation: Dict[str, Any], weak_topics: Sequence[str]) -> str:
+    if not evaluation:
+        return "No answer evaluated yet."
+
+    parts = [
+        f"correctness {evaluation.get('correctness_score')}",
+        f"depth {evaluation.get('depth_level')}",
+    ]
+    if evaluation.get("follow_up_needed"):
+        parts.append("follow-up needed")
+    summary = "Last answer: " + ", ".join(parts) + "."
+    if weak_topics:
+        summary += " Weak topics: " + ", ".join(weak_topics) + "."
+    return summary
+
+
+def _relevant_lines(relevant: Sequence[Dict[str, Any]]) -> List[str]:
+    return [
+        f"- Q: {_snippet(item.get('question'), 100)} | A: {_snippet(item.get('answer'))}"
+        f" (score {item.get('correctness_score')})"
+        for item in relevant
+    ]
+
+
+def build_question_context(
+        past_questions: Sequence[str],
+        covered_topics: Sequence[str],
+        evaluation: Dict[str, Any],
+        weak_topics: Sequence[str] = (),
+        relevant: Sequence[Dict[str, Any]] = (),
+        window: int = QUESTION_CONTEXT_WINDOW,
+        token_budget: int = QUESTION_CONTEXT_TOKEN_BUDGET
+) -> Dict[str, str]:
+    """
+    Returns the previous_questions / answer_summary / covered_topics /
+    relevant_history prompt inputs. Over budget, relevant history goes
+    first (least relevant hit first), then the earlier-questions digest,
+    then the question window shrinks down to the last question.
+    """
+    answer_summary = _answer_summary(evaluation, weak_topics)
+    topics = ", ".join(covered_topics) or "None"
+    relevant_lines = _relevant_lines(relevant)
+    include_digest = True
+
+    def render() -> Dict[str, str]:
+        previous = _question_window(past_questions, window)
+        digest = _earlier_digest(past_questions, window, covered_topics) if include_digest else ""
+        if digest:
+            previous += "\n" + digest
+        return {
+            "previous_questions": previous,
+            "answer_summary": answer_summary,
+            "covered_topics": topics,
+            "relevant_history": "\n".join(relevant_lines) or "None",
+        }
+
+    def size(context: Dict[str, str]) -> int:
+        return sum(estimate_tokens(value) for value in context.values())
+
+    context = render()
+    while size(context) > token_budget:
+        if relevant_lines:
+            relevant_lines.pop()
+        elif include_digest and _earlier_digest(past_questions, window, covered_topics):
+            include_digest = False
+        elif window > 1:
+            window -= 1
+        else:
+            break
+        context = render()
+
+    PROMPT_TOKENS.observe(size(context))
+    return context
+
+
+def relevant_query(answer: Optional[str], question: Optional[str]) -> str:
+    # what the next question should build on: the latest exchange
+    return f"{question or ''}\n{answer or ''}".strip()
+
@@ -0,0 +1,177 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.cache import LRUCache, SQLiteKVStore, content_key, normalize_text
+from app.utils.config import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MAX_WAIT_MS,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_DISK_SIZE,
+)
+from app.utils.metrics import EMBEDDING_SECONDS, increment
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by a hash of the model name and the normalized text.
+    An in-memory LRU in front of an optional SQLite file, so repeated
+    questions skip the transformer forward pass, even across restarts. The
+    file keeps the disk_maxsize most recently added embeddings (0: no
+    limit).
+    """
+
+    def __init__(
+            self,
+            model_name: str,
+            maxsize: int = EMBEDDING_CACHE_SIZE,
+            path: Optional[str] = EMBEDDING_CACHE_PATH,
+            disk_maxsize: int = EMBEDDING_CACHE_DISK_SIZE
+    ):
+        self.model_name = model_name
+        self.memory = LRUCache(maxsize)
+        self.disk = (
+            SQLiteKVStore(path, "embeddings", maxrows=disk_maxsize or None) if path else None
+        )
+
+    def key(self, text: str) -> str:
+        return content_key(self.model_name, normalize_text(text))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vector = self.memory.get(key)
+        if vector is None and self.disk is not None:
+            blob = self.disk.get(key)
+            if blob is not None:
+                vector = np.frombuffer(blob, dtype="float32")
+                self.memory.put(key, vector)
+
+        increment("embedding_cache.hits" if vector is not None else "embedding_cache.misses")
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype="float32")
+        self.memory.put(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector.tobytes())
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batches embedding requests from every session.
+
+    Callers submit single texts and get a Future back. A dedicated worker
+    thread waits up to max_wait_ms for more requests (or until batch_size is
+    reached), encodes them with one forward pass and resolves each future
+    with its own row. shutdown() stops the worker once everything already
+    submitted is encoded.
+    """
+
+    def __init__(
+            self,
+            encode_batch: Callable[[List[str]], np.ndarray],
+            batch_size: int = EMBEDDING_BATCH_SIZE,
+            max_wait_ms: float = EMBEDDING_MAX_WAIT_MS
+    ):
+        self.encode_batch = encode_batch
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000
+
+        # (text, future) requests; None, put by shutdown(), is always last
+        self._queue: "queue.Queue[Optional[tuple[str, Future]]]" = queue.Queue()
+        self._worker = None
+        # guards _worker and _closed, and orders submits before the None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+        self._stopping = False
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        with self._worker_lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is shut down")
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+            self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        futures = [self.submit(text) for text in texts]
+        return np.stack([future.result() for future in futures])
+
+    async def aembed(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Encode what is already queued, then stop the worker. Later submits
+        raise RuntimeError.
+        """
+        with self._worker_lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+
+        if worker is not None:
+            worker.join(timeout)
+
+    def _next_batch(self) -> list:
+        batch = []
+        deadline = None
+
+        while len(batch) < self.batch_size:
+            if deadline is None:
+                # block for the first request, then wait at most max_wait
+                item = self._queue.get()
+                deadline = time.monotonic() + self.max_wait
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if item is None:
+                self._stopping = True
+                break
+            batch.append(item)
+
+        # drop requests whose caller already gave up
+        return [
+            (text, future) for text, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+
+    def _run(self):
+        while not self._stopping:
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                with EMBEDDING_SECONDS.time():
+                    vectors = self.encode_batch([text for text, _ in batch])
+                increment("embedding.texts", len(batch))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(np.asarray(vector, dtype="float32"))
@@ -0,0 +1,200 @@
+#evaluation_cache.py
+import json
+import random
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.utils.cache import LRUCache, SQLiteKVStore, content_key, normalize_text
+from app.utils.config import (
+    EVALUATION_CACHE_SIZE,
+    EVALUATION_CACHE_PATH,
+    EVALUATION_SEMANTIC_THRESHOLD,
+    EVALUATION_SEMANTIC_CACHE_SIZE,
+    EVALUATION_SEMANTIC_AUDIT_RATE,
+)
+from app.utils.metrics import increment
+
+
+class EvaluationCache:
+    """
+    Evaluation results keyed by a hash of the prompt version and the
+    normalized question and answer. An in-memory LRU in front of an optional
+    SQLite file; values are the plain evaluation dicts.
+
+    The prompt version is part of the key, so changing the evaluation prompt
+    or model never serves results produced by the old one.
+    """
+
+    def __init__(
+            self,
+            prompt_version: str,
+            maxsize: int = EVALUATION_CACHE_SIZE,
+            path: Optional[str] = EVALUATION_CACHE_PATH
+    ):
+        self.prompt_version = prompt_version
+        self.memory = LRUCache(maxsize)
+        self.disk = SQLiteKVStore(path, "evaluations") if path else None
+
+    def key(self, question: str, answer: str) -> str:
+        return content_key(
+            self.prompt_version, normalize_text(question or ""), normalize_text(answer or "")
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        evaluation = self.memory.get(key)
+        if evaluation is None and self.disk is not None:
+            blob = self.disk.get(key)
+            if blob is not None:
+                evaluation = json.loads(blob)
+                self.memory.put(key, evaluation)
+
+        increment("evaluation_cache.hits" if evaluation is not None else "evaluation_cache.misses")
+        return dict(evaluation) if evaluation is not None else None
+
+    def put(self, key: str, evaluation: dict):
+        evaluation = dict(evaluation)
+        self.memory.put(key, evaluation)
+        if self.disk is not None:
+            self.disk.put(key, json.dumps(evaluation).encode("utf-8"))
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype="float32").reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def evaluations_agree(cached: dict, fresh: dict, score_tolerance: float = 0.25) -> bool:
+    """
+    Whether a reused evaluation would have driven the interview the same way
+    as a fresh one.
+    """
+    return (
+        abs(float(cached["correctness_score"]) - float(fresh["correctness_score"])) <= score_tolerance
+        and cached["depth_level"] == fresh["depth_level"]
+        and bool(cached["follow_up_needed"]) == bool(fresh["follow_up_needed"])
+    )
+
+
+class SemanticEvaluationCache:
+    """
+    Evaluations of paraphrased question/answer pairs.
+
+    Each pair is stored as its unit question and answer embeddings; the
+    faiss index (inner product over the two halves, i.e. the mean of both
+    cosines) finds the closest cached pair, which is a hit only if the
+    question AND the answer each reach the threshold. Once maxsize is
+    exceeded the oldest entries are evicted, a tenth of maxsize at a time.
+
+    A fraction (audit_rate) of hits should still be re-evaluated by the
+    model; record_audit counts the ones where the cached result disagrees.
+    """
+
+    def __init__(
+            self,
+            dim: int,
+            threshold: float = EVALUATION_SEMANTIC_THRESHOLD,
+            maxsize: int = EVALUATION_SEMANTIC_CACHE_SIZE,
+            audit_rate: float = EVALUATION_SEMANTIC_AUDIT_RATE
+    ):
+        self.dim = dim
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.audit_rate = audit_rate
+
+        # built on first put so importing never loads faiss
+        self._index = None
+        # id -> (question vector, answer vector, evaluation), oldest first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pair_vector(self, question_vector: np.ndarray, answer_vector: np.ndarray) -> np.ndarray:
+        # halves scaled so the inner product is the mean of the two cosines
+        return np.concatenate([_unit(question_vector), _unit(answer_vector)]) / np.sqrt(2)
+
+    def get(self, question_vector: np.ndarray, answer_vector: np.ndarray) -> Optional[dict]:
+        question_vector, answer_vector = _unit(question_vector), _unit(answer_vector)
+        query = self.pair_vector(question_vector, answer_vector)[None, :]
+
+        evaluation = None
+        with self._lock:
+            if self._index is not None and self._index.ntotal:
+                _, ids = self._index.search(query, 1)
+                entry = self._entries.get(int(ids[0][0]))
+                if entry is not None:
+                    cached_question, cached_answer, cached = entry
+                    if (float(cached_question @ question_vector) >= self.threshold
+                            and float(cached_answer @ answer_vector) >= self.threshold):
+                        evaluation = cached
+
+        increment(
+            "evaluation_semantic_cache.hits" if evaluation is not None
+            else "evaluation_semantic_cache.misses"
+        )
+        return dict(evaluation) if evaluation is not None else None
+
+    def put(self, question_vector: np.ndarray, answer_vector: np.ndarray, evaluation: dict):
+        if self.maxsize <= 0:
+            return
+        import faiss
+
+        question_vector, answer_vector = _unit(question_vector), _unit(answer_vector)
+        vector = self.pair_vector(question_vector, answer_vector)[None, :]
+
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(2 * self.dim))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = (question_vector, answer_vector, dict(evaluation))
+
+            if len(self._entries) > self.maxsize:
+                # remove_ids compacts the whole index, so evict a tenth at once
+                keep = self.maxsize - max(1, self.maxsize // 10)
+                evicted = []
+                while len(self._entries) > keep:
+                    evicted.append(self._entries.popitem(last=False)[0])
+                self._index.remove_ids(np.array(evicted, dtype="int64"))
+
+    def should_audit(self) -> bool:
+        return random.random() < self.audit_rate
+
+    def record_audit(self, cached: dict, fresh: dict) -> bool:
+        agreed = evaluations_agree(cached, fresh)
+        increment("evaluation_semantic_cache.audits")
+        if not agreed:
+            increment("evaluation_semantic_cache.false_hits")
+        return agreed
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._entries.clear()
+
+
+class EvaluationCaches(NamedTuple):
+    """
+    The exact and the semantic cache of one prompt. Each prompt producing
+    evaluations gets its own pair, so results of one never serve the other.
+    """
+    exact: EvaluationCache
+    semantic: SemanticEvaluationCache
+
+    def clear(self):
+        self.exact.clear()
+        self.semantic.clear()
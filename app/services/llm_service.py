@@ -0,0 +1,452 @@
+#llm_service.py
+"""
+Shared LLM access for all agents.
+
+Every agent gets its chat model from get_chat_model(), which puts the model
+behind one pooled HTTP client (sync and async), a global and a per-model cap
+on in-flight calls, a per-call timeout and retries with jittered exponential
+backoff that honour the provider's retry-after on 429s. The Groq client's own
+retries are disabled so a rate-limited call is retried in exactly one place.
+Chain builders that hold a model are decorated with cached_chain, so they are
+rebuilt along with the models.
+"""
+import asyncio
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable
+
+from app.utils.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_MODEL_MAX_CONCURRENCY,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    LLM_TIMEOUT,
+)
+from app.utils.logger import get_logger
+from app.utils.metrics import LLM_CALL_SECONDS, LLM_RETRIES, LLM_TOKENS, increment
+
+logger = get_logger(__name__)
+
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Records latency and token usage of every call made by one agent's model.
+    """
+
+    def __init__(self, agent: str, model: str):
+        self.agent = agent
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_CALL_SECONDS.observe(
+                time.perf_counter() - started, agent=self.agent, model=self.model
+            )
+
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_TOKENS.inc(prompt_tokens, agent=self.agent, model=self.model, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, agent=self.agent, model=self.model, type="completion")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._started.pop(run_id, None)
+        increment(f"llm.errors.{self.agent}")
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+
+    # streaming / newer integrations report usage on the message instead
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            metadata = getattr(message, "usage_metadata", None) or {}
+            prompt_tokens += metadata.get("input_tokens", 0)
+            completion_tokens += metadata.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+# pooled HTTP clients, shared by every model
+@lru_cache(maxsize=None)
+def get_http_client():
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=LLM_TIMEOUT,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_http_client():
+    import httpx
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=LLM_TIMEOUT,
+    )
+
+
+async def aclose_http_clients():
+    # the cached models hold the clients closed here
+    clear_chat_models()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight LLM calls, over all models and per model.
+
+    Sync calls share one set of thread semaphores. asyncio semaphores belong
+    to the event loop they are first used on, so async calls get a set per
+    loop (in the app that is the single server loop).
+    """
+
+    def __init__(self, global_limit: int, per_model_limit: int):
+        self.global_limit = global_limit
+        self.per_model_limit = per_model_limit
+        self._lock = threading.Lock()
+        self._thread_global = threading.BoundedSemaphore(global_limit)
+        self._thread_models: Dict[str, threading.BoundedSemaphore] = {}
+        self._loop_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def _thread_model(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._thread_models.get(model)
+            if semaphore is None:
+                semaphore = self._thread_models[model] = threading.BoundedSemaphore(
+                    self.per_model_limit
+                )
+            return semaphore
+
+    def _loop_semaphores_for(self, model: str) -> tuple:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._loop_semaphores.get(loop)
+            if semaphores is None:
+                semaphores = self._loop_semaphores[loop] = {
+                    None: asyncio.Semaphore(self.global_limit)
+                }
+            if model not in semaphores:
+                semaphores[model] = asyncio.Semaphore(self.per_model_limit)
+            return semaphores[None], semaphores[model]
+
+    @contextmanager
+    def limit(self, model: str):
+        with self._thread_global, self._thread_model(model):
+            yield
+
+    @asynccontextmanager
+    async def alimit(self, model: str):
+        global_semaphore, model_semaphore = self._loop_semaphores_for(model)
+        async with global_semaphore, model_semaphore:
+            yield
+
+
+limiter = ConcurrencyLimiter(LLM_MAX_CONCURRENCY, LLM_MODEL_MAX_CONCURRENCY)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_reason(error: BaseException) -> Optional[str]:
+    """
+    Why the call is worth retrying ("rate_limit", "server_error", "timeout",
+    "connection"), or None if it is not.
+    """
+    status = _status_code(error)
+    if status == 429:
+        return "rate_limit"
+    if status is not None and (status >= 500 or status == 408):
+        return "server_error"
+    if status is not None:
+        return None
+
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+
+    import httpx
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+
+    try:
+        import groq
+    except ImportError:
+        return None
+    if isinstance(error, groq.APITimeoutError):
+        return "timeout"
+    if isinstance(error, groq.APIConnectionError):
+        return "connection"
+    return None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_delay(attempt: int, error: BaseException) -> float:
+    """
+    Full-jitter exponential backoff; never shorter than the provider's
+    retry-after, but capped at LLM_RETRY_MAX_DELAY so a turn cannot stall.
+    """
+    delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return min(delay, LLM_RETRY_MAX_DELAY)
+
+
+class ManagedChatModel(Runnable):
+    """
+    Wraps a chat model with the shared limiter, timeout and retries. Drops
+    into chains like the model itself (PROMPT | model | parser).
+
+    Every call gets `timeout` seconds of waiting on the model; for a stream
+    that is the time spent waiting for chunks, not in the caller between
+    them. The async calls are cancelled at the deadline. A blocking sync
+    call cannot be interrupted: invoke relies on the HTTP client's timeout
+    (LLM_TIMEOUT on every connect and read, so a stalled connection still
+    fails), and stream also fails once a chunk arrives past the deadline.
+
+    A stream is only retried if it failed before yielding anything, so
+    callers never see a chunk twice.
+    """
+
+    def __init__(self, model: Runnable, model_name: str, max_retries: int = LLM_MAX_RETRIES,
+                 timeout: float = LLM_TIMEOUT):
+        self.model = model
+        self.model_name = model_name
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.name = f"Managed{model.get_name()}"
+
+    @property
+    def InputType(self):
+        return self.model.InputType
+
+    @property
+    def OutputType(self):
+        return self.model.OutputType
+
+    def _should_retry(self, attempt: int, error: BaseException) -> Optional[float]:
+        reason = _retry_reason(error)
+        if reason is None or attempt >= self.max_retries:
+            return None
+
+        LLM_RETRIES.inc(model=self.model_name, reason=reason)
+        delay = retry_delay(attempt, error)
+        logger.warning(
+            "LLM call to %s failed (%s), retry %d/%d in %.2fs",
+            self.model_name, reason, attempt + 1, self.max_retries, delay
+        )
+        return delay
+
+    def invoke(self, input, config=None, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                with limiter.limit(self.model_name):
+                    return self.model.invoke(input, config, **kwargs)
+            except Exception as error:
+                delay = self._should_retry(attempt, error)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                async with limiter.alimit(self.model_name):
+                    return await asyncio.wait_for(
+                        self.model.ainvoke(input, config, **kwargs), self.timeout
+                    )
+            except Exception as error:
+                delay = self._should_retry(attempt, error)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _chunks(self, input, config, **kwargs) -> Iterator:
+        remaining = self.timeout
+        chunks = iter(self.model.stream(input, config, **kwargs))
+        try:
+            while True:
+                waited_from = time.monotonic()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                remaining -= time.monotonic() - waited_from
+                if remaining < 0:
+                    raise TimeoutError(f"{self.model_name} stream took over {self.timeout}s")
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    async def _achunks(self, input, config, **kwargs) -> AsyncIterator:
+        remaining = self.timeout
+        chunks = aiter(self.model.astream(input, config, **kwargs))
+        try:
+            while True:
+                waited_from = time.monotonic()
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), max(remaining, 0))
+                except StopAsyncIteration:
+                    return
+                remaining -= time.monotonic() - waited_from
+                yield chunk
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def stream(self, input, config=None, **kwargs) -> Iterator:
+        attempt = 0
+        while True:
+            started = False
+            try:
+                with limiter.limit(self.model_name):
+                    for chunk in self._chunks(input, config, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as error:
+                delay = None if started else self._should_retry(attempt, error)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def astream(self, input, config=None, **kwargs) -> AsyncIterator:
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with limiter.alimit(self.model_name):
+                    async for chunk in self._achunks(input, config, **kwargs):
+                        started = True
+                        yield chunk
+                return
+            except Exception as error:
+                delay = None if started else self._should_retry(attempt, error)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def _groq_chat_model(model: str, temperature: float, max_tokens: int, callbacks: list):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=LLM_TIMEOUT,
+        max_retries=0,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        callbacks=callbacks,
+    )
+
+
+# builds the underlying chat model; swapped out by set_model_factory
+_model_factory: Callable[..., Runnable] = _groq_chat_model
+
+
+def set_model_factory(factory: Optional[Callable[..., Runnable]] = None):
+    """
+    Build models with factory(model=, temperature=, max_tokens=, callbacks=)
+    from now on (None restores Groq). cached_chain chains are rebuilt; any
+    other holder of an old model keeps it.
+    """
+    global _model_factory
+    _model_factory = factory or _groq_chat_model
+    clear_chat_models()
+
+
+# built on first use, so importing an agent never touches the network
+@lru_cache(maxsize=None)
+def get_chat_model(
+        agent: str,
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.1,
+        max_tokens: int = 100
+) -> ManagedChatModel:
+    chat_model = _model_factory(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        callbacks=[LLMMetricsCallback(agent, model)],
+    )
+    return ManagedChatModel(chat_model, model)
+
+
+_chain_builders: list = []
+
+
+def cached_chain(builder: Callable[[], Runnable]) -> Callable[[], Runnable]:
+    """
+    lru_cache for an agent's chain builder, cleared with the models by
+    set_model_factory and aclose_http_clients.
+    """
+    cached = lru_cache(maxsize=None)(builder)
+    _chain_builders.append(cached)
+    return cached
+
+
+def clear_chat_models():
+    get_chat_model.cache_clear()
+    for builder in _chain_builders:
+        builder.cache_clear()
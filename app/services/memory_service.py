@@ -1,46 +1,233 @@
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Sequence
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
+
+from app.services.embedding_service import EmbeddingBatcher, EmbeddingCache
+from app.services.vector_index import VectorIndex
+from app.utils.config import EMBEDDING_BATCH_SIZE, MEMORY_MAX_INTERACTIONS
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+class SessionMemory:
+    """
+    Interview memory of a single session: its own vector index plus the
+    metadata list aligned with it.
+    """
+
+    def __init__(self, embedding_dim: int, index: VectorIndex | None = None):
+        self.index = index if index is not None else VectorIndex(embedding_dim)
+        self.metadata: List[Dict[str, Any]] = []
+        # question/answer characters held in metadata
+        self.text_bytes = 0
+
+        # running per-topic [score sum, count], updated on every store
+        self.topic_scores: Dict[str, List[float]] = {}
+        # cached profile, invalidated on every store
+        self.profile: Dict[str, Any] | None = None
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def add_score(self, topic: str, score):
+        totals = self.topic_scores.setdefault(topic, [0.0, 0])
+        totals[0] += float(score or 0.0)
+        totals[1] += 1
+        self.profile = None
+
+    def topic_averages(self) -> Dict[str, float]:
+        return {
+            topic: total / count
+            for topic, (total, count) in self.topic_scores.items()
+        }
+
 
 class MemoryService:
+    """
+    Semantic interview memory, partitioned by session id. Every per-turn
+    operation only touches the caller's session. Sessions are dropped when
+    the interview is cleaned up, and the least recently used sessions are
+    evicted once the process holds more than MEMORY_MAX_INTERACTIONS.
+    """
 
-    def __init__(self):
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, max_interactions: int = MEMORY_MAX_INTERACTIONS, embedder=None):
+        # the sentence transformer is loaded on first use (see embedder),
+        # unless one is passed in to share with another instance
+        self._embedder = embedder
+        self._embedder_lock = threading.Lock()
         self.embedding_dim = 384
-        self.index = faiss.IndexFlatL2(self.embedding_dim)
 
-        #metadata store aligned with the faiss index
-        self.metadata: List[Dict[str, Any]] = []
+        # session id -> SessionMemory, least recently used first
+        self.sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self.max_interactions = max_interactions
+        self.total_interactions = 0
+        # sum of the sessions' text_bytes, kept with total_interactions
+        self.total_text_bytes = 0
+        # dropped or evicted since the last save; save() deletes only their
+        # directories, so workers sharing a store do not wipe each other's
+        self._dropped: set = set()
+
+        # encode() runs on the batcher's worker thread, never on the event
+        # loop; the lock guards the session partitions
+        self.batcher = EmbeddingBatcher(self._encode_batch)
+        self.embedding_cache = EmbeddingCache(EMBEDDING_MODEL_NAME)
+        self._lock = threading.Lock()
 
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            with self._embedder_lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._embedder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        return self._embedder
 
-    # embed text
+    def warm_up(self):
+        # load the model and run one forward pass ahead of the first request
+        self._embed("warm up")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.encode(texts, batch_size=len(texts))
+
+    # embed text (1 x dim, as faiss expects), cache first
     def _embed(self, text: str) -> np.ndarray:
-        embedding = self.embedder.encode(text)
+        key = self.embedding_cache.key(text)
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.batcher.embed(text)
+            self.embedding_cache.put(key, embedding)
         
         return np.array([embedding]).astype("float32")
+
+    async def _aembed(self, text: str) -> np.ndarray:
+        key = self.embedding_cache.key(text)
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            embedding = await self.batcher.aembed(text)
+            self.embedding_cache.put(key, embedding)
+
+        return np.array([embedding]).astype("float32")
+
+    # many texts (n x dim), cache first; the misses are encoded in one call
+    # on the caller's thread rather than through the per-request batcher
+    def _embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [self.embedding_cache.key(text) for text in texts]
+        vectors = [self.embedding_cache.get(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self.embedder.encode(
+                [texts[i] for i in missing], batch_size=EMBEDDING_BATCH_SIZE
+            )
+            for i, vector in zip(missing, encoded):
+                self.embedding_cache.put(keys[i], vector)
+                vectors[i] = vector
+
+        return np.asarray(vectors, dtype="float32").reshape(len(texts), self.embedding_dim)
+
+    # single unbatched-shape vector, for callers outside the memory index
+    def embed(self, text: str) -> np.ndarray:
+        return self._embed(text)[0]
+
+    async def aembed(self, text: str) -> np.ndarray:
+        return (await self._aembed(text))[0]
+
+    # session partitions
+    def _get_session(self, session_id: str, create: bool = False):
+        # caller holds self._lock
+        memory = self.sessions.get(session_id)
+        if memory is None and create:
+            memory = SessionMemory(self.embedding_dim)
+            self.sessions[session_id] = memory
+            self._dropped.discard(session_id)
+        if memory is not None:
+            self.sessions.move_to_end(session_id)
+        return memory
+
+    def _enforce_budget(self, *keep_session_ids: str):
+        # caller holds self._lock; evict least recently used sessions first,
+        # never the ones just written to (they are the most recently used)
+        while self.total_interactions > self.max_interactions:
+            victim = next(iter(self.sessions))
+            if victim in keep_session_ids:
+                break
+            self._forget(self.sessions.pop(victim))
+            self._dropped.add(victim)
+
+    def _forget(self, memory: SessionMemory):
+        # caller holds self._lock and has removed memory from self.sessions
+        self.total_interactions -= len(memory)
+        self.total_text_bytes -= memory.text_bytes
+
+    def drop_session(self, session_id: str):
+        with self._lock:
+            memory = self.sessions.pop(session_id, None)
+            if memory is not None:
+                self._forget(memory)
+                self._dropped.add(session_id)
+
+    def resident_bytes(self) -> int:
+        # vectors plus the question/answer text held in metadata (approximate),
+        # from the running totals: read on every /metrics scrape
+        with self._lock:
+            return self.total_interactions * self.embedding_dim * 4 + self.total_text_bytes
+
+    def get_session_metadata(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            memory = self.sessions.get(session_id)
+            return list(memory.metadata) if memory else []
     
     #store interaction
-    def store_interaction(
+    def _summary_text(
             self,
             question: str,
             answer: str,
-            evaluation: Dict[str, Any],
-            topic: str,
-            interview_round: int
-    ):
-        
-        summary_text = f"""
+            evaluation: Dict[str, Any]
+    ) -> str:
+        return f"""
         Question: {question}
         Answer: {answer}
         Correctness: {evaluation.get("correctness_score")}
         Depth: {evaluation.get("depth_level")}
         """
 
-        vector = self._embed(summary_text)
+    def _add_interaction(
+            self,
+            vector: np.ndarray,
+            session_id: str,
+            question: str,
+            answer: str,
+            evaluation: Dict[str, Any],
+            topic: str,
+            interview_round: int
+    ):
+        with self._lock:
+            memory = self._get_session(session_id, create=True)
+            memory.index.add(vector)
+            self._append_metadata(memory, question, answer, evaluation, topic, interview_round)
+            self.total_interactions += 1
+            self._enforce_budget(session_id)
 
-        self.index.add(vector)
-        self.metadata.append(
+    def _append_metadata(
+            self,
+            memory: SessionMemory,
+            question: str,
+            answer: str,
+            evaluation: Dict[str, Any],
+            topic: str,
+            interview_round: int
+    ):
+        # caller holds self._lock
+        text_bytes = len(question or "") + len(answer or "")
+        memory.text_bytes += text_bytes
+        self.total_text_bytes += text_bytes
+        memory.metadata.append(
             {
                 "question": question,
                 "answer": answer,
@@ -50,79 +237,241 @@ class MemoryService:
                 "round": interview_round
             }
         )
+        memory.add_score(topic, evaluation.get("correctness_score"))
+
+    def store_interaction(
+            self,
+            session_id: str,
+            question: str,
+            answer: str,
+            evaluation: Dict[str, Any],
+            topic: str,
+            interview_round: int
+    ):
+        
+        vector = self._embed(self._summary_text(question, answer, evaluation))
+
+        self._add_interaction(
+            vector, session_id, question, answer, evaluation, topic, interview_round
+        )
+
+    async def astore_interaction(
+            self,
+            session_id: str,
+            question: str,
+            answer: str,
+            evaluation: Dict[str, Any],
+            topic: str,
+            interview_round: int
+    ):
+
+        vector = await self._aembed(self._summary_text(question, answer, evaluation))
+
+        self._add_interaction(
+            vector, session_id, question, answer, evaluation, topic, interview_round
+        )
+
+
+    def store_interactions(self, interactions: Sequence[Dict[str, Any]]):
+        """
+        Bulk store_interaction, for offline scoring: every summary is
+        embedded in one call and each session's vectors are stacked into a
+        single index.add(). Items take store_interaction's arguments.
+        """
+        if not interactions:
+            return
+
+        vectors = self._embed_many([
+            self._summary_text(item["question"], item["answer"], item["evaluation"])
+            for item in interactions
+        ])
+
+        by_session: Dict[str, List[int]] = {}
+        for position, item in enumerate(interactions):
+            by_session.setdefault(item["session_id"], []).append(position)
+
+        with self._lock:
+            for session_id, positions in by_session.items():
+                memory = self._get_session(session_id, create=True)
+                memory.index.add(vectors[positions])
+                for position in positions:
+                    item = interactions[position]
+                    self._append_metadata(
+                        memory,
+                        item["question"],
+                        item["answer"],
+                        item["evaluation"],
+                        item["topic"],
+                        item["interview_round"]
+                    )
+                self.total_interactions += len(positions)
+            # the budget is enforced once, after the whole batch
+            self._enforce_budget(*by_session)
+
+    async def astore_interactions(self, interactions: Sequence[Dict[str, Any]]):
+        await asyncio.to_thread(self.store_interactions, interactions)
 
-    
     # retrieve relevant context
+    def _has_memory(self, session_id: str) -> bool:
+        with self._lock:
+            memory = self._get_session(session_id)
+            return memory is not None and memory.index.ntotal > 0
+
+    def _search(
+            self,
+            session_id: str,
+            query_vector: np.ndarray,
+            top_k: int
+    )-> List[Dict[str, Any]]:
+        with self._lock:
+            memory = self.sessions.get(session_id)
+            if memory is None or memory.index.ntotal == 0:
+                return []
+
+            k = min(top_k, memory.index.ntotal)
+            distances, indices = memory.index.search(query_vector, k)
+
+            results = []
+
+            for idx in indices[0]:
+                if 0 <= idx < len(memory.metadata):
+                    results.append(memory.metadata[idx])
+
+        return results
+
     def get_relevant_context(
             self,
+            session_id: str,
             query: str,
             top_k: int = 3
     )-> List[Dict[str, Any]]:
         
-        if self.index.ntotal == 0:
+        if not self._has_memory(session_id):
             return []
-        
-        query_vector = self._embed(query)
-        distances, indices = self.index.search(query_vector, top_k)
 
-        results = []
+        return self._search(session_id, self._embed(query), top_k)
 
-        for idx in indices[0]:
-            if idx<len(self.metadata):
-                results.append(self.metadata[idx])
+    async def aget_relevant_context(
+            self,
+            session_id: str,
+            query: str,
+            top_k: int = 3
+    )-> List[Dict[str, Any]]:
 
-        return results
+        if not self._has_memory(session_id):
+            return []
+
+        return self._search(session_id, await self._aembed(query), top_k)
     
 
-    # weak topic detection
-    def get_weak_topics(self)-> List[str]:
+    # persistence: <directory>/<session>/index.faiss + metadata.json
+    def _session_dir(self, directory: str, session_id: str) -> str:
+        name = session_id
+        if not re.fullmatch(r"[\w.-]+", session_id):
+            name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(directory, name)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            sessions = list(self.sessions.items())
+            dropped = self._dropped - self.sessions.keys()
+            self._dropped = set()
+
+        for session_id, memory in sessions:
+            path = self._session_dir(directory, session_id)
+            os.makedirs(path, exist_ok=True)
+            memory.index.save(os.path.join(path, "index.faiss"))
+            meta_path = os.path.join(path, "metadata.json")
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(
+                    {
+                        "session_id": session_id,
+                        "metadata": memory.metadata,
+                        "topic_scores": memory.topic_scores
+                    },
+                    f
+                )
+            os.replace(meta_path + ".tmp", meta_path)
+
+        # sessions this process dropped since the last save; directories of
+        # sessions it never held may belong to another worker
+        for session_id in dropped:
+            shutil.rmtree(self._session_dir(directory, session_id), ignore_errors=True)
+
+    def load(self, directory: str):
+        if not os.path.isdir(directory):
+            return
+
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            index_path = os.path.join(path, "index.faiss")
+            meta_path = os.path.join(path, "metadata.json")
+            if not (os.path.isfile(index_path) and os.path.isfile(meta_path)):
+                continue
 
-        topic_scores = {}
-        for item in self.metadata:
-            topic = item["topic"]
-            score = item["correctness_score"]
+            with open(meta_path) as f:
+                data = json.load(f)
 
-            if topic not in topic_scores:
-                topic_scores[topic] = []
+            memory = SessionMemory(self.embedding_dim, VectorIndex.load(index_path))
+            memory.metadata = data["metadata"]
+            memory.topic_scores = data["topic_scores"]
+            memory.text_bytes = sum(
+                len(item.get("question") or "") + len(item.get("answer") or "")
+                for item in memory.metadata
+            )
 
-            topic_scores[topic].append(score)
+            with self._lock:
+                previous = self.sessions.pop(data["session_id"], None)
+                if previous is not None:
+                    self._forget(previous)
+                self.sessions[data["session_id"]] = memory
+                self._dropped.discard(data["session_id"])
+                self.total_interactions += len(memory)
+                self.total_text_bytes += memory.text_bytes
+
+    # weak topic detection, O(topics) from the running aggregates
+    def get_weak_topics(self, session_id: str)-> List[str]:
+
+        with self._lock:
+            memory = self.sessions.get(session_id)
+            averages = memory.topic_averages() if memory else {}
 
         weak_topics = []
-        for topic, scores in topic_scores.items():
-            avg_score = sum(scores)/len(scores)
+        for topic, avg_score in averages.items():
             if avg_score < 0.6:
                 weak_topics.append(topic)
         
         return weak_topics
     
 
-    #candidate profile summary
-    def summarize_candidate_profile(self)-> Dict[str, Any]:
-
-        strengths = []
-        weaknesses = []
-
-        topic_scores = {}
+    #candidate profile summary, cached until the next stored interaction
+    def summarize_candidate_profile(self, session_id: str)-> Dict[str, Any]:
 
-        for item in self.metadata:
-            topic = item["topic"]
-            score = item["correctness_score"]
+        with self._lock:
+            memory = self.sessions.get(session_id)
+            if memory is None:
+                return {"strengths": [], "weaknesses": [], "total_interactions": 0}
+            if memory.profile is not None:
+                return dict(memory.profile)
 
-            topic_scores.setdefault(topic, []).append(score)
+            strengths = []
+            weaknesses = []
 
-        for topic, scores in topic_scores.items():
-            avg = sum(scores)/len(scores)
-            if avg >= 0.7:
-                strengths.append(topic)
-            else:
-                weaknesses.append(topic)
+            for topic, avg in memory.topic_averages().items():
+                if avg >= 0.7:
+                    strengths.append(topic)
+                else:
+                    weaknesses.append(topic)
 
-        return {
-            "strengths": strengths,
-            "weaknesses": weaknesses,
-            "total_interactions": len(self.metadata)
-        }
+            memory.profile = {
+                "strengths": strengths,
+                "weaknesses": weaknesses,
+                "total_interactions": len(memory)
+            }
+            return dict(memory.profile)
     
 
-# Singleton instance (process-level memory)
+# Singleton instance (process-level memory, partitioned per session)
 memory_service = MemoryService()
@@ -1,4 +1,4 @@
 from app.agents.orchestrator import InterviewOrchestrator
 
-# Global orchestrator registry
-orchestrators: dict[str, InterviewOrchestrator] = {}
+# Global orchestrator, one per process, serving every session by id
+orchestrator = InterviewOrchestrator()
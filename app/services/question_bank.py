@@ -0,0 +1,250 @@
+#question_bank.py
+"""
+Pre-generated interview questions, indexed by (topic, difficulty).
+
+Standard L0 questions for a new topic do not need the model: the graph
+serves them from the bank on NEXT_TOPIC / INCREASE_DIFFICULTY and for the
+first question, and only tailored follow-ups are generated live.
+
+The bank is a JSON list of {"topic", "difficulty", "question"} built
+offline:
+
+    python -m app.services.question_bank --input extra.jsonl --generate 3 \
+        --output app/data/question_bank.json
+
+which merges the existing bank, the input file and (optionally) questions
+generated in batch by the question agent, and drops near-duplicates by
+embedding similarity.
+"""
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.utils.config import QUESTION_BANK_PATH, QUESTION_BANK_DEDUP_THRESHOLD
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+
+
+def next_difficulty(difficulty: str) -> str:
+    if difficulty not in DIFFICULTY_LEVELS:
+        return DIFFICULTY_LEVELS[0]
+    return DIFFICULTY_LEVELS[min(DIFFICULTY_LEVELS.index(difficulty) + 1, len(DIFFICULTY_LEVELS) - 1)]
+
+
+class BankQuestion(NamedTuple):
+    topic: str
+    difficulty: str
+    question: str
+
+
+def _stable_hash(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class QuestionBank:
+    """
+    Questions bucketed by (topic, difficulty). pick() only looks at one
+    bucket per candidate topic, so it does not grow with the bank size.
+    """
+
+    def __init__(self, questions: Iterable[BankQuestion] = ()):
+        self.topics: List[str] = []
+        self._buckets: Dict[tuple, List[str]] = {}
+        for question in questions:
+            self.add(question)
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def add(self, question: BankQuestion):
+        if question.topic not in self.topics:
+            self.topics.append(question.topic)
+        self._buckets.setdefault((question.topic, question.difficulty), []).append(question.question)
+
+    def questions(self) -> List[BankQuestion]:
+        return [
+            BankQuestion(topic, difficulty, question)
+            for (topic, difficulty), bucket in self._buckets.items()
+            for question in bucket
+        ]
+
+    def pick(
+            self,
+            session_id: str,
+            difficulty: str,
+            covered_topics: Sequence[str] = (),
+            asked: Sequence[str] = ()
+    ) -> Optional[BankQuestion]:
+        """
+        A question at this difficulty on a topic not covered yet, or None if
+        the bank has none (the caller then asks the model). Topic order and
+        the question within a bucket are rotated per session, so candidates
+        do not all get the same interview.
+        """
+        if not self.topics:
+            return None
+
+        covered = set(covered_topics)
+        asked = set(asked)
+        seed = _stable_hash(session_id)
+        start = seed % len(self.topics)
+
+        for offset in range(len(self.topics)):
+            topic = self.topics[(start + offset) % len(self.topics)]
+            if topic in covered:
+                continue
+
+            bucket = self._buckets.get((topic, difficulty))
+            if not bucket:
+                continue
+            for i in range(len(bucket)):
+                question = bucket[(seed + i) % len(bucket)]
+                if question not in asked:
+                    return BankQuestion(topic, difficulty, question)
+
+        return None
+
+    @classmethod
+    def load(cls, path: str) -> "QuestionBank":
+        with open(path) as f:
+            return cls(BankQuestion(**item) for item in json.load(f))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump([question._asdict() for question in self.questions()], f, indent=2)
+
+
+# loaded on first use; an empty bank (no file) means every question is generated
+@lru_cache(maxsize=None)
+def get_question_bank() -> QuestionBank:
+    if not QUESTION_BANK_PATH or not os.path.exists(QUESTION_BANK_PATH):
+        return QuestionBank()
+
+    bank = QuestionBank.load(QUESTION_BANK_PATH)
+    logger.info("question bank: %d questions, %d topics", len(bank), len(bank.topics))
+    return bank
+
+
+# OFFLINE BUILD
+def deduplicate(
+        questions: Sequence[BankQuestion],
+        embeddings: np.ndarray,
+        threshold: float = QUESTION_BANK_DEDUP_THRESHOLD
+) -> List[BankQuestion]:
+    """
+    Keep each question unless its embedding is within `threshold` cosine
+    similarity of one already kept (first one wins).
+    """
+    import faiss
+
+    embeddings = np.asarray(embeddings, dtype="float32")
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    kept = []
+    for question, vector in zip(questions, embeddings):
+        if index.ntotal:
+            scores, _ = index.search(vector[None, :], 1)
+            if scores[0][0] >= threshold:
+                continue
+        index.add(vector[None, :])
+        kept.append(question)
+
+    return kept
+
+
+def generate_questions(
+        topics: Sequence[str],
+        per_bucket: int,
+        max_concurrency: int = 8
+) -> List[BankQuestion]:
+    """
+    Ask the question agent for per_bucket questions on every topic and
+    difficulty, as one concurrent batch.
+    """
+    from app.agents.question_agent import get_question_chain, _question_inputs
+
+    slots = [
+        (topic, difficulty)
+        for topic in topics
+        for difficulty in DIFFICULTY_LEVELS
+        for _ in range(per_bucket)
+    ]
+    inputs = [
+        _question_inputs({
+            "difficulty_level": difficulty,
+            "covered_topics": [],
+            "focus": f"Ask a standalone question about the topic: {topic}."
+        })
+        for topic, difficulty in slots
+    ]
+    responses = get_question_chain().batch(
+        inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+    )
+
+    generated = []
+    for (topic, difficulty), response in zip(slots, responses):
+        if isinstance(response, Exception):
+            logger.warning("generation failed for %s/%s: %s", topic, difficulty, response)
+            continue
+        generated.append(BankQuestion(topic, difficulty, response.content.strip()))
+    return generated
+
+
+def _read_questions(path: str) -> List[BankQuestion]:
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            return [BankQuestion(**json.loads(line)) for line in f if line.strip()]
+        return [BankQuestion(**item) for item in json.load(f)]
+
+
+def build_bank(
+        sources: Sequence[BankQuestion],
+        threshold: float = QUESTION_BANK_DEDUP_THRESHOLD
+) -> QuestionBank:
+    from app.services.memory_service import memory_service
+
+    sources = [q for q in sources if q.question and q.difficulty in DIFFICULTY_LEVELS]
+    if not sources:
+        return QuestionBank()
+
+    embeddings = memory_service.embedder.encode([q.question for q in sources], batch_size=64)
+    return QuestionBank(deduplicate(sources, embeddings, threshold))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the interview question bank.")
+    parser.add_argument("--input", action="append", default=[], help="extra questions (.json / .jsonl)")
+    parser.add_argument("--output", default=QUESTION_BANK_PATH)
+    parser.add_argument("--generate", type=int, default=0, help="questions to generate per topic and difficulty")
+    parser.add_argument("--topic", action="append", default=[], help="topics to generate for (default: all known)")
+    parser.add_argument("--threshold", type=float, default=QUESTION_BANK_DEDUP_THRESHOLD)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    sources = []
+    if args.output and os.path.exists(args.output):
+        sources.extend(_read_questions(args.output))
+    for path in args.input:
+        sources.extend(_read_questions(path))
+
+    if args.generate:
+        topics = args.topic or list(dict.fromkeys(q.topic for q in sources))
+        sources.extend(generate_questions(topics, args.generate, args.max_concurrency))
+
+    bank = build_bank(sources, args.threshold)
+    bank.save(args.output)
+    print(f"{len(bank)} questions ({len(sources) - len(bank)} dropped) in {len(bank.topics)} topics -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from app.models.interview_state import InterviewState
+from app.utils.cache import LRUCache
+from app.utils.config import SESSION_STORE, SESSION_STORE_URL, SESSION_ARCHIVE_SIZE
+
+
+# compact wire format: JSON without default-valued fields
+def serialize_state(state: InterviewState) -> bytes:
+    return state.model_dump_json(exclude_defaults=True).encode("utf-8")
+
+
+def deserialize_state(data: bytes | str) -> InterviewState:
+    return InterviewState.model_validate_json(data)
+
+
+def worker_id() -> str:
+    # read on every call: a worker forked after import has its own pid
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SessionStore(ABC):
+    """
+    Where interview states live between turns, and the compact summaries
+    of archived sessions after them. Backends other than the in-memory one
+    are shared by every worker, so a websocket (or a /summary request) may
+    land on a different process than the /start request or the sweep.
+    Each save records the worker that made it (owner), so a worker can
+    tell its own sessions from the others'.
+    """
+
+    # fixed owner id, mainly for tests; otherwise worker_id()
+    owner_id: Optional[str] = None
+
+    @property
+    def owner(self) -> str:
+        return self.owner_id or worker_id()
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        ...
+
+    @abstractmethod
+    def set(self, session_id: str, state: InterviewState):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def keys(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def last_updated(self, owner: Optional[str] = None) -> Dict[str, float]:
+        """
+        session id -> unix time of its last save; with owner, only the
+        sessions that owner saved last
+        """
+        ...
+
+    @abstractmethod
+    def resident_bytes(self) -> int:
+        """
+        Serialized size of every live session. Read on every /metrics
+        scrape, so backends keep a running count on set / delete rather
+        than walking the sessions.
+        """
+        ...
+
+    # archived sessions: at most archive_size summaries, oldest dropped first
+    @abstractmethod
+    def archive(self, session_id: str, summary: dict):
+        ...
+
+    @abstractmethod
+    def get_archived(self, session_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def archived_count(self) -> int:
+        ...
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    # async access for code on the event loop: SQLite commits and Redis
+    # round trips run on a worker thread instead of blocking the loop
+    async def aget(self, session_id: str) -> Optional[InterviewState]:
+        return await asyncio.to_thread(self.get, session_id)
+
+    async def aset(self, session_id: str, state: InterviewState):
+        await asyncio.to_thread(self.set, session_id, state)
+
+    async def adelete(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self.delete, session_id)
+
+    async def acontains(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self.__contains__, session_id)
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local dict of live state objects (single worker only: every
+    session is this worker's, whatever the owner).
+    """
+
+    def __init__(self, archive_size: int = SESSION_ARCHIVE_SIZE):
+        self._states: Dict[str, InterviewState] = {}
+        self._updated: Dict[str, float] = {}
+        # serialized size per session, and their running sum
+        self._sizes: Dict[str, int] = {}
+        self._resident_bytes = 0
+        self._archive = LRUCache(archive_size)
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        return self._states.get(session_id)
+
+    def set(self, session_id: str, state: InterviewState):
+        size = len(serialize_state(state))
+        self._resident_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+        self._states[session_id] = state
+        self._updated[session_id] = time.time()
+
+    def delete(self, session_id: str) -> bool:
+        self._updated.pop(session_id, None)
+        self._resident_bytes -= self._sizes.pop(session_id, 0)
+        return self._states.pop(session_id, None) is not None
+
+    def keys(self) -> List[str]:
+        return list(self._states.keys())
+
+    def last_updated(self, owner: Optional[str] = None) -> Dict[str, float]:
+        return dict(self._updated)
+
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def archive(self, session_id: str, summary: dict):
+        self._archive.put(session_id, dict(summary))
+
+    def get_archived(self, session_id: str) -> Optional[dict]:
+        summary = self._archive.get(session_id)
+        return dict(summary) if summary is not None else None
+
+    def archived_count(self) -> int:
+        return len(self._archive)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._states
+
+    # dict access, no thread hop needed
+    async def aget(self, session_id: str) -> Optional[InterviewState]:
+        return self.get(session_id)
+
+    async def aset(self, session_id: str, state: InterviewState):
+        self.set(session_id, state)
+
+    async def adelete(self, session_id: str) -> bool:
+        return self.delete(session_id)
+
+    async def acontains(self, session_id: str) -> bool:
+        return session_id in self
+
+
+# one-row running total of LENGTH(state), seeded from any existing rows
+SQLITE_SIZE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_bytes (
+    id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO session_bytes (id, bytes)
+    SELECT 0, COALESCE(SUM(LENGTH(state)), 0) FROM sessions;
+CREATE TRIGGER IF NOT EXISTS session_bytes_insert AFTER INSERT ON sessions BEGIN
+    UPDATE session_bytes SET bytes = bytes + LENGTH(new.state);
+END;
+CREATE TRIGGER IF NOT EXISTS session_bytes_update AFTER UPDATE OF state ON sessions BEGIN
+    UPDATE session_bytes SET bytes = bytes + LENGTH(new.state) - LENGTH(old.state);
+END;
+CREATE TRIGGER IF NOT EXISTS session_bytes_delete AFTER DELETE ON sessions BEGIN
+    UPDATE session_bytes SET bytes = bytes - LENGTH(old.state);
+END;
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Single SQLite file, shared by the workers of one node. The total state
+    size is kept in session_bytes by triggers, so every worker sees the
+    same count without a table scan. Archived summaries are kept in
+    archived_sessions, trimmed by rowid like SQLiteKVStore.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            archive_size: int = SESSION_ARCHIVE_SIZE,
+            owner: Optional[str] = None
+    ):
+        self.archive_size = archive_size
+        self.owner_id = owner
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL, "
+            "owner TEXT)"
+        )
+        # files created before sessions had an owner
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN owner TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS archived_sessions ("
+            "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL)"
+        )
+        self._conn.executescript(SQLITE_SIZE_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return deserialize_state(row[0]) if row else None
+
+    def set(self, session_id: str, state: InterviewState):
+        with self._lock:
+            # an upsert, not INSERT OR REPLACE: the replace's implicit
+            # delete would not fire the size trigger
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, state, updated_at, owner) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, "
+                "updated_at = excluded.updated_at, owner = excluded.owner",
+                (session_id, serialize_state(state), time.time(), self.owner)
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM sessions").fetchall()
+        return [row[0] for row in rows]
+
+    def last_updated(self, owner: Optional[str] = None) -> Dict[str, float]:
+        with self._lock:
+            if owner is None:
+                rows = self._conn.execute(
+                    "SELECT session_id, updated_at FROM sessions"
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT session_id, updated_at FROM sessions WHERE owner = ?", (owner,)
+                ).fetchall()
+        return dict(rows)
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT bytes FROM session_bytes").fetchone()
+        return row[0]
+
+    def archive(self, session_id: str, summary: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO archived_sessions (session_id, summary) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary",
+                (session_id, json.dumps(summary))
+            )
+            self._conn.execute(
+                "DELETE FROM archived_sessions WHERE rowid <= "
+                "(SELECT MAX(rowid) FROM archived_sessions) - ?",
+                (self.archive_size,)
+            )
+            self._conn.commit()
+
+    def get_archived(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM archived_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def archived_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM archived_sessions").fetchone()[0]
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Any client speaking the redis-py API (get/set/delete/exists/scan_iter,
+    hset/hget/hdel/hgetall/hlen and rpush/lpop/llen): a real
+    Redis/Valkey/KeyDB server, or a local stand-in in tests. Save times,
+    serialized sizes and owners live in hashes next to the states; archived
+    summaries in another, with a list of their ids, oldest first.
+    """
+
+    def __init__(
+            self,
+            client,
+            prefix: str = "interview:session:",
+            archive_size: int = SESSION_ARCHIVE_SIZE,
+            owner: Optional[str] = None
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.archive_size = archive_size
+        self.owner_id = owner
+        self.updated_key = f"{prefix}__updated__"
+        self.sizes_key = f"{prefix}__sizes__"
+        self.owners_key = f"{prefix}__owners__"
+        self.archived_key = f"{prefix}__archived__"
+        self.archive_order_key = f"{prefix}__archive_order__"
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisSessionStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}{session_id}"
+
+    def get(self, session_id: str) -> Optional[InterviewState]:
+        data = self.client.get(self._key(session_id))
+        return deserialize_state(data) if data is not None else None
+
+    def set(self, session_id: str, state: InterviewState):
+        data = serialize_state(state)
+        self.client.set(self._key(session_id), data)
+        self.client.hset(self.updated_key, session_id, time.time())
+        self.client.hset(self.sizes_key, session_id, len(data))
+        self.client.hset(self.owners_key, session_id, self.owner)
+
+    def delete(self, session_id: str) -> bool:
+        self.client.hdel(self.updated_key, session_id)
+        self.client.hdel(self.sizes_key, session_id)
+        self.client.hdel(self.owners_key, session_id)
+        return bool(self.client.delete(self._key(session_id)))
+
+    def keys(self) -> List[str]:
+        keys = []
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            if key not in (
+                    self.updated_key, self.sizes_key, self.owners_key,
+                    self.archived_key, self.archive_order_key
+            ):
+                keys.append(key[len(self.prefix):])
+        return keys
+
+    def last_updated(self, owner: Optional[str] = None) -> Dict[str, float]:
+        updated = {}
+        for session_id, value in self.client.hgetall(self.updated_key).items():
+            if isinstance(session_id, bytes):
+                session_id = session_id.decode("utf-8")
+            updated[session_id] = float(value)
+        if owner is None:
+            return updated
+
+        owned = {}
+        for session_id, value in self.client.hgetall(self.owners_key).items():
+            if isinstance(session_id, bytes):
+                session_id = session_id.decode("utf-8")
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            if value == owner and session_id in updated:
+                owned[session_id] = updated[session_id]
+        return owned
+
+    def resident_bytes(self) -> int:
+        # one round trip, no state is fetched or parsed
+        return sum(int(size) for size in self.client.hgetall(self.sizes_key).values())
+
+    def archive(self, session_id: str, summary: dict):
+        # hset returns 0 when an existing summary is replaced: keep one
+        # entry per id in the order list
+        if self.client.hset(self.archived_key, session_id, json.dumps(summary)):
+            self.client.rpush(self.archive_order_key, session_id)
+        while self.client.llen(self.archive_order_key) > self.archive_size:
+            oldest = self.client.lpop(self.archive_order_key)
+            if oldest is None:
+                break
+            if isinstance(oldest, bytes):
+                oldest = oldest.decode("utf-8")
+            self.client.hdel(self.archived_key, oldest)
+
+    def get_archived(self, session_id: str) -> Optional[dict]:
+        data = self.client.hget(self.archived_key, session_id)
+        return json.loads(data) if data is not None else None
+
+    def archived_count(self) -> int:
+        return self.client.hlen(self.archived_key)
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(self.client.exists(self._key(session_id)))
+
+
+def create_session_store(
+        backend: str = SESSION_STORE,
+        url: Optional[str] = SESSION_STORE_URL
+) -> SessionStore:
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(url or "sessions.db")
+    if backend == "redis":
+        return RedisSessionStore.from_url(url or "redis://localhost:6379/0")
+
+    raise ValueError(f"Unknown session store backend: {backend}")
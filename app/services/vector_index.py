@@ -0,0 +1,195 @@
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from app.utils.config import (
+    VECTOR_INDEX_BACKEND,
+    VECTOR_INDEX_REBUILD_THRESHOLD,
+    VECTOR_INDEX_HNSW_M,
+    VECTOR_INDEX_NPROBE,
+    VECTOR_INDEX_PQ_M,
+)
+
+BACKENDS = ("flat", "hnsw", "ivfpq")
+
+logger = logging.getLogger(__name__)
+
+
+def build_faiss_index(backend: str, dim: int, vectors: np.ndarray) -> "faiss.Index":
+    """
+    Build (and train, if needed) a faiss index of the given backend over
+    vectors. Runs off the request path.
+    """
+    import faiss
+
+    if backend == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, VECTOR_INDEX_HNSW_M)
+    elif backend == "ivfpq":
+        # ~4 * sqrt(n) lists, keeping >= 39 training points per list
+        nlist = max(1, min(int(4 * math.sqrt(len(vectors))), len(vectors) // 39))
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, VECTOR_INDEX_PQ_M, 8)
+        index.train(vectors)
+        index.nprobe = VECTOR_INDEX_NPROBE
+    else:
+        index = faiss.IndexFlatL2(dim)
+
+    index.add(vectors)
+    return index
+
+
+class VectorIndex:
+    """
+    Single interface over the faiss backends (flat, hnsw, ivfpq).
+
+    Starts as an exact IndexFlatL2. Once it holds rebuild_threshold vectors
+    and the configured backend is an ANN one, the ANN index is built on a
+    background thread from the current vectors and swapped in; vectors
+    added meanwhile are replayed into it. Searches keep hitting the flat
+    index until the swap, so nothing blocks on training.
+    """
+
+    def __init__(
+            self,
+            dim: int,
+            backend: str = VECTOR_INDEX_BACKEND,
+            rebuild_threshold: int = VECTOR_INDEX_REBUILD_THRESHOLD
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown vector index backend: {backend}")
+        # imported on first use, so importing the app never loads faiss
+        import faiss
+
+        self.dim = dim
+        self.backend = backend
+        self.rebuild_threshold = rebuild_threshold
+
+        self.index: "faiss.Index" = faiss.IndexFlatL2(dim)
+        self._upgraded = backend == "flat"
+        self._pending: Optional[List[np.ndarray]] = None
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._source_path: Optional[str] = None
+        self._lock = threading.RLock()
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def kind(self) -> str:
+        return self.backend if self._upgraded else "flat"
+
+    def add(self, vectors: np.ndarray):
+        with self._lock:
+            self._ensure_writable()
+            self.index.add(vectors)
+            if self._pending is not None:
+                self._pending.append(vectors)
+            self._maybe_rebuild()
+
+    def search(self, query: np.ndarray, k: int):
+        with self._lock:
+            return self.index.search(query, k)
+
+    # background rebuild
+    def _maybe_rebuild(self):
+        # caller holds self._lock
+        if self._upgraded or self._pending is not None:
+            return
+        if self.index.ntotal < self.rebuild_threshold:
+            return
+
+        snapshot = self.index.reconstruct_n(0, self.index.ntotal)
+        self._pending = []
+        self._rebuild_thread = threading.Thread(
+            target=self._rebuild, args=(snapshot,), name="vector-index-rebuild", daemon=True
+        )
+        self._rebuild_thread.start()
+
+    def _rebuild(self, snapshot: np.ndarray):
+        try:
+            new_index = build_faiss_index(self.backend, self.dim, snapshot)
+        except Exception:
+            # keep serving from the exact index, do not retry on every add
+            logger.exception("Building %s index failed, staying on flat", self.backend)
+            with self._lock:
+                self._pending = None
+                self._upgraded = True
+            return
+
+        with self._lock:
+            for vectors in self._pending:
+                new_index.add(vectors)
+            self.index = new_index
+            self._pending = None
+            self._upgraded = True
+
+    def wait_for_rebuild(self, timeout: float = 60.0):
+        # mainly for tests / benchmarks
+        if self._rebuild_thread is not None:
+            self._rebuild_thread.join(timeout)
+
+    # persistence
+    def save(self, path: str):
+        # written next to the target and swapped in: an index loaded from
+        # `path` is still memory-mapped from it and must not be overwritten
+        # in place
+        import faiss
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".index-", suffix=".tmp")
+        os.close(fd)
+        try:
+            with self._lock:
+                if self._source_path is None:
+                    faiss.write_index(self.index, tmp_path)
+                elif os.path.abspath(self._source_path) == os.path.abspath(path):
+                    # no adds since load: the file is already up to date
+                    return
+                else:
+                    # mmap-ed IVF lists do not serialize correctly; the
+                    # source file holds exactly this index
+                    shutil.copyfile(self._source_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(
+            cls,
+            path: str,
+            backend: str = VECTOR_INDEX_BACKEND,
+            rebuild_threshold: int = VECTOR_INDEX_REBUILD_THRESHOLD
+    ) -> "VectorIndex":
+        import faiss
+
+        # memory-mapped: loading is O(1), pages are read on first search
+        index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+        vector_index = cls(index.d, backend, rebuild_threshold)
+        vector_index.index = index
+        vector_index._source_path = path
+        vector_index._upgraded = (
+            backend == "flat" or not isinstance(index, faiss.IndexFlat)
+        )
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = VECTOR_INDEX_NPROBE
+        return vector_index
+
+    def _ensure_writable(self):
+        # mmap-ed IVF lists are read-only: load fully on the first add
+        if self._source_path is None:
+            return
+        import faiss
+
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index = faiss.read_index(self._source_path)
+            self.index.nprobe = VECTOR_INDEX_NPROBE
+        self._source_path = None
@@ -0,0 +1,17 @@
+# app/tests/conftest.py
+import pytest
+
+from app.benchmarks.fakes import install_fakes
+from app.services import llm_service
+
+
+@pytest.fixture
+def fakes():
+    """
+    The fake LLM and embedder from app/benchmarks/fakes.py; the real model
+    factory is restored afterwards. Tests that need latency call
+    install_fakes again with it.
+    """
+    install_fakes()
+    yield
+    llm_service.set_model_factory(None)
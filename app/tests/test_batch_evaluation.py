@@ -0,0 +1,175 @@
+# app/tests/test_batch_evaluation.py
+import asyncio
+import json
+import time
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import interview_routes
+from app.benchmarks.fakes import install_fakes
+from app.services import batch_evaluation
+from app.services.batch_evaluation import (
+    astream_jsonl,
+    ascore_turns,
+    candidate_profiles,
+    offline_memory,
+    parse_turns,
+)
+from app.services.memory_service import MemoryService, memory_service
+from app.services.vector_index import VectorIndex
+
+LLM_LATENCY = 0.05
+
+
+def turn_lines(candidates: int, turns: int) -> list[str]:
+    return [
+        json.dumps({
+            "session_id": f"batch-{c}",
+            "question": f"Question {t} for candidate {c}?",
+            "answer": f"Answer {t} from candidate {c}.",
+            "topic": f"topic-{t % 2}",
+        })
+        for c in range(candidates)
+        for t in range(turns)
+    ]
+
+
+@pytest.fixture
+def slow_fakes(fakes):
+    install_fakes(llm_latency=LLM_LATENCY)
+
+
+def score(lines, max_concurrency, chunk_size=500, memory=None) -> list[dict]:
+    memory = memory if memory is not None else offline_memory()
+
+    async def collect():
+        return [
+            result
+            async for result in ascore_turns(parse_turns(lines), memory, max_concurrency, chunk_size)
+        ]
+    return asyncio.run(collect())
+
+
+def test_parse_turns_numbers_rounds_per_session():
+    lines = [
+        '{"session_id": "a", "question": "q1", "answer": "x"}',
+        "",
+        '{"session_id": "b", "question": "q1", "answer": "y", "round": 4}',
+        '{"session_id": "a", "question": "q2", "answer": "z"}',
+    ]
+    turns = list(parse_turns(lines))
+    assert [(t["session_id"], t["interview_round"]) for t in turns] == [("a", 1), ("b", 4), ("a", 2)]
+    assert turns[0]["topic"] == "general"
+
+
+@pytest.mark.parametrize("line", ["[1]", "3", '"text"', "null"])
+def test_parse_turns_rejects_lines_that_are_not_objects(line):
+    lines = ['{"session_id": "a", "question": "q1", "answer": "x"}', line]
+    with pytest.raises(ValueError, match="line 2"):
+        list(parse_turns(lines))
+
+
+def test_batch_route_rejects_bad_lines_and_clamps_concurrency(monkeypatch):
+    used = []
+
+    async def record(turns, max_concurrency):
+        used.append(max_concurrency)
+        yield "{}\n"
+
+    monkeypatch.setattr(batch_evaluation, "astream_jsonl", record)
+    monkeypatch.setattr(interview_routes, "LLM_MAX_CONCURRENCY", 4)
+    app = FastAPI()
+    app.include_router(interview_routes.router)
+    client = TestClient(app)
+    body = '{"session_id": "a", "question": "q", "answer": "x"}'
+
+    assert client.post("/interviews/evaluate/batch", content="[1]").status_code == 400
+    assert client.post("/interviews/evaluate/batch", content=body).status_code == 200
+    client.post("/interviews/evaluate/batch?max_concurrency=1000", content=body)
+    client.post("/interviews/evaluate/batch?max_concurrency=0", content=body)
+    assert used == [4, 4, 1]
+
+
+def test_scored_turns_are_stored_with_one_add_per_session(slow_fakes, monkeypatch):
+    added = []
+    add = VectorIndex.add
+    monkeypatch.setattr(VectorIndex, "add", lambda self, vectors: added.append(len(vectors)) or add(self, vectors))
+
+    memory = offline_memory()
+    results = score(turn_lines(candidates=3, turns=4), max_concurrency=8, chunk_size=100, memory=memory)
+
+    assert len(results) == 12
+    assert all(set(r["evaluation"]) == {"correctness_score", "depth_level", "follow_up_needed"} for r in results)
+
+    assert added == [4, 4, 4]
+
+    profiles = candidate_profiles(memory, (r["session_id"] for r in results))
+    assert set(profiles) == {"batch-0", "batch-1", "batch-2"}
+    for session_id, profile in profiles.items():
+        assert profile["total_interactions"] == 4
+        assert memory.sessions[session_id].index.ntotal == 4
+        assert len(memory.get_relevant_context(session_id, "Question 1", top_k=2)) == 2
+
+
+def test_throughput_scales_with_concurrency(slow_fakes):
+    lines = turn_lines(candidates=4, turns=4)
+
+    start = time.perf_counter()
+    score(lines, max_concurrency=16)
+    elapsed = time.perf_counter() - start
+
+    # 16 model calls serially would take 16 * LLM_LATENCY
+    assert elapsed < 16 * LLM_LATENCY / 3
+
+
+def test_stream_ends_with_one_profile_per_candidate(slow_fakes):
+    async def collect():
+        turns = list(parse_turns(turn_lines(candidates=2, turns=2)))
+        return [json.loads(line) async for line in astream_jsonl(turns)]
+
+    lines = asyncio.run(collect())
+
+    assert all("evaluation" in line for line in lines[:4])
+    assert sorted(line["session_id"] for line in lines[4:]) == ["batch-0", "batch-1"]
+    assert lines[4]["profile"]["total_interactions"] == 2
+
+
+def test_profiles_survive_the_live_memory_budget(slow_fakes, monkeypatch):
+    monkeypatch.setattr(memory_service, "max_interactions", 10)
+    memory_service.store_interaction("live-1", "q", "a", {"correctness_score": 1.0}, "t", 1)
+
+    async def collect():
+        turns = list(parse_turns(turn_lines(candidates=5, turns=6)))
+        return [json.loads(line) async for line in astream_jsonl(turns)]
+
+    try:
+        lines = asyncio.run(collect())
+
+        profiles = {line["session_id"]: line["profile"] for line in lines if "profile" in line}
+        assert len(profiles) == 5
+        assert all(profile["total_interactions"] == 6 for profile in profiles.values())
+        # the live interview's memory is untouched and holds no batch sessions
+        assert list(memory_service.sessions) == ["live-1"]
+    finally:
+        memory_service.drop_session("live-1")
+
+
+def test_bulk_store_only_evicts_sessions_outside_the_batch(slow_fakes):
+    memory = MemoryService(max_interactions=10, embedder=memory_service.embedder)
+    evaluation = {"correctness_score": 0.5, "depth_level": "basic"}
+    for i in range(5):
+        memory.store_interaction("older", f"q{i}", "a", evaluation, "t", i)
+
+    memory.store_interactions([
+        {
+            "session_id": f"batch-{c}", "question": f"q{c}{t}", "answer": "a",
+            "evaluation": evaluation, "topic": "t", "interview_round": t
+        }
+        for c in range(3)
+        for t in range(3)
+    ])
+
+    assert sorted(memory.sessions) == ["batch-0", "batch-1", "batch-2"]
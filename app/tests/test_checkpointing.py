@@ -0,0 +1,109 @@
+# app/tests/test_checkpointing.py
+import asyncio
+
+import pytest
+
+from app.agents.orchestrator import InterviewOrchestrator
+from app.graph import interview_graph
+from app.services.checkpointer import create_checkpointer, session_config
+from app.services.question_bank import QuestionBank
+from app.services.session_store import InMemorySessionStore
+from app.utils.metrics import counter_value
+
+ANSWER = "A decorator wraps a function."
+
+# every test here runs turns against the fake LLM
+pytestmark = pytest.mark.usefixtures("fakes")
+
+
+class Flaky:
+    """Wraps an agent function; the first `failures` calls time out."""
+
+    def __init__(self, func, failures: int = 0):
+        self.func = func
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, context):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("LLM call timed out")
+        return self.func(context)
+
+
+class AsyncFlaky(Flaky):
+    async def __call__(self, context):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("LLM call timed out")
+        return await self.func(context)
+
+
+def make_orchestrator(monkeypatch, checkpointer) -> InterviewOrchestrator:
+    # no bank questions, so every turn reaches question generation
+    monkeypatch.setattr(interview_graph, "get_question_bank", QuestionBank)
+    graph = interview_graph.build_interview_graph(speculative=False, checkpointer=checkpointer)
+    monkeypatch.setattr(InterviewOrchestrator, "graph", property(lambda self: graph))
+
+    orchestrator = InterviewOrchestrator(InMemorySessionStore())
+    orchestrator.start_session("s1")
+    orchestrator.sessions.get("s1").current_question = "What is a decorator?"
+    return orchestrator
+
+
+def test_failed_turn_resumes_without_re_evaluating(monkeypatch):
+    orchestrator = make_orchestrator(monkeypatch, create_checkpointer("memory"))
+    evaluate = Flaky(interview_graph.evaluate_knowledge)
+    generate = Flaky(interview_graph.generate_question, failures=1)
+    monkeypatch.setattr(interview_graph, "evaluate_knowledge", evaluate)
+    monkeypatch.setattr(interview_graph, "generate_question", generate)
+    resumed = counter_value("graph.turns_resumed")
+
+    with pytest.raises(TimeoutError):
+        orchestrator.run_step("s1", ANSWER)
+    assert orchestrator.get_session("s1").interview_round == 1
+
+    response = orchestrator.run_step("s1", ANSWER)
+
+    assert response["interview_round"] == 2
+    assert response["next_question"]
+    assert (evaluate.calls, generate.calls) == (1, 2)
+    assert counter_value("graph.turns_resumed") == resumed + 1
+    # checkpoints are dropped once the turn is in the session store
+    assert not orchestrator.graph.get_state(session_config("s1")).values
+
+
+def test_a_different_answer_starts_the_turn_over(monkeypatch):
+    orchestrator = make_orchestrator(monkeypatch, create_checkpointer("memory"))
+    evaluate = Flaky(interview_graph.evaluate_knowledge)
+    monkeypatch.setattr(interview_graph, "evaluate_knowledge", evaluate)
+    monkeypatch.setattr(
+        interview_graph, "generate_question",
+        Flaky(interview_graph.generate_question, failures=1)
+    )
+
+    with pytest.raises(TimeoutError):
+        orchestrator.run_step("s1", ANSWER)
+    orchestrator.run_step("s1", "Something else entirely.")
+
+    assert evaluate.calls == 2
+
+
+def test_async_turn_resumes_from_sqlite_checkpoint(monkeypatch, tmp_path):
+    checkpointer = create_checkpointer("sqlite", str(tmp_path / "checkpoints.db"))
+    orchestrator = make_orchestrator(monkeypatch, checkpointer)
+    evaluate = AsyncFlaky(interview_graph.aevaluate_knowledge)
+    generate = AsyncFlaky(interview_graph.agenerate_question, failures=1)
+    monkeypatch.setattr(interview_graph, "aevaluate_knowledge", evaluate)
+    monkeypatch.setattr(interview_graph, "agenerate_question", generate)
+
+    async def turn():
+        return await orchestrator.arun_step("s1", ANSWER)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(turn())
+    response = asyncio.run(turn())
+
+    assert response["interview_round"] == 2
+    assert evaluate.calls == 1
+    assert checkpointer.get_tuple(session_config("s1")) is None
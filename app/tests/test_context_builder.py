@@ -0,0 +1,62 @@
+# app/tests/test_context_builder.py
+from app.agents.orchestrator import InterviewOrchestrator
+from app.services.context_builder import build_question_context, estimate_tokens
+from app.services.session_store import InMemorySessionStore
+
+EVALUATION = {"correctness_score": 0.5, "depth_level": "basic", "follow_up_needed": True}
+
+
+def context_tokens(context: dict) -> int:
+    return sum(estimate_tokens(value) for value in context.values())
+
+
+def test_window_and_digest_replace_the_full_history():
+    questions = [f"Question number {i}?" for i in range(20)]
+    context = build_question_context(questions, ["lists", "dicts"], EVALUATION, window=3)
+
+    assert "Question number 19?" in context["previous_questions"]
+    assert "Question number 16?" not in context["previous_questions"]
+    assert "plus 17 earlier questions" in context["previous_questions"]
+    assert "correctness 0.5" in context["answer_summary"]
+
+
+def test_context_size_does_not_grow_with_the_interview():
+    relevant = [
+        {"question": "What is a list?", "answer": "word " * 200, "correctness_score": 0.5}
+    ] * 3
+    sizes = [
+        context_tokens(build_question_context(
+            [f"A fairly long interview question number {i}?" for i in range(rounds)],
+            [f"topic {i}" for i in range(min(rounds, 5))],
+            EVALUATION,
+            ["lists"],
+            relevant,
+            token_budget=200
+        ))
+        for rounds in (5, 50, 500)
+    ]
+    assert max(sizes) <= 200
+    # only the digit count in the digest differs
+    assert abs(sizes[2] - sizes[1]) <= 1
+
+
+def test_relevant_history_is_dropped_before_recent_questions():
+    relevant = [{"question": "q", "answer": "a" * 150, "correctness_score": 1.0}] * 2
+    context = build_question_context(
+        ["What is a list?"], ["lists"], EVALUATION, relevant=relevant, token_budget=60
+    )
+    assert context["relevant_history"] == "None"
+    assert "What is a list?" in context["previous_questions"]
+
+
+def test_memory_summary_is_kept_out_of_the_evaluation(fakes):
+    orchestrator = InterviewOrchestrator(InMemorySessionStore())
+    orchestrator.start_session("ctx")
+    orchestrator.run_step("ctx", "A list is an ordered, mutable collection.")
+    orchestrator.run_step("ctx", "Not sure.")
+
+    state = orchestrator.get_session("ctx")
+    assert set(state.knowledge_evaluation) == {
+        "correctness_score", "depth_level", "follow_up_needed"
+    }
+    assert state.candidate_profile["total_interactions"] == 2
@@ -0,0 +1,107 @@
+# app/tests/test_decision_rules.py
+import pytest
+
+from app.agents import decision_agent
+from app.agents.decision_agent import RuleDecision, apply_decision_rules
+from app.models.interview_state import DecisionType
+
+FOLLOWUP = DecisionType.ASK_FOLLOWUP.value
+NEXT_TOPIC = DecisionType.NEXT_TOPIC.value
+HARDER = DecisionType.INCREASE_DIFFICULTY.value
+END = DecisionType.END_INTERVIEW.value
+
+
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    # the defaults, whatever the environment sets
+    monkeypatch.setattr(decision_agent, "DECISION_LOW_SCORE", 0.5)
+    monkeypatch.setattr(decision_agent, "DECISION_HIGH_SCORE", 0.8)
+    monkeypatch.setattr(decision_agent, "DECISION_LOW_CONFIDENCE", 0.4)
+
+
+def context(score=0.7, depth="basic", follow_up_needed=False, **overrides) -> dict:
+    base = {
+        "knowledge_evaluation": {
+            "correctness_score": score,
+            "depth_level": depth,
+            "follow_up_needed": follow_up_needed,
+        },
+        "confidence_score": 0.5,
+        "emotion_state": "calm",
+        "interview_round": 2,
+        "max_rounds": 5,
+    }
+    return {**base, **overrides}
+
+
+@pytest.mark.parametrize("score, depth, expected", [
+    (0.49, "basic", RuleDecision(FOLLOWUP)),
+    (0.5, "basic", RuleDecision(NEXT_TOPIC)),
+    (0.79, "good", RuleDecision(NEXT_TOPIC)),
+    (0.8, "good", RuleDecision(HARDER)),
+    (0.8, "basic", RuleDecision(NEXT_TOPIC)),
+    (1, "good", RuleDecision(HARDER)),
+])
+def test_score_threshold_edges(score, depth, expected):
+    assert apply_decision_rules(context(score, depth)) == expected
+
+
+@pytest.mark.parametrize("score, depth, follow_up_needed, expected", [
+    # shallow answer: a follow-up, no reason to doubt it
+    (0.6, "basic", True, RuleDecision(FOLLOWUP)),
+    # high score yet flagged: the signals conflict
+    (0.9, "good", True, RuleDecision(FOLLOWUP, ambiguous=True)),
+    (0.9, "poor", False, RuleDecision(FOLLOWUP, ambiguous=True)),
+    (0.2, "good", False, RuleDecision(FOLLOWUP, ambiguous=True)),
+    (0.2, "poor", True, RuleDecision(FOLLOWUP)),
+])
+def test_follow_ups_and_conflicting_signals(score, depth, follow_up_needed, expected):
+    assert apply_decision_rules(context(score, depth, follow_up_needed)) == expected
+
+
+@pytest.mark.parametrize("overrides, expected", [
+    ({"confidence_score": 0.39}, FOLLOWUP),
+    ({"confidence_score": 0.4}, NEXT_TOPIC),
+    ({"emotion_state": "Nervous"}, FOLLOWUP),
+    ({"emotion_state": "stressed"}, FOLLOWUP),
+])
+def test_low_confidence_or_nervous_gets_a_follow_up(overrides, expected):
+    assert apply_decision_rules(context(**overrides)) == RuleDecision(expected)
+
+
+def test_low_confidence_does_not_hold_back_a_strong_answer():
+    strong = context(0.9, "good", confidence_score=0.1, emotion_state="anxious")
+    assert apply_decision_rules(strong) == RuleDecision(HARDER)
+
+
+@pytest.mark.parametrize("evaluation", [
+    {},
+    {"correctness_score": "0.9", "depth_level": "good"},
+    {"correctness_score": None, "depth_level": "good"},
+    {"correctness_score": 0.9, "depth_level": "excellent"},
+    {"correctness_score": 0.9},
+])
+def test_malformed_evaluation_is_ambiguous(evaluation):
+    decision = apply_decision_rules({**context(), "knowledge_evaluation": evaluation})
+    assert decision == RuleDecision(NEXT_TOPIC, ambiguous=True)
+
+
+def test_missing_evaluation_is_ambiguous():
+    decision = apply_decision_rules({**context(), "knowledge_evaluation": None})
+    assert decision == RuleDecision(NEXT_TOPIC, ambiguous=True)
+
+
+@pytest.mark.parametrize("interview_round, expected", [
+    (4, HARDER),
+    (5, END),
+    (6, END),
+])
+def test_round_limit_ends_the_interview(interview_round, expected):
+    # whatever the evaluation says, even a malformed one
+    assert apply_decision_rules(
+        context(0.9, "good", interview_round=interview_round)
+    ).decision == expected
+    if expected == END:
+        assert apply_decision_rules(
+            {**context(interview_round=interview_round), "knowledge_evaluation": {}}
+        ) == RuleDecision(END)
@@ -0,0 +1,192 @@
+# app/tests/test_embedding_service.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingBatcher, EmbeddingCache
+from app.utils.metrics import counter_value
+
+# long enough that a batch in these tests only closes on size or shutdown
+NO_DEADLINE_MS = 60_000
+
+
+class CountingEncoder:
+    """
+    Records every forward pass. Text "7" encodes to [7, 7]; with a gate
+    set, each pass waits for it first.
+    """
+
+    def __init__(self, gate: threading.Event = None, error: Exception = None):
+        self.batches = []
+        self.gate = gate
+        self.error = error
+        self.started = threading.Event()
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(10)
+        if self.error is not None:
+            raise self.error
+        return np.array([[float(text)] * 2 for text in texts])
+
+
+def test_concurrent_embeds_share_one_forward_pass():
+    encoder = CountingEncoder()
+    batcher = EmbeddingBatcher(encoder, batch_size=8, max_wait_ms=NO_DEADLINE_MS)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        vectors = list(pool.map(batcher.embed, [str(i) for i in range(8)]))
+
+    assert len(encoder.batches) == 1
+    assert sorted(encoder.batches[0], key=int) == [str(i) for i in range(8)]
+    # each caller gets its own row
+    assert [vector[0] for vector in vectors] == list(range(8))
+    assert vectors[0].dtype == np.float32
+    batcher.shutdown()
+
+
+def test_batch_closes_at_batch_size():
+    encoder = CountingEncoder()
+    batcher = EmbeddingBatcher(encoder, batch_size=2, max_wait_ms=NO_DEADLINE_MS)
+
+    vectors = batcher.embed_many(["1", "2", "3", "4"])
+
+    assert encoder.batches == [["1", "2"], ["3", "4"]]
+    assert vectors[:, 0].tolist() == [1, 2, 3, 4]
+    batcher.shutdown()
+
+
+def test_partial_batch_closes_after_max_wait():
+    encoder = CountingEncoder()
+    batcher = EmbeddingBatcher(encoder, batch_size=32, max_wait_ms=10)
+
+    assert batcher.submit("5").result(timeout=5)[0] == 5
+    assert encoder.batches == [["5"]]
+    batcher.shutdown()
+
+
+def test_encoder_error_reaches_every_waiting_caller():
+    error = RuntimeError("out of memory")
+    batcher = EmbeddingBatcher(CountingEncoder(error=error), batch_size=3, max_wait_ms=NO_DEADLINE_MS)
+
+    futures = [batcher.submit(str(i)) for i in range(3)]
+
+    for future in futures:
+        assert future.exception(timeout=5) is error
+
+    # the worker survives a failed batch
+    batcher.encode_batch = CountingEncoder()
+    batcher.batch_size = 1
+    assert batcher.embed("4")[0] == 4
+    batcher.shutdown()
+
+
+def test_shutdown_encodes_what_is_queued_then_stops():
+    gate = threading.Event()
+    encoder = CountingEncoder(gate=gate)
+    batcher = EmbeddingBatcher(encoder, batch_size=1, max_wait_ms=NO_DEADLINE_MS)
+
+    running = batcher.submit("1")
+    encoder.started.wait(5)
+    # queued behind the running batch
+    queued = [batcher.submit("2"), batcher.submit("3")]
+
+    stopper = threading.Thread(target=batcher.shutdown)
+    stopper.start()
+    gate.set()
+    stopper.join(5)
+
+    assert not batcher._worker.is_alive()
+    assert [future.result(timeout=0)[0] for future in [running, *queued]] == [1, 2, 3]
+    with pytest.raises(RuntimeError):
+        batcher.submit("4")
+    # a second shutdown is a no-op
+    batcher.shutdown()
+
+
+def test_shutdown_before_first_submit():
+    batcher = EmbeddingBatcher(CountingEncoder())
+    batcher.shutdown()
+
+    assert batcher._worker is None
+    with pytest.raises(RuntimeError):
+        batcher.embed("1")
+
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype="float32")
+
+
+def cache_counts() -> tuple:
+    return counter_value("embedding_cache.hits"), counter_value("embedding_cache.misses")
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    cache = EmbeddingCache("model", maxsize=10, path=None)
+    cache.put(cache.key("What is  a List?"), vector(1))
+
+    assert cache.get(cache.key(" what is a list? "))[0] == 1
+    assert cache.get(cache.key("What is a tuple?")) is None
+    # the model is part of the key
+    other = EmbeddingCache("other-model", maxsize=10, path=None)
+    assert other.key("What is a list?") != cache.key("What is a list?")
+
+
+def test_hits_and_misses_are_counted():
+    cache = EmbeddingCache("model", maxsize=10, path=None)
+    hits, misses = cache_counts()
+
+    cache.get(cache.key("q"))
+    cache.put(cache.key("q"), vector(1))
+    cache.get(cache.key("Q"))
+    cache.get(cache.key("q"))
+
+    assert cache_counts() == (hits + 2, misses + 1)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache("model", maxsize=2, path=None)
+    cache.put(cache.key("a"), vector(1))
+    cache.put(cache.key("b"), vector(2))
+    cache.get(cache.key("a"))
+    cache.put(cache.key("c"), vector(3))
+
+    assert cache.get(cache.key("b")) is None
+    assert cache.get(cache.key("a"))[0] == 1
+    assert cache.get(cache.key("c"))[0] == 3
+
+
+def test_sqlite_tier_serves_evicted_and_reopened_entries(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model", maxsize=1, path=path)
+    cache.put(cache.key("a"), vector(1))
+    cache.put(cache.key("b"), vector(2))
+    assert len(cache.memory) == 1
+
+    # evicted from memory, read back from disk and promoted
+    assert cache.get(cache.key("a"))[0] == 1
+    assert cache.memory.get(cache.key("a")) is not None
+
+    reopened = EmbeddingCache("model", maxsize=10, path=path)
+    assert reopened.get(reopened.key("B")).tolist() == vector(2).tolist()
+
+
+def test_sqlite_tier_keeps_the_most_recently_added(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    cache = EmbeddingCache("model", maxsize=1, path=path, disk_maxsize=2)
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put(cache.key(text), vector(i))
+    # rewriting "c" keeps its place and its neighbour
+    cache.put(cache.key("c"), vector(2))
+    assert len(cache.disk) == 2
+    cache.put(cache.key("d"), vector(3))
+
+    assert len(cache.disk) == 2
+    reopened = EmbeddingCache("model", maxsize=10, path=path)
+    assert [reopened.get(reopened.key(text)) is not None for text in "abcd"] == [
+        False, False, True, True
+    ]
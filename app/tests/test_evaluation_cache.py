@@ -0,0 +1,104 @@
+# app/tests/test_evaluation_cache.py
+import numpy as np
+
+from app.agents import evaluation_agent
+from app.services.evaluation_cache import EvaluationCache, SemanticEvaluationCache
+from app.utils.metrics import LLM_CALL_SECONDS, counter_value
+
+EVALUATION = {"correctness_score": 0.5, "depth_level": "basic", "follow_up_needed": True}
+
+
+def evaluation_calls() -> int:
+    return LLM_CALL_SECONDS.snapshot(agent="evaluation", model="llama-3.1-8b-instant")["count"]
+
+
+def test_key_ignores_case_and_whitespace_but_not_prompt_version():
+    cache = EvaluationCache("v1", maxsize=10, path=None)
+    assert cache.key("What is Python?", "A  language.") == cache.key("what is python?", "a language.")
+    assert cache.key("What is Python?", "A language.") != EvaluationCache("v2", 10, None).key(
+        "What is Python?", "A language."
+    )
+
+
+def test_sqlite_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "evaluations.db")
+    cache = EvaluationCache("v1", maxsize=10, path=path)
+    cache.put(cache.key("q", "a"), EVALUATION)
+
+    reopened = EvaluationCache("v1", maxsize=10, path=path)
+    assert reopened.get(reopened.key("q", "a")) == EVALUATION
+    assert reopened.get(reopened.key("q", "other")) is None
+
+
+def test_repeated_pair_is_evaluated_once(fakes):
+    context = {"question": "What is Python?", "answer": "Python is a programming language."}
+    before = evaluation_calls()
+
+    first = evaluation_agent.evaluate_knowledge(context)
+    second = evaluation_agent.evaluate_knowledge(
+        {"question": "what is python?", "answer": " Python is a programming language. "}
+    )
+
+    assert evaluation_calls() == before + 1
+    assert second == first
+
+
+def unit(*values):
+    vector = np.zeros(8, dtype="float32")
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def test_semantic_hit_needs_both_question_and_answer_close():
+    cache = SemanticEvaluationCache(dim=8, threshold=0.95, maxsize=10, audit_rate=0.0)
+    cache.put(unit(1, 0), unit(0, 1), EVALUATION)
+
+    assert cache.get(unit(1, 0.05), unit(0.05, 1)) == EVALUATION
+    assert cache.get(unit(1, 0), unit(1, 1)) is None
+    assert cache.get(unit(0, 0, 1), unit(0, 1)) is None
+
+
+def test_semantic_cache_evicts_oldest_first():
+    cache = SemanticEvaluationCache(dim=8, threshold=0.99, maxsize=2, audit_rate=0.0)
+    for i in range(3):
+        cache.put(unit(*([0] * i + [1])), unit(1), dict(EVALUATION, correctness_score=i / 2))
+
+    assert len(cache) == 1
+    assert cache.get(unit(1), unit(1)) is None
+    assert cache.get(unit(0, 0, 1), unit(1))["correctness_score"] == 1.0
+
+
+def test_audited_hit_goes_to_the_model_and_counts_false_hits(fakes, monkeypatch):
+    vectors = {
+        "what is python?": unit(1, 0),
+        "explain what python is.": unit(1, 0.02),
+        "a programming language.": unit(0, 1),
+        "it is a programming language.": unit(0.02, 1),
+    }
+    monkeypatch.setattr(evaluation_agent, "EVALUATION_SEMANTIC_CACHE", True)
+    monkeypatch.setattr(
+        evaluation_agent.memory_service, "embed", lambda text: vectors[text.lower()]
+    )
+    evaluation_agent.semantic_cache = SemanticEvaluationCache(dim=8, audit_rate=0.0)
+
+    try:
+        first = evaluation_agent.evaluate_knowledge(
+            {"question": "What is Python?", "answer": "A programming language."}
+        )
+        calls = evaluation_calls()
+        paraphrase = {"question": "Explain what Python is.", "answer": "It is a programming language."}
+
+        assert evaluation_agent.evaluate_knowledge(paraphrase) == first
+        assert evaluation_calls() == calls
+
+        evaluation_agent.evaluation_cache.clear()
+        evaluation_agent.semantic_cache.audit_rate = 1.0
+        audits = counter_value("evaluation_semantic_cache.audits")
+
+        evaluation_agent.evaluate_knowledge(paraphrase)
+        assert evaluation_calls() == calls + 1
+        assert counter_value("evaluation_semantic_cache.audits") == audits + 1
+    finally:
+        evaluation_agent.semantic_cache = SemanticEvaluationCache(
+            evaluation_agent.memory_service.embedding_dim
+        )
@@ -0,0 +1,100 @@
+# app/tests/test_evaluation_modes.py
+import pytest
+
+from app.agents import assessment_agent
+from app.graph import interview_graph
+from app.models.interview_state import InterviewState
+from app.utils.metrics import LLM_CALL_SECONDS
+
+
+def llm_calls(agent: str) -> int:
+    return LLM_CALL_SECONDS.snapshot(agent=agent, model="llama-3.1-8b-instant")["count"]
+
+
+@pytest.fixture
+def graph(fakes, monkeypatch):
+    monkeypatch.setattr(interview_graph, "DECISION_MODE", "llm")
+    return interview_graph.build_interview_graph(speculative=False)
+
+
+def run_turn(graph) -> InterviewState:
+    state = InterviewState(
+        candidate_id="c1",
+        current_question="What is a Python decorator?",
+        candidate_answer="A function wrapping another function.",
+    )
+    return InterviewState(**graph.invoke(state))
+
+
+def test_merged_mode_makes_one_call_for_evaluation_and_decision(graph, monkeypatch):
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "merged")
+    before = {agent: llm_calls(agent) for agent in ("assessment", "evaluation", "decision")}
+
+    state = run_turn(graph)
+
+    assert llm_calls("assessment") == before["assessment"] + 1
+    assert llm_calls("evaluation") == before["evaluation"]
+    assert llm_calls("decision") == before["decision"]
+    assert state.decision is not None
+    assert set(state.knowledge_evaluation) == {
+        "correctness_score", "depth_level", "follow_up_needed"
+    }
+
+
+def test_separate_mode_calls_both_agents(graph, monkeypatch):
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "separate")
+    before = {agent: llm_calls(agent) for agent in ("evaluation", "decision")}
+
+    run_turn(graph)
+
+    assert llm_calls("evaluation") == before["evaluation"] + 1
+    assert llm_calls("decision") == before["decision"] + 1
+
+
+def test_merged_and_separate_evaluations_are_cached_apart(graph, monkeypatch):
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "merged")
+    run_turn(graph)
+    before = {agent: llm_calls(agent) for agent in ("assessment", "evaluation")}
+
+    # the same pair again: served from the assessment prompt's cache
+    run_turn(graph)
+    assert llm_calls("assessment") == before["assessment"]
+
+    # the evaluation prompt never saw this pair
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "separate")
+    run_turn(graph)
+    assert llm_calls("evaluation") == before["evaluation"] + 1
+
+    # and the evaluation prompt's result does not serve merged mode
+    assessment_agent.assessment_caches.clear()
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "merged")
+    run_turn(graph)
+    assert llm_calls("assessment") == before["assessment"] + 1
+
+
+def test_rules_mode_asks_only_for_the_evaluation(graph, monkeypatch):
+    monkeypatch.setattr(interview_graph, "EVALUATION_MODE", "merged")
+    monkeypatch.setattr(interview_graph, "DECISION_MODE", "rules")
+    before = {agent: llm_calls(agent) for agent in ("assessment", "evaluation", "decision")}
+
+    state = run_turn(graph)
+
+    assert llm_calls("assessment") == before["assessment"]
+    assert llm_calls("evaluation") == before["evaluation"] + 1
+    assert llm_calls("decision") == before["decision"]
+    assert state.decision is not None
+
+
+def test_merged_prompt_is_built_from_both_prompts():
+    from app.agents import decision_agent, evaluation_agent
+
+    sections = {
+        evaluation_agent.template: (
+            evaluation_agent.EVALUATION_INSTRUCTIONS, evaluation_agent.ANSWER_INPUTS
+        ),
+        decision_agent.template: (decision_agent.DECISION_RULES, decision_agent.STATE_INPUTS),
+    }
+    for template, parts in sections.items():
+        for part in parts:
+            assert part in template
+            assert part in assessment_agent.template
@@ -0,0 +1,53 @@
+# app/tests/test_graph_state.py
+import dataclasses
+
+from app.models.interview_state import (
+    GraphState,
+    InterviewState,
+    interview_state_from_graph,
+)
+
+
+def populated_state() -> InterviewState:
+    # every field away from its default
+    return InterviewState(
+        candidate_id="parity",
+        interview_status="ended",
+        interview_round=3,
+        max_rounds=7,
+        current_question="What is a list?",
+        candidate_answer="An ordered collection.",
+        past_questions=["What is Python?", "What is a list?"],
+        knowledge_evaluation={"correctness_score": 1.0},
+        weak_topics=["dicts"],
+        candidate_profile={"strengths": ["lists"]},
+        confidence_score=0.9,
+        emotion_state="nervous",
+        topics_covered=["python basics", "lists"],
+        difficulty_level="medium",
+        decision="NEXT_TOPIC",
+        next_question="What is a dict?",
+        question_candidates={"ASK_FOLLOWUP": "Why?"},
+    )
+
+
+def test_graph_state_mirrors_interview_state():
+    fields = {f.name: f for f in dataclasses.fields(GraphState)}
+    assert set(fields) == set(InterviewState.model_fields)
+
+    state = populated_state()
+    assert set(state.model_fields_set) == set(InterviewState.model_fields)
+
+    graph_state = GraphState.from_interview_state(state)
+    values = {name: getattr(graph_state, name) for name in fields}
+    assert interview_state_from_graph(values) == state
+
+
+def test_graph_state_defaults_match_and_hold_plain_values():
+    defaults = GraphState(candidate_id="d")
+    model = InterviewState(candidate_id="d")
+
+    for name in InterviewState.model_fields:
+        assert getattr(defaults, name) == getattr(model, name), name
+    assert type(defaults.interview_status) is str
+    assert type(GraphState.from_interview_state(model).interview_status) is str
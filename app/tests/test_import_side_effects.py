@@ -0,0 +1,47 @@
+# app/tests/test_import_side_effects.py
+import os
+import subprocess
+import sys
+
+from app.benchmarks.bench_import_time import measure_import
+
+# about twice a cold `import app.main`; the heavy modules are checked below
+IMPORT_BUDGET_SECONDS = 3.0
+
+# loaded on first use only
+DEFERRED_MODULES = ("faiss", "sentence_transformers", "langchain_groq", "groq", "redis")
+
+CHECK_SNIPPET = f"""
+import sys
+
+import app.main
+from app.services import llm_service
+from app.services.memory_service import memory_service
+from app.services.orchestrator_registry import orchestrator
+
+assert memory_service._embedder is None
+assert llm_service.get_chat_model.cache_info().currsize == 0
+assert llm_service.get_http_client.cache_info().currsize == 0
+assert llm_service.get_async_http_client.cache_info().currsize == 0
+assert orchestrator._sessions is None
+loaded = [name for name in {DEFERRED_MODULES!r} if name in sys.modules]
+assert not loaded, loaded
+print("ok")
+"""
+
+
+def test_import_builds_no_clients_or_models():
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    out = subprocess.run(
+        [sys.executable, "-c", CHECK_SNIPPET],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().endswith("ok")
+
+
+def test_import_time_within_budget():
+    timings = measure_import(runs=1)
+    assert timings[0] < IMPORT_BUDGET_SECONDS
@@ -1,5 +1,5 @@
 # app/tests/test_interview_flow.py
-from IPython.display import Image, display
+import argparse
 
 from app.agents.orchestrator import InterviewOrchestrator
 from app.services.memory_service import memory_service
@@ -37,20 +37,29 @@ def run_manual_test():
 
     print("\n--- MEMORY DUMP ---")
     print("Stored interactions:")
-    for item in memory_service.metadata:
+    for item in memory_service.get_session_metadata(candidate_id):
         print(item)
 
     print("\nCandidate profile summary:")
-    print(memory_service.summarize_candidate_profile())
+    print(memory_service.summarize_candidate_profile(candidate_id))
 
     print("\nWeak topics:")
-    print(memory_service.get_weak_topics())
+    print(memory_service.get_weak_topics(candidate_id))
 
     # print(orchestrator.graph.get_graph().draw_mermaid())
 
     
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="use the fake LLM and embedder from app.benchmarks.fakes"
+    )
+    if parser.parse_args().offline:
+        from app.benchmarks.fakes import install_fakes
+        install_fakes()
+
     run_manual_test()
 
 
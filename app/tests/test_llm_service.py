@@ -0,0 +1,204 @@
+# app/tests/test_llm_service.py
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableLambda
+
+from app.services import llm_service
+from app.services.llm_service import ConcurrencyLimiter, ManagedChatModel, retry_delay
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.status_code = 429
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = httpx.Response(429, headers=headers)
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class FlakyModel(RunnableLambda):
+    """
+    Fails with the given errors in turn, then answers "ok".
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+        super().__init__(self._call, afunc=self._acall)
+
+    def _call(self, _input):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(content="ok")
+
+    async def _acall(self, _input):
+        return self._call(_input)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_service, "LLM_RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(llm_service, "LLM_RETRY_MAX_DELAY", 0.05)
+
+
+def test_rate_limited_call_is_retried():
+    model = FlakyModel([RateLimited(), RateLimited()])
+    managed = ManagedChatModel(model, "test-model", max_retries=3)
+
+    assert managed.invoke("hi").content == "ok"
+    assert model.calls == 3
+
+
+def test_async_call_is_retried():
+    model = FlakyModel([RateLimited(), httpx.ConnectError("boom")])
+    managed = ManagedChatModel(model, "test-model", max_retries=3)
+
+    assert asyncio.run(managed.ainvoke("hi")).content == "ok"
+    assert model.calls == 3
+
+
+def test_gives_up_after_max_retries_and_on_client_errors():
+    managed = ManagedChatModel(FlakyModel([RateLimited()] * 3), "test-model", max_retries=2)
+    with pytest.raises(RateLimited):
+        managed.invoke("hi")
+
+    model = FlakyModel([BadRequest()])
+    with pytest.raises(BadRequest):
+        ManagedChatModel(model, "test-model", max_retries=3).invoke("hi")
+    assert model.calls == 1
+
+
+def test_retry_delay_honours_retry_after_up_to_the_cap():
+    assert retry_delay(0, RateLimited(retry_after=0.03)) >= 0.03
+    assert retry_delay(0, RateLimited(retry_after=60)) == 0.05
+
+
+def test_stream_not_retried_after_first_chunk():
+    class BrokenStream(RunnableLambda):
+        def __init__(self):
+            super().__init__(lambda _input: None)
+
+        async def astream(self, _input, config=None, **kwargs):
+            yield AIMessageChunk(content="partial")
+            raise RateLimited()
+
+    async def consume():
+        chunks = []
+        async for chunk in ManagedChatModel(BrokenStream(), "test-model").astream("hi"):
+            chunks.append(chunk.content)
+        return chunks
+
+    with pytest.raises(RateLimited):
+        asyncio.run(consume())
+
+
+def test_limiter_caps_in_flight_calls():
+    limiter = ConcurrencyLimiter(global_limit=4, per_model_limit=2)
+    in_flight = peak = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal in_flight, peak
+        with limiter.limit("m"):
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+
+    async def acall():
+        nonlocal in_flight, peak
+        async with limiter.alimit("m"):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def main():
+        await asyncio.gather(*(acall() for _ in range(8)))
+
+    peak = 0
+    asyncio.run(main())
+    assert peak == 2
+
+
+class SlowStream(RunnableLambda):
+    """
+    Streams "a", "b"; the first stream call stalls for `stall` seconds
+    before its first chunk.
+    """
+
+    def __init__(self, stall):
+        self.stall = stall
+        self.calls = 0
+        super().__init__(lambda _input: None)
+
+    async def astream(self, _input, config=None, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(self.stall)
+        for content in ("a", "b"):
+            yield AIMessageChunk(content=content)
+
+
+def test_astream_deadline_covers_waiting_on_the_model_only():
+    model = SlowStream(stall=10)
+    managed = ManagedChatModel(model, "test-model", max_retries=1, timeout=0.05)
+
+    async def consume():
+        chunks = []
+        async for chunk in managed.astream("hi"):
+            chunks.append(chunk.content)
+            # a slow consumer does not use up the model's time
+            await asyncio.sleep(0.06)
+        return chunks
+
+    # the stalled first attempt times out and is retried
+    assert asyncio.run(consume()) == ["a", "b"]
+    assert model.calls == 2
+
+
+def test_sync_stream_fails_once_past_the_deadline():
+    def chunks(_input):
+        yield AIMessageChunk(content="a")
+        time.sleep(0.06)
+        yield AIMessageChunk(content="b")
+
+    managed = ManagedChatModel(RunnableLambda(chunks), "test-model", timeout=0.05)
+    received = []
+    with pytest.raises(TimeoutError):
+        for chunk in managed.stream("hi"):
+            received.append(chunk.content)
+    assert received == ["a"]
+
+
+def test_aclose_drops_cached_models_and_chains():
+    from app.agents.question_agent import get_question_chain
+    from app.benchmarks.fakes import FakeChatModel
+
+    llm_service.set_model_factory(lambda model, callbacks, **kwargs: FakeChatModel())
+    try:
+        model, chain = llm_service.get_chat_model("test"), get_question_chain()
+        asyncio.run(llm_service.aclose_http_clients())
+
+        assert llm_service.get_chat_model("test") is not model
+        assert get_question_chain() is not chain
+    finally:
+        llm_service.set_model_factory(None)
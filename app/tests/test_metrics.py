@@ -0,0 +1,99 @@
+# app/tests/test_metrics.py
+import pytest
+
+from app.utils import metrics
+from app.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    _MetricFamily,
+    counter,
+    gauge,
+    histogram,
+    render_prometheus,
+)
+
+
+def test_metric_family_is_abstract():
+    with pytest.raises(TypeError):
+        _MetricFamily("interview_test_abstract", "no samples")
+
+    class NoSamples(_MetricFamily):
+        kind = "counter"
+
+    with pytest.raises(TypeError):
+        NoSamples("interview_test_no_samples", "no samples")
+
+
+def test_counter_and_gauge_render():
+    requests = Counter("interview_test_requests_total", "Requests.")
+    requests.inc(route="/a")
+    requests.inc(2, route="/a")
+    requests.inc(route='say "hi"\n')
+    temperature = Gauge("interview_test_temperature", "Temperature.")
+    temperature.set(21.5)
+
+    assert requests.render() == [
+        "# HELP interview_test_requests_total Requests.",
+        "# TYPE interview_test_requests_total counter",
+        'interview_test_requests_total{route="/a"} 3',
+        'interview_test_requests_total{route="say \\"hi\\"\\n"} 1',
+    ]
+    assert temperature.render() == [
+        "# HELP interview_test_temperature Temperature.",
+        "# TYPE interview_test_temperature gauge",
+        "interview_test_temperature 21.5",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("interview_test_latency_seconds", "Latency.", buckets=(1.0, 0.01, 0.1))
+    for value in (0.003, 0.01, 0.02, 50):
+        latency.observe(value, node="evaluate")
+
+    assert latency.render() == [
+        "# HELP interview_test_latency_seconds Latency.",
+        "# TYPE interview_test_latency_seconds histogram",
+        'interview_test_latency_seconds_bucket{node="evaluate",le="0.01"} 2',
+        'interview_test_latency_seconds_bucket{node="evaluate",le="0.1"} 3',
+        'interview_test_latency_seconds_bucket{node="evaluate",le="1.0"} 3',
+        'interview_test_latency_seconds_bucket{node="evaluate",le="+Inf"} 4',
+        'interview_test_latency_seconds_sum{node="evaluate"} 50.033',
+        'interview_test_latency_seconds_count{node="evaluate"} 4',
+    ]
+    assert latency.snapshot(node="evaluate") == {"count": 4, "mean_ms": 12508.25}
+
+
+def test_render_prometheus_includes_every_registered_family():
+    counter("interview_test_rendered_total", "Rendered counter.").inc(kind="x")
+    gauge("interview_test_rendered", "Rendered gauge.").set(3)
+    histogram("interview_test_rendered_seconds", "Rendered histogram.", buckets=(1.0,)).observe(0.5)
+    # registering again returns the same family
+    assert counter("interview_test_rendered_total", "ignored") is metrics._families[
+        "interview_test_rendered_total"
+    ]
+
+    text = render_prometheus()
+
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    for line in (
+        "# TYPE interview_test_rendered_total counter",
+        'interview_test_rendered_total{kind="x"} 1',
+        "# TYPE interview_test_rendered gauge",
+        "interview_test_rendered 3",
+        "# TYPE interview_test_rendered_seconds histogram",
+        'interview_test_rendered_seconds_bucket{le="1.0"} 1',
+        'interview_test_rendered_seconds_bucket{le="+Inf"} 1',
+        "interview_test_rendered_seconds_count 1",
+    ):
+        assert line in lines
+
+    # every sample line belongs to a family announced before it
+    announced = set()
+    for line in lines:
+        if line.startswith("# TYPE "):
+            announced.add(line.split()[2])
+        elif not line.startswith("#"):
+            name = line.split("{")[0].split(" ")[0]
+            assert name in announced or name.rsplit("_", 1)[0] in announced, line
@@ -0,0 +1,146 @@
+# app/tests/test_question_bank.py
+import numpy as np
+import pytest
+
+from app.agents.decision_agent import RuleDecision
+from app.graph import interview_graph
+from app.models.interview_state import DecisionType, InterviewState
+from app.services.question_bank import (
+    BankQuestion,
+    QuestionBank,
+    deduplicate,
+    get_question_bank,
+    next_difficulty,
+)
+from app.utils.metrics import LLM_CALL_SECONDS
+
+BANK = QuestionBank([
+    BankQuestion("lists", "easy", "What is a list?"),
+    BankQuestion("lists", "medium", "Why are lists mutable?"),
+    BankQuestion("dicts", "easy", "What is a dict?"),
+])
+
+
+def test_pick_skips_covered_topics_and_asked_questions():
+    picked = BANK.pick("s1", "easy", covered_topics=["lists"])
+    assert picked == BankQuestion("dicts", "easy", "What is a dict?")
+
+    assert BANK.pick("s1", "easy", asked=["What is a list?", "What is a dict?"]) is None
+    assert BANK.pick("s1", "hard") is None
+
+
+def test_next_difficulty_saturates():
+    assert [next_difficulty(d) for d in ("easy", "medium", "hard")] == ["medium", "hard", "hard"]
+
+
+def test_deduplicate_drops_near_identical_embeddings():
+    questions = [BankQuestion("t", "easy", q) for q in ("a", "a'", "b")]
+    embeddings = np.array([[1, 0], [0.99, 0.05], [0, 1]], dtype="float32")
+    assert [q.question for q in deduplicate(questions, embeddings, threshold=0.9)] == ["a", "b"]
+
+
+def test_seed_bank_covers_every_difficulty():
+    bank = get_question_bank()
+    assert len(bank) > 0
+    for difficulty in ("easy", "medium", "hard"):
+        assert bank.pick("any", difficulty) is not None
+
+
+@pytest.fixture
+def graph(fakes):
+    return interview_graph.build_interview_graph(speculative=False)
+
+
+def question_calls() -> int:
+    return LLM_CALL_SECONDS.snapshot(agent="question", model="llama-3.1-8b-instant")["count"]
+
+
+@pytest.mark.parametrize("decision, difficulty, question", [
+    (DecisionType.NEXT_TOPIC, "easy", "What is a dict?"),
+    (DecisionType.INCREASE_DIFFICULTY, "medium", "Why must dict keys be hashable?"),
+    (DecisionType.ASK_FOLLOWUP, "easy", None),
+])
+def test_topic_switches_are_served_from_the_bank(graph, monkeypatch, decision, difficulty, question):
+    bank = QuestionBank(BANK.questions() + [
+        BankQuestion("dicts", "medium", "Why must dict keys be hashable?")
+    ])
+    monkeypatch.setattr(interview_graph, "get_question_bank", lambda: bank)
+    monkeypatch.setattr(
+        interview_graph, "apply_decision_rules", lambda context: RuleDecision(decision.value)
+    )
+    calls = question_calls()
+
+    state = InterviewState(
+        candidate_id="s1",
+        current_question="What is a list?",
+        candidate_answer="An ordered collection.",
+        past_questions=["What is a list?"],
+        topics_covered=["lists"],
+    )
+    state = InterviewState(**graph.invoke(state))
+
+    assert state.difficulty_level == difficulty
+    if question is None:
+        # follow-ups are still tailored by the model
+        assert question_calls() == calls + 1
+        assert state.topics_covered == ["lists"]
+    else:
+        assert question_calls() == calls
+        assert state.next_question == question
+        assert state.topics_covered == ["lists", "dicts"]
+
+
+@pytest.mark.parametrize("bank", [
+    QuestionBank([]),
+    # no bucket at this difficulty
+    QuestionBank([BankQuestion("dicts", "hard", "How is a dict resized?")]),
+])
+def test_generated_topic_switch_records_a_topic(graph, monkeypatch, bank):
+    monkeypatch.setattr(interview_graph, "get_question_bank", lambda: bank)
+    monkeypatch.setattr(
+        interview_graph, "apply_decision_rules",
+        lambda context: RuleDecision(DecisionType.NEXT_TOPIC.value)
+    )
+    calls = question_calls()
+
+    state = InterviewState(
+        candidate_id="s1",
+        current_question="What is a list?",
+        candidate_answer="An ordered collection.",
+        past_questions=["What is a list?"],
+        topics_covered=["lists"],
+    )
+    state = InterviewState(**graph.invoke(state))
+
+    assert question_calls() == calls + 1
+    # the next answer is not filed under "lists"
+    assert state.topics_covered == ["lists", interview_graph.GENERATED_TOPIC]
+
+
+def test_answer_is_stored_under_the_topic_it_answered(fakes, monkeypatch):
+    from app.agents.orchestrator import InterviewOrchestrator
+    from app.services.memory_service import memory_service
+    from app.services.session_store import InMemorySessionStore
+
+    monkeypatch.setattr(interview_graph, "get_question_bank", lambda: BANK)
+    monkeypatch.setattr("app.agents.orchestrator.get_question_bank", lambda: BANK)
+    monkeypatch.setattr(
+        interview_graph, "apply_decision_rules",
+        lambda context: RuleDecision(DecisionType.NEXT_TOPIC.value)
+    )
+    try:
+        orchestrator = InterviewOrchestrator(InMemorySessionStore())
+        first = orchestrator.start_session("topic-attribution")
+        first_topic = first.topics_covered[-1]
+
+        orchestrator.run_step("topic-attribution", "An answer to the first question.")
+
+        state = orchestrator.get_session("topic-attribution")
+        stored = memory_service.get_session_metadata("topic-attribution")
+        # the bank switched topic for the next question
+        assert state.topics_covered[-1] != first_topic
+        assert [(item["question"], item["topic"]) for item in stored] == [
+            (first.current_question, first_topic)
+        ]
+    finally:
+        orchestrator.end_session("topic-attribution")
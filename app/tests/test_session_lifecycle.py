@@ -0,0 +1,255 @@
+# app/tests/test_session_lifecycle.py
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agents import orchestrator as orchestrator_module
+from app.agents.orchestrator import InterviewOrchestrator
+from app.api import interview_routes
+from app.models.interview_state import InterviewStatus, create_initial_state
+from app.services.memory_service import MemoryService, memory_service
+from app.services.session_store import InMemorySessionStore, SQLiteSessionStore
+from app.utils.metrics import gauge
+
+NOW = 1_000_000.0
+EVALUATION = {"correctness_score": 1.0, "depth_level": "good"}
+PROFILE = {"strengths": ["lists"], "weaknesses": ["generators"], "total_interactions": 2}
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "SESSION_IDLE_TTL", 1800.0)
+    monkeypatch.setattr(orchestrator_module, "SESSION_ENDED_TTL", 300.0)
+    monkeypatch.setattr(orchestrator_module, "SESSION_MAX_ACTIVE", 100)
+    orchestrator = InterviewOrchestrator(InMemorySessionStore())
+    yield orchestrator
+    for session_id in orchestrator.active_sessions():
+        orchestrator.end_session(session_id)
+
+
+def add_session(orchestrator, session_id: str, idle: float, ended: bool = False, profile=None):
+    state = create_initial_state(session_id)
+    if ended:
+        state.interview_status = InterviewStatus.ENDED
+    if profile is not None:
+        state.candidate_profile = profile
+    orchestrator.save_state(session_id, state)
+    # last save `idle` seconds before NOW
+    orchestrator.sessions._updated[session_id] = NOW - idle
+
+
+def test_idle_sessions_are_archived(orchestrator):
+    add_session(orchestrator, "idle", idle=1801)
+    add_session(orchestrator, "active", idle=60)
+
+    assert orchestrator.sweep_sessions(now=NOW) == ["idle"]
+    assert orchestrator.active_sessions() == ["active"]
+    assert orchestrator.get_archived("idle")["status"] == InterviewStatus.ONGOING
+
+
+def test_ended_sessions_are_archived_after_the_shorter_ttl(orchestrator):
+    add_session(orchestrator, "ended", idle=301, ended=True)
+    add_session(orchestrator, "ongoing", idle=301)
+    add_session(orchestrator, "just-ended", idle=60, ended=True)
+
+    assert orchestrator.sweep_sessions(now=NOW) == ["ended"]
+    assert sorted(orchestrator.active_sessions()) == ["just-ended", "ongoing"]
+
+
+def test_overflow_archives_least_recently_updated_first(orchestrator, monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "SESSION_MAX_ACTIVE", 2)
+    for session_id, idle in (("b", 30), ("oldest", 50), ("newest", 10), ("a", 40)):
+        add_session(orchestrator, session_id, idle)
+
+    assert orchestrator.sweep_sessions(now=NOW) == ["oldest", "a"]
+    assert sorted(orchestrator.active_sessions()) == ["b", "newest"]
+
+
+def routes_client(orchestrator, monkeypatch) -> TestClient:
+    monkeypatch.setattr(interview_routes, "orchestrator", orchestrator)
+    app = FastAPI()
+    app.include_router(interview_routes.router)
+    return TestClient(app)
+
+
+def test_status_and_summary_are_served_from_the_archive(orchestrator, monkeypatch):
+    client = routes_client(orchestrator, monkeypatch)
+
+    add_session(orchestrator, "archived", idle=1801, profile=PROFILE)
+    memory_service._add_interaction(
+        np.ones((1, memory_service.embedding_dim), dtype="float32"),
+        "archived", "What is a list?", "An ordered collection.", EVALUATION, "lists", 1
+    )
+    orchestrator.sweep_sessions(now=NOW)
+
+    # state and memory are gone, the summary is all that is left
+    assert not orchestrator.has_session("archived")
+    assert memory_service.get_session_metadata("archived") == []
+
+    status = client.get("/interviews/archived/status")
+    assert status.status_code == 200
+    assert status.json() == {"session_id": "archived", "status": "ongoing", "round": 1}
+
+    summary = client.get("/interviews/archived/summary")
+    assert summary.status_code == 200
+    assert summary.json() == {
+        "session_id": "archived",
+        "status": "ongoing",
+        "strengths": ["lists"],
+        "weaknesses": ["generators"],
+        "total_rounds": 1,
+    }
+
+    assert client.get("/interviews/unknown/status").status_code == 404
+
+
+def test_summary_comes_from_the_saved_state(orchestrator, monkeypatch):
+    # this worker holds no memory for the session
+    client = routes_client(orchestrator, monkeypatch)
+    add_session(orchestrator, "elsewhere", idle=0, profile=PROFILE)
+
+    summary = client.get("/interviews/elsewhere/summary").json()
+    assert (summary["strengths"], summary["weaknesses"]) == (["lists"], ["generators"])
+
+
+def test_archive_is_shared_through_the_store(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.db")
+    sweeper = InterviewOrchestrator(SQLiteSessionStore(path))
+    other = InterviewOrchestrator(SQLiteSessionStore(path))
+    state = create_initial_state("shared")
+    state.candidate_profile = PROFILE
+    sweeper.save_state("shared", state)
+
+    assert sweeper.sweep_sessions(now=time.time() + 1801) == ["shared"]
+
+    # another worker answers from the same store
+    client = routes_client(other, monkeypatch)
+    assert client.get("/interviews/shared/status").json() == {
+        "session_id": "shared", "status": "ongoing", "round": 1
+    }
+    assert client.get("/interviews/shared/summary").json()["weaknesses"] == ["generators"]
+    assert other.sessions.archived_count() == 1
+
+
+def test_resident_bytes_gauge_follows_the_running_counts(orchestrator):
+    add_session(orchestrator, "s1", idle=0)
+    add_session(orchestrator, "s2", idle=0)
+    orchestrator.update_gauges()
+
+    expected = orchestrator.sessions.resident_bytes() + memory_service.resident_bytes()
+    assert gauge("interview_sessions_resident_bytes", "").value() == expected
+
+    orchestrator.end_session("s1")
+    orchestrator.end_session("s2")
+    assert orchestrator.sessions.resident_bytes() == 0
+
+
+def test_memory_resident_bytes_is_kept_running():
+    service = MemoryService(max_interactions=2)
+    vector = np.ones((1, service.embedding_dim), dtype="float32")
+
+    def walked() -> int:
+        # what resident_bytes used to compute on every scrape
+        return sum(
+            memory.index.ntotal * service.embedding_dim * 4
+            + sum(len(item["question"]) + len(item["answer"]) for item in memory.metadata)
+            for memory in service.sessions.values()
+        )
+
+    service._add_interaction(vector, "s1", "q1", "answer one", EVALUATION, "t", 1)
+    service._add_interaction(vector, "s2", "question two", "a", EVALUATION, "t", 1)
+    assert service.resident_bytes() == walked() > 0
+
+    # over budget: s1 is evicted
+    service._add_interaction(vector, "s2", "q", "another answer", EVALUATION, "t", 2)
+    assert list(service.sessions) == ["s2"]
+    assert service.resident_bytes() == walked()
+
+    service.drop_session("s2")
+    assert service.resident_bytes() == 0
+
+
+class BlockingGraph:
+    """
+    Stands in for the compiled graph: invoke waits for `release`, then
+    returns the next round.
+    """
+
+    checkpointer = None
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def invoke(self, graph_input, config=None):
+        self.started.set()
+        assert self.release.wait(10)
+        values = dataclasses.asdict(graph_input)
+        values["interview_round"] += 1
+        values["current_question"] = "What is a tuple?"
+        return values
+
+
+def test_sweep_skips_a_session_with_a_turn_in_flight(orchestrator, monkeypatch):
+    graph = BlockingGraph()
+    monkeypatch.setattr(orchestrator_module, "get_interview_graph", lambda: graph)
+    add_session(orchestrator, "slow", idle=1801)
+    add_session(orchestrator, "idle", idle=1801)
+
+    turn = ThreadPoolExecutor(max_workers=1).submit(
+        orchestrator.run_step, "slow", "A list is mutable."
+    )
+    assert graph.started.wait(5)
+
+    # the turn loaded the state before the sweep and saves it after
+    assert orchestrator.sweep_sessions(now=NOW) == ["idle"]
+    graph.release.set()
+    assert turn.result(timeout=5)["interview_round"] == 2
+
+    assert orchestrator.get_archived("slow") is None
+    assert orchestrator.load_state("slow").interview_round == 2
+    # nothing is left marked in flight
+    assert orchestrator.sweep_sessions(now=time.time() + 1801) == ["slow"]
+
+
+def test_turn_waits_for_an_archive_in_progress(orchestrator, monkeypatch):
+    graph = BlockingGraph()
+    graph.release.set()
+    monkeypatch.setattr(orchestrator_module, "get_interview_graph", lambda: graph)
+    add_session(orchestrator, "s1", idle=1801)
+    assert orchestrator._claim_for_archive("s1")
+
+    turn = ThreadPoolExecutor(max_workers=1).submit(orchestrator.run_step, "s1", "A list.")
+    time.sleep(0.05)
+    assert not graph.started.is_set()
+
+    orchestrator.archive_session("s1")
+    orchestrator._release_archive("s1")
+    # the turn starts over on a fresh state rather than writing the old one back
+    assert turn.result(timeout=5)["interview_round"] == 2
+    assert orchestrator.get_archived("s1")["round"] == 1
+
+
+def test_other_workers_sessions_are_swept_only_as_orphans(tmp_path, monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "SESSION_IDLE_TTL", 1800.0)
+    monkeypatch.setattr(orchestrator_module, "SESSION_ORPHAN_TTL", 3600.0)
+    monkeypatch.setattr(orchestrator_module, "SESSION_MAX_ACTIVE", 1)
+    path = str(tmp_path / "sessions.db")
+    a = InterviewOrchestrator(SQLiteSessionStore(path, owner="a"))
+    b = InterviewOrchestrator(SQLiteSessionStore(path, owner="b"))
+    a.save_state("mine", create_initial_state("mine"))
+    b.save_state("theirs", create_initial_state("theirs"))
+    now = time.time()
+
+    # idle for a, but b may still be serving it; the cap counts only a's own
+    assert a.sweep_sessions(now=now + 1801) == ["mine"]
+    assert a.active_sessions() == ["theirs"]
+    # b never came back
+    assert a.sweep_sessions(now=now + 3601) == ["theirs"]
+    assert b.get_archived("theirs")["session_id"] == "theirs"
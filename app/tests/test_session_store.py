@@ -0,0 +1,244 @@
+# app/tests/test_session_store.py
+import fnmatch
+
+import pytest
+
+from app.models.interview_state import create_initial_state
+from app.services.session_store import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+    serialize_state,
+)
+
+
+class LocalRedisStandIn:
+    """
+    The subset of the redis-py client API the store uses, backed by a dict.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+        self.lists = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def scan_iter(self, match="*"):
+        for key in list(self.data) + list(self.hashes) + list(self.lists):
+            if fnmatch.fnmatch(key, match):
+                yield key.encode("utf-8")
+
+    def hset(self, name, key, value):
+        fields = self.hashes.setdefault(name, {})
+        added = int(key not in fields)
+        fields[key] = str(value).encode("utf-8")
+        return added
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hdel(self, name, key):
+        return 1 if self.hashes.get(name, {}).pop(key, None) is not None else 0
+
+    def hgetall(self, name):
+        return {k.encode("utf-8"): v for k, v in self.hashes.get(name, {}).items()}
+
+    def hlen(self, name):
+        return len(self.hashes.get(name, {}))
+
+    def rpush(self, name, value):
+        self.lists.setdefault(name, []).append(value.encode("utf-8"))
+        return len(self.lists[name])
+
+    def lpop(self, name):
+        values = self.lists.get(name)
+        return values.pop(0) if values else None
+
+    def llen(self, name):
+        return len(self.lists.get(name, []))
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionStore(archive_size=2)
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), archive_size=2)
+    return RedisSessionStore(LocalRedisStandIn(), archive_size=2)
+
+
+def test_round_trip(store):
+    state = create_initial_state("s1")
+    state.current_question = "What is Python?"
+    state.past_questions.append("What is Python?")
+    state.knowledge_evaluation = {"correctness_score": 0.5, "depth_level": "basic"}
+    state.decision = "ASK_FOLLOWUP"
+
+    store.set("s1", state)
+
+    loaded = store.get("s1")
+    assert loaded == state
+    assert "s1" in store
+    assert store.keys() == ["s1"]
+    assert list(store.last_updated()) == ["s1"]
+    assert store.resident_bytes() == len(serialize_state(state))
+
+
+def test_missing_and_delete(store):
+    assert store.get("nope") is None
+    assert "nope" not in store
+
+    store.set("s1", create_initial_state("s1"))
+    assert store.delete("s1")
+    assert not store.delete("s1")
+    assert store.get("s1") is None
+    assert len(store) == 0
+    assert store.last_updated() == {}
+
+
+def test_archived_summaries_are_bounded(store):
+    for session_id in ("a", "b", "c"):
+        store.archive(session_id, {"session_id": session_id, "round": 1})
+    # re-archiving replaces the summary, it is not a second entry
+    store.archive("c", {"session_id": "c", "round": 2})
+
+    assert store.get_archived("a") is None
+    assert store.get_archived("b") == {"session_id": "b", "round": 1}
+    assert store.get_archived("c") == {"session_id": "c", "round": 2}
+    assert store.archived_count() == 2
+    # summaries are not live sessions
+    assert store.keys() == []
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "redis"])
+def test_last_updated_filters_by_the_worker_that_saved_last(backend, tmp_path):
+    if backend == "sqlite":
+        path = str(tmp_path / "sessions.db")
+        a, b = SQLiteSessionStore(path, owner="a"), SQLiteSessionStore(path, owner="b")
+    else:
+        client = LocalRedisStandIn()
+        a, b = RedisSessionStore(client, owner="a"), RedisSessionStore(client, owner="b")
+
+    a.set("s1", create_initial_state("s1"))
+    a.set("s2", create_initial_state("s2"))
+    # a turn of s2 landed on the other worker
+    b.set("s2", create_initial_state("s2"))
+
+    assert sorted(a.last_updated()) == ["s1", "s2"]
+    assert list(a.last_updated(owner="a")) == ["s1"]
+    assert list(a.last_updated(owner=b.owner)) == ["s2"]
+    b.delete("s2")
+    assert b.last_updated(owner="b") == {}
+    assert a.keys() == ["s1"]
+
+
+def test_sqlite_adds_the_owner_column_to_an_old_file(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "sessions.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE sessions ("
+        "session_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = SQLiteSessionStore(path, owner="a")
+    store.set("s1", create_initial_state("s1"))
+    assert list(store.last_updated(owner="a")) == ["s1"]
+
+
+def test_serialization_is_compact():
+    # defaults are not written out
+    assert serialize_state(create_initial_state("s1")) == b'{"candidate_id":"s1"}'
+
+
+def test_async_turns_keep_store_io_off_the_event_loop(fakes, tmp_path):
+    import asyncio
+    import threading
+
+    from app.agents.orchestrator import InterviewOrchestrator
+
+    class RecordingStore(SQLiteSessionStore):
+        def __init__(self, path):
+            super().__init__(path)
+            self.threads = []
+
+        def get(self, session_id):
+            self.threads.append(threading.get_ident())
+            return super().get(session_id)
+
+        def set(self, session_id, state):
+            self.threads.append(threading.get_ident())
+            super().set(session_id, state)
+
+    try:
+        store = RecordingStore(str(tmp_path / "sessions.db"))
+        orchestrator = InterviewOrchestrator(store)
+
+        async def turn():
+            assert not await orchestrator.ahas_session("async-io")
+            await orchestrator.astart_session("async-io")
+            await orchestrator.arun_step("async-io", "A list is an ordered collection.")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(turn())
+
+        assert store.threads
+        assert loop_thread not in store.threads
+        assert store.get("async-io").interview_round == 2
+    finally:
+        orchestrator.end_session("async-io")
+
+
+def test_resident_bytes_is_kept_on_set_and_delete(store):
+    small, large = create_initial_state("s1"), create_initial_state("s2")
+    large.past_questions = ["What is Python?"] * 20
+
+    store.set("s1", small)
+    store.set("s2", small)
+    store.set("s2", large)
+    # read on every /metrics scrape: no state is loaded to count it
+    store.get = lambda session_id: pytest.fail("resident_bytes loaded a state")
+    assert store.resident_bytes() == len(serialize_state(small)) + len(serialize_state(large))
+    # the size bookkeeping is not a session
+    assert sorted(store.keys()) == ["s1", "s2"]
+
+    store.delete("s2")
+    assert store.resident_bytes() == len(serialize_state(small))
+    store.delete("s1")
+    assert store.resident_bytes() == 0
+
+
+def test_sqlite_size_count_is_seeded_from_existing_rows(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "sessions.db")
+    state = create_initial_state("s1")
+    # a file written before the running count existed
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE sessions ("
+        "session_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO sessions VALUES (?, ?, 0)", ("s1", serialize_state(state)))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteSessionStore(path)
+    assert store.resident_bytes() == len(serialize_state(state))
+    # a second worker opening the same file does not seed it again
+    assert SQLiteSessionStore(path).resident_bytes() == len(serialize_state(state))
@@ -0,0 +1,184 @@
+# app/tests/test_speculation.py
+import asyncio
+
+import pytest
+
+from app.agents.decision_agent import RuleDecision
+from app.agents.evaluation_agent import EvaluationOutput
+from app.graph import interview_graph
+from app.models.interview_state import DecisionType, InterviewState
+from app.services.question_bank import QuestionBank
+from app.utils.metrics import counter_value
+
+SPECULATION_COUNTERS = ("candidates", "used", "wasted", "miss", "failed")
+EVALUATION = EvaluationOutput(correctness_score=0.6, depth_level="basic", follow_up_needed=False)
+
+
+def speculation_counters() -> dict:
+    return {name: counter_value(f"speculation.{name}") for name in SPECULATION_COUNTERS}
+
+
+def counted_since(before: dict) -> dict:
+    return {name: value - before[name] for name, value in speculation_counters().items()}
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    # a fixed evaluation; the decision comes from decide()
+    async def aevaluate(context):
+        return EVALUATION
+
+    monkeypatch.setattr(interview_graph, "evaluate_knowledge", lambda context: EVALUATION)
+    monkeypatch.setattr(interview_graph, "aevaluate_knowledge", aevaluate)
+    # nothing in the bank: every question comes from the model
+    monkeypatch.setattr(interview_graph, "get_question_bank", lambda: QuestionBank([]))
+    return interview_graph.build_interview_graph(speculative=True)
+
+
+@pytest.fixture
+def generated(monkeypatch) -> list:
+    """
+    (focus, difficulty) of every question generated, sync or async; the
+    question text names the difficulty it was generated at.
+    """
+    calls = []
+
+    def generate(context):
+        calls.append((context.get("focus"), context["difficulty_level"]))
+        return f"{context['difficulty_level']} question {len(calls)}"
+
+    async def agenerate(context):
+        return generate(context)
+
+    monkeypatch.setattr(interview_graph, "generate_question", generate)
+    monkeypatch.setattr(interview_graph, "agenerate_question", agenerate)
+    return calls
+
+
+def decide(monkeypatch, decision: DecisionType):
+    monkeypatch.setattr(
+        interview_graph, "apply_decision_rules", lambda context: RuleDecision(decision.value)
+    )
+
+
+def initial_state(difficulty: str = "easy") -> InterviewState:
+    return InterviewState(
+        candidate_id="spec",
+        current_question="What is a list?",
+        candidate_answer="An ordered collection.",
+        past_questions=["What is a list?"],
+        topics_covered=["lists"],
+        difficulty_level=difficulty,
+    )
+
+
+def run_turn(graph, state: InterviewState, use_async: bool) -> InterviewState:
+    if use_async:
+        return InterviewState(**asyncio.run(graph.ainvoke(state)))
+    return InterviewState(**graph.invoke(state))
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_raised_difficulty_does_not_serve_a_stale_candidate(graph, generated, monkeypatch, use_async):
+    decide(monkeypatch, DecisionType.INCREASE_DIFFICULTY)
+    used = counter_value("speculation.used")
+
+    state = run_turn(graph, initial_state("easy"), use_async)
+
+    assert state.difficulty_level == "medium"
+    assert state.next_question.startswith("medium question")
+    assert generated[-1] == (None, "medium")
+    assert counter_value("speculation.used") == used
+    assert state.question_candidates == {}
+
+
+def test_candidate_is_kept_when_difficulty_is_already_at_the_top(graph, generated, monkeypatch):
+    decide(monkeypatch, DecisionType.INCREASE_DIFFICULTY)
+    used = counter_value("speculation.used")
+
+    state = run_turn(graph, initial_state("hard"), use_async=False)
+
+    assert state.difficulty_level == "hard"
+    assert counter_value("speculation.used") == used + 1
+    assert (interview_graph.NEW_TOPIC_FOCUS, "hard") in generated
+    assert all(focus is not None for focus, _ in generated)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_predicted_candidate_is_reused(graph, generated, monkeypatch, use_async):
+    decide(monkeypatch, DecisionType.NEXT_TOPIC)
+    before = speculation_counters()
+
+    state = run_turn(graph, initial_state(), use_async)
+
+    # no question was generated after the decision
+    assert interview_graph.NEW_TOPIC_FOCUS in {focus for focus, _ in generated}
+    assert all(focus is not None for focus, _ in generated)
+    position = int(state.next_question.rsplit(" ", 1)[1]) - 1
+    assert generated[position][0] == interview_graph.NEW_TOPIC_FOCUS
+    assert counted_since(before) == {
+        "candidates": 2, "used": 1, "wasted": 1, "miss": 0, "failed": 0
+    }
+    assert state.question_candidates == {}
+
+
+def test_unneeded_branch_is_cancelled_once_the_evaluation_is_known(graph, monkeypatch):
+    decide(monkeypatch, DecisionType.NEXT_TOPIC)
+    cancelled = []
+    started = asyncio.Event()
+
+    async def aevaluate(context):
+        # known only once the follow-up candidate is under way
+        await started.wait()
+        return EVALUATION
+
+    async def agenerate(context):
+        if context["focus"] == interview_graph.FOLLOWUP_FOCUS:
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(context["focus"])
+                raise
+        return "next-topic candidate"
+
+    monkeypatch.setattr(interview_graph, "aevaluate_knowledge", aevaluate)
+    monkeypatch.setattr(interview_graph, "agenerate_question", agenerate)
+    before = speculation_counters()
+
+    # the follow-up candidate never finishes on its own: the turn only
+    # completes because it is cancelled
+    state = InterviewState(**asyncio.run(
+        asyncio.wait_for(graph.ainvoke(initial_state()), timeout=10)
+    ))
+
+    assert cancelled == [interview_graph.FOLLOWUP_FOCUS]
+    assert state.next_question == "next-topic candidate"
+    assert counted_since(before)["wasted"] == 1
+
+
+def test_failed_candidate_is_a_miss(graph, generated, monkeypatch):
+    # llm mode keeps every candidate until the model has decided
+    monkeypatch.setattr(interview_graph, "DECISION_MODE", "llm")
+    monkeypatch.setattr(
+        interview_graph, "decide_next_step",
+        lambda context: RuleDecision(DecisionType.ASK_FOLLOWUP.value)
+    )
+    generate = interview_graph.generate_question
+
+    def failing_followups(context):
+        if context.get("focus") == interview_graph.FOLLOWUP_FOCUS:
+            raise RuntimeError("model unavailable")
+        return generate(context)
+
+    monkeypatch.setattr(interview_graph, "generate_question", failing_followups)
+    before = speculation_counters()
+
+    state = run_turn(graph, initial_state(), use_async=False)
+
+    # generated again after the decision, without a focus
+    assert generated[-1] == (None, "easy")
+    assert state.next_question == f"easy question {len(generated)}"
+    assert counted_since(before) == {
+        "candidates": 2, "used": 0, "wasted": 1, "miss": 1, "failed": 1
+    }
@@ -0,0 +1,187 @@
+# app/tests/test_websocket_backpressure.py
+import asyncio
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from app.api import websocket_routes
+from app.api.websocket_routes import InterviewConnection
+
+# only bounds a wait that should already be satisfied; no test sleeps on it
+WAIT_SECONDS = 5
+
+
+class GatedOrchestrator:
+    """
+    Each turn announces its answer on `started`, then waits until the test
+    lets it finish with release().
+    """
+
+    def __init__(self):
+        self.answers = []
+        self.started = asyncio.Queue()
+        self.gate = asyncio.Semaphore(0)
+
+    def release(self):
+        self.gate.release()
+
+    async def arun_step(self, candidate_id, candidate_answer, on_question_delta=None):
+        self.answers.append(candidate_answer)
+        self.started.put_nowait(candidate_answer)
+        await self.gate.acquire()
+        return {
+            "next_question": f"Question {len(self.answers) + 1}?",
+            "interview_status": "ongoing",
+            "interview_round": len(self.answers) + 1
+        }
+
+
+class ScriptedWebSocket:
+    """
+    The client side: deliver() hands over messages (None disconnects) and
+    returns once the server has read all of them and waits for more.
+    """
+
+    def __init__(self):
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        self.reading = asyncio.Event()
+
+    async def receive_json(self):
+        if self.inbound.empty():
+            self.reading.set()
+        message = await self.inbound.get()
+        self.reading.clear()
+        if message is None:
+            raise WebSocketDisconnect(code=1000)
+        return message
+
+    async def send_json(self, message):
+        self.outbound.put_nowait((message["type"], message["payload"]))
+
+    async def deliver(self, *messages):
+        self.reading.clear()
+        for message in messages:
+            self.inbound.put_nowait(message)
+        await asyncio.wait_for(self.reading.wait(), WAIT_SECONDS)
+
+    async def next_frame(self):
+        return await asyncio.wait_for(self.outbound.get(), WAIT_SECONDS)
+
+
+def answer(text):
+    return {"type": "answer", "payload": {"text": text}}
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    orchestrator = GatedOrchestrator()
+    monkeypatch.setattr(websocket_routes, "orchestrator", orchestrator)
+    return orchestrator
+
+
+def run(scenario, **kwargs):
+    """
+    Runs scenario(websocket, connection) against a live connection, then
+    disconnects and waits for the connection to wind down.
+    """
+    async def main():
+        websocket = ScriptedWebSocket()
+        connection = InterviewConnection(websocket, "ws-1", **kwargs)
+        task = asyncio.create_task(connection.run())
+        await scenario(websocket, connection)
+        websocket.inbound.put_nowait(None)
+        try:
+            await asyncio.wait_for(task, WAIT_SECONDS)
+        except WebSocketDisconnect:
+            pass
+        return websocket
+
+    return asyncio.run(main())
+
+
+def queued(connection) -> list:
+    return list(connection.answers._queue)
+
+
+async def started(orchestrator) -> str:
+    return await asyncio.wait_for(orchestrator.started.get(), WAIT_SECONDS)
+
+
+async def until(condition):
+    # yields to the connection's tasks until it holds; no wall-clock wait
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_ping_is_answered_while_a_turn_runs(orchestrator):
+    async def scenario(websocket, connection):
+        await websocket.deliver(answer("first"))
+        assert await started(orchestrator) == "first"
+
+        await websocket.deliver({"type": "ping", "payload": {"id": 7}})
+        # the turn is still held; the pong did not wait for it
+        assert await websocket.next_frame() == ("pong", {"id": 7})
+        assert websocket.outbound.empty()
+
+        orchestrator.release()
+        assert (await websocket.next_frame())[0] == "question"
+
+    run(scenario)
+
+
+def test_overflow_is_rejected(orchestrator):
+    async def scenario(websocket, connection):
+        await websocket.deliver(answer("one"))
+        assert await started(orchestrator) == "one"
+
+        await websocket.deliver(answer("two"), answer("three"))
+        assert queued(connection) == ["two"]
+        assert await websocket.next_frame() == (
+            "error", {"message": "Previous answer is still being processed", "code": "queue_full"}
+        )
+
+        orchestrator.release()
+        assert (await websocket.next_frame())[0] == "question"
+        assert await started(orchestrator) == "two"
+        orchestrator.release()
+        assert (await websocket.next_frame())[0] == "question"
+
+    run(scenario, queue_size=1, overflow_policy="reject")
+    assert orchestrator.answers == ["one", "two"]
+
+
+def test_overflow_is_coalesced(orchestrator):
+    async def scenario(websocket, connection):
+        await websocket.deliver(answer("one"))
+        assert await started(orchestrator) == "one"
+
+        await websocket.deliver(answer("two"), answer("three"))
+        assert queued(connection) == ["two three"]
+        assert websocket.outbound.empty()
+
+        orchestrator.release()
+        assert await started(orchestrator) == "two three"
+        orchestrator.release()
+
+    run(scenario, queue_size=1, overflow_policy="coalesce")
+    assert orchestrator.answers == ["one", "two three"]
+
+
+def test_disconnect_lets_the_running_turn_finish(orchestrator):
+    async def scenario(websocket, connection):
+        await websocket.deliver(answer("one"))
+        assert await started(orchestrator) == "one"
+        await websocket.deliver(answer("two"))
+        assert queued(connection) == ["two"]
+
+        websocket.inbound.put_nowait(None)
+        # "two" is dropped and the worker told to stop after "one"
+        await asyncio.wait_for(until(lambda: queued(connection) == [None]), WAIT_SECONDS)
+        orchestrator.release()
+
+    websocket = run(scenario)
+
+    assert orchestrator.answers == ["one"]
+    # the finished turn sent nothing to the departed client
+    assert websocket.outbound.empty()
@@ -0,0 +1,114 @@
+# app/tests/test_websocket_streaming.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from app.api import websocket_routes
+
+SESSION_ID = "ws-stream"
+QUESTION = "What is the difference between a list and a tuple?"
+ANSWER = {"type": "answer", "payload": {"text": "A list is an ordered collection."}}
+
+
+class StreamingOrchestrator:
+    """
+    Streams QUESTION word by word; with fail_after set, the turn raises
+    after that many deltas.
+    """
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+
+    async def ahas_session(self, session_id: str) -> bool:
+        return session_id == SESSION_ID
+
+    async def aget_session(self, session_id: str):
+        # no stored state: nothing to archive on close
+        return None
+
+    async def arun_step(self, candidate_id, candidate_answer, on_question_delta=None):
+        for sent, word in enumerate(QUESTION.split(" ")):
+            if sent == self.fail_after:
+                raise RuntimeError("connection reset")
+            if on_question_delta is not None:
+                await on_question_delta(word + " ")
+        return {"interview_status": "ongoing", "next_question": QUESTION, "interview_round": 2}
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(websocket_routes.router)
+    return TestClient(app)
+
+
+def frames_until(ws, *last_types) -> list:
+    frames = []
+    while not frames or frames[-1]["type"] not in last_types:
+        frames.append(ws.receive_json())
+    return frames
+
+
+def answer_turn(client, query: str = "") -> list:
+    with client.websocket_connect(f"/ws/interview/{SESSION_ID}{query}") as ws:
+        assert ws.receive_json()["type"] == "info"
+        ws.send_json(ANSWER)
+        return frames_until(ws, "question")
+
+
+def test_deltas_precede_the_final_question(client, monkeypatch):
+    monkeypatch.setattr(websocket_routes, "orchestrator", StreamingOrchestrator())
+    frames = answer_turn(client)
+
+    types = [frame["type"] for frame in frames]
+    assert len(types) > 2
+    assert types == ["question_delta"] * (len(types) - 1) + ["question"]
+
+    streamed = "".join(frame["payload"]["text"] for frame in frames[:-1])
+    assert streamed.strip() == frames[-1]["payload"]["text"]
+
+
+def test_stream_false_sends_no_deltas(client, monkeypatch):
+    monkeypatch.setattr(websocket_routes, "orchestrator", StreamingOrchestrator())
+    frames = answer_turn(client, "?stream=false")
+
+    assert [frame["type"] for frame in frames] == ["question"]
+    assert frames[0]["payload"]["text"] == QUESTION
+
+
+class RecordingWebSocket:
+    """
+    Sends the given messages, then disconnects; keeps every frame sent.
+    """
+
+    def __init__(self, *messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        if not self.messages:
+            raise WebSocketDisconnect()
+        return self.messages.pop(0)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def test_failed_turn_resets_the_streamed_question(monkeypatch):
+    monkeypatch.setattr(websocket_routes, "orchestrator", StreamingOrchestrator(fail_after=2))
+    websocket = RecordingWebSocket(ANSWER)
+
+    asyncio.run(websocket_routes.interview_websocket(websocket, SESSION_ID))
+
+    assert [frame["type"] for frame in websocket.sent] == [
+        "info", "question_delta", "question_delta", "question_reset", "error"
+    ]
+    assert websocket.sent[-1]["payload"]["code"] == "turn_failed"
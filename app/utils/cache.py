@@ -0,0 +1,109 @@
+#cache.py
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def normalize_text(text: str) -> str:
+    # case and whitespace do not change what a question/answer means
+    return " ".join(str(text).lower().split())
+
+
+def content_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU map with hit/miss counters.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class SQLiteKVStore:
+    """
+    Minimal persistent key -> bytes table, used as a second cache tier.
+    With maxrows set, only the maxrows most recently added keys are kept.
+    Rowids grow by one per new key and an upsert keeps a key's rowid, so
+    each put can trim the oldest with a range delete, without counting.
+    """
+
+    def __init__(self, path: str, table: str, maxrows: Optional[int] = None):
+        self.table = table
+        self.maxrows = maxrows
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, value: bytes):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO {self.table} (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+            if self.maxrows is not None:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE rowid <= "
+                    f"(SELECT MAX(rowid) FROM {self.table}) - ?",
+                    (self.maxrows,)
+                )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
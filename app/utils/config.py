@@ -0,0 +1,154 @@
+#config.py
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value.strip().lower() if value not in (None, "") else default
+
+
+# embedding requests from all sessions are encoded together: a batch closes
+# when it reaches EMBEDDING_BATCH_SIZE or after EMBEDDING_MAX_WAIT_MS
+EMBEDDING_BATCH_SIZE = env_int("EMBEDDING_BATCH_SIZE", 32)
+EMBEDDING_MAX_WAIT_MS = env_float("EMBEDDING_MAX_WAIT_MS", 2.0)
+
+# LRU cache of embeddings by normalized text; set EMBEDDING_CACHE_PATH to a
+# SQLite file to keep it across restarts. The file keeps the
+# EMBEDDING_CACHE_DISK_SIZE most recently added embeddings (about 1.5 KiB
+# each at 384 dimensions); 0 leaves it unbounded
+EMBEDDING_CACHE_SIZE = env_int("EMBEDDING_CACHE_SIZE", 10000)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH") or None
+EMBEDDING_CACHE_DISK_SIZE = env_int("EMBEDDING_CACHE_DISK_SIZE", 200000)
+
+# evaluations of an exact (normalized) question/answer pair, reused instead of
+# calling the model again; EVALUATION_CACHE_PATH adds a SQLite tier
+EVALUATION_CACHE_SIZE = env_int("EVALUATION_CACHE_SIZE", 50000)
+EVALUATION_CACHE_PATH = os.getenv("EVALUATION_CACHE_PATH") or None
+
+# reuse the evaluation of a paraphrased pair: both the question and the answer
+# embedding must be within EVALUATION_SEMANTIC_THRESHOLD cosine similarity of
+# a cached pair. A sample of hits is re-evaluated by the model to count
+# false hits
+EVALUATION_SEMANTIC_CACHE = env_bool("EVALUATION_SEMANTIC_CACHE", False)
+EVALUATION_SEMANTIC_THRESHOLD = env_float("EVALUATION_SEMANTIC_THRESHOLD", 0.95)
+EVALUATION_SEMANTIC_CACHE_SIZE = env_int("EVALUATION_SEMANTIC_CACHE_SIZE", 20000)
+EVALUATION_SEMANTIC_AUDIT_RATE = env_float("EVALUATION_SEMANTIC_AUDIT_RATE", 0.02)
+
+# global budget for stored interactions across all sessions; the least
+# recently used sessions are evicted beyond it
+MEMORY_MAX_INTERACTIONS = env_int("MEMORY_MAX_INTERACTIONS", 50000)
+
+# where interview states live between turns: "memory" (single worker),
+# "sqlite" (SESSION_STORE_URL is the file path) or "redis" (a redis:// URL)
+SESSION_STORE = env_str("SESSION_STORE", "memory")
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL") or None
+
+# graph checkpoints for resuming a failed turn from its last completed
+# node: "memory" (same worker only), "sqlite" (GRAPH_CHECKPOINT_PATH, needs
+# langgraph-checkpoint-sqlite) or "none"
+GRAPH_CHECKPOINTER = env_str("GRAPH_CHECKPOINTER", "memory")
+GRAPH_CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_PATH") or None
+
+# session lifecycle: ongoing sessions idle longer than SESSION_IDLE_TTL and
+# ended ones idle longer than SESSION_ENDED_TTL (seconds) are archived to a
+# compact summary by a sweeper running every SESSION_SWEEP_INTERVAL; beyond
+# SESSION_MAX_ACTIVE live sessions the least recently updated go first. The
+# session store keeps the last SESSION_ARCHIVE_SIZE summaries. With a shared
+# store each worker sweeps the sessions it saved last (and caps those);
+# another worker's sessions only after SESSION_ORPHAN_TTL, should that
+# worker be gone
+SESSION_IDLE_TTL = env_float("SESSION_IDLE_TTL", 1800.0)
+SESSION_ENDED_TTL = env_float("SESSION_ENDED_TTL", 300.0)
+SESSION_ORPHAN_TTL = env_float("SESSION_ORPHAN_TTL", 2 * SESSION_IDLE_TTL)
+SESSION_MAX_ACTIVE = env_int("SESSION_MAX_ACTIVE", 10000)
+SESSION_SWEEP_INTERVAL = env_float("SESSION_SWEEP_INTERVAL", 60.0)
+SESSION_ARCHIVE_SIZE = env_int("SESSION_ARCHIVE_SIZE", 100000)
+
+# interview memory index: "flat" (exact), "hnsw" or "ivfpq". ANN indexes are
+# built in the background once a session index reaches the threshold
+VECTOR_INDEX_BACKEND = env_str("VECTOR_INDEX_BACKEND", "flat")
+VECTOR_INDEX_REBUILD_THRESHOLD = env_int("VECTOR_INDEX_REBUILD_THRESHOLD", 10000)
+VECTOR_INDEX_HNSW_M = env_int("VECTOR_INDEX_HNSW_M", 32)
+VECTOR_INDEX_NPROBE = env_int("VECTOR_INDEX_NPROBE", 8)
+VECTOR_INDEX_PQ_M = env_int("VECTOR_INDEX_PQ_M", 48)
+
+# directory the memory store is saved to on shutdown and loaded from on
+# startup (unset: memory is not persisted)
+MEMORY_STORE_DIR = os.getenv("MEMORY_STORE_DIR") or None
+
+# decision engine: "rules" (local only), "llm" (always call the model) or
+# "hybrid" (rules first, model only when the evaluation signals conflict)
+DECISION_MODE = env_str("DECISION_MODE", "rules")
+DECISION_LOW_SCORE = env_float("DECISION_LOW_SCORE", 0.5)
+DECISION_HIGH_SCORE = env_float("DECISION_HIGH_SCORE", 0.8)
+DECISION_LOW_CONFIDENCE = env_float("DECISION_LOW_CONFIDENCE", 0.4)
+
+# answer evaluation: "separate" (evaluation call, then the decision call if
+# DECISION_MODE needs the model) or "merged" (one call returning both; the
+# decision is used wherever DECISION_MODE would have asked the model). With
+# DECISION_MODE=rules merged behaves like separate: no model decision is used
+EVALUATION_MODE = env_str("EVALUATION_MODE", "separate")
+
+# generate follow-up and next-topic questions in parallel with the evaluation
+SPECULATIVE_QUESTIONS = env_bool("SPECULATIVE_QUESTIONS", False)
+SPECULATION_MAX_WORKERS = env_int("SPECULATION_MAX_WORKERS", 8)
+
+# build LLM clients, the graph and the embedder on FastAPI startup instead of
+# on the first interview turn
+WARMUP_ON_STARTUP = env_bool("WARMUP_ON_STARTUP", False)
+
+# websocket backpressure: answers received while a turn is running wait in
+# a per-connection queue of WS_QUEUE_SIZE; when it is full a new answer is
+# rejected with an error frame ("reject") or merged into the queued ones
+# ("coalesce")
+WS_QUEUE_SIZE = env_int("WS_QUEUE_SIZE", 1)
+WS_OVERFLOW_POLICY = env_str("WS_OVERFLOW_POLICY", "reject")
+
+# shared LLM client: pooled connections, concurrency caps (in-flight calls,
+# over all models and per model), per-call timeout and retries with
+# jittered backoff on rate limits, timeouts and 5xx
+LLM_MAX_CONNECTIONS = env_int("LLM_MAX_CONNECTIONS", 64)
+LLM_MAX_KEEPALIVE_CONNECTIONS = env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 32)
+LLM_MAX_CONCURRENCY = env_int("LLM_MAX_CONCURRENCY", 64)
+LLM_MODEL_MAX_CONCURRENCY = env_int("LLM_MODEL_MAX_CONCURRENCY", 32)
+LLM_TIMEOUT = env_float("LLM_TIMEOUT", 30.0)
+LLM_MAX_RETRIES = env_int("LLM_MAX_RETRIES", 4)
+LLM_RETRY_BASE_DELAY = env_float("LLM_RETRY_BASE_DELAY", 0.5)
+LLM_RETRY_MAX_DELAY = env_float("LLM_RETRY_MAX_DELAY", 20.0)
+
+# pre-generated questions served for the first question and on topic
+# switches (see app/services/question_bank.py); set QUESTION_BANK_PATH= to
+# generate every question with the model
+QUESTION_BANK_PATH = os.getenv(
+    "QUESTION_BANK_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "question_bank.json")
+)
+QUESTION_BANK_DEDUP_THRESHOLD = env_float("QUESTION_BANK_DEDUP_THRESHOLD", 0.9)
+
+# question prompt context: the last QUESTION_CONTEXT_WINDOW questions verbatim,
+# a one-line digest of earlier ones and up to QUESTION_CONTEXT_TOP_K relevant
+# earlier answers from memory, trimmed to QUESTION_CONTEXT_TOKEN_BUDGET
+# (estimated) tokens
+QUESTION_CONTEXT_WINDOW = env_int("QUESTION_CONTEXT_WINDOW", 3)
+QUESTION_CONTEXT_TOP_K = env_int("QUESTION_CONTEXT_TOP_K", 2)
+QUESTION_CONTEXT_TOKEN_BUDGET = env_int("QUESTION_CONTEXT_TOKEN_BUDGET", 400)
@@ -0,0 +1,18 @@
+#logger.py
+import logging
+import os
+
+_configured = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    global _configured
+
+    if not _configured:
+        logging.basicConfig(
+            level=os.getenv("LOG_LEVEL", "INFO").upper(),
+            format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+        )
+        _configured = True
+
+    return logging.getLogger(name)
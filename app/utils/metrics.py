@@ -0,0 +1,259 @@
+#metrics.py
+"""
+In-process metrics: counters, gauges and latency histograms, exported in
+the Prometheus text format at /metrics.
+
+Ad-hoc names used across the app ("speculation.wasted", "decision.rules")
+go through increment / set_gauge / timed and are exported under the
+interview_ prefix with dots turned into underscores.
+"""
+import functools
+import inspect
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# seconds; covers local rule evaluation up to slow LLM completions
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_registry_lock = threading.Lock()
+_families: Dict[str, "_MetricFamily"] = {}
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def prometheus_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+
+
+class _MetricFamily(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """sample lines, without the HELP / TYPE header"""
+        ...
+
+
+class Counter(_MetricFamily):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_MetricFamily):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_MetricFamily):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., sum, count]
+        self._series: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> dict:
+        series = self._series.get(_label_key(labels))
+        if not series:
+            return {"count": 0, "mean_ms": 0.0}
+        return {
+            "count": series[-1],
+            "mean_ms": round(series[-2] / series[-1] * 1000, 3)
+        }
+
+    def _samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, series in self._series.items():
+                for bound, count in zip(self.buckets, series):
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(key, [('le', repr(float(bound)))])} {count}"
+                    )
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+def _register(family_cls, name: str, documentation: str, **kwargs):
+    with _registry_lock:
+        family = _families.get(name)
+        if family is None:
+            family = _families[name] = family_cls(name, documentation, **kwargs)
+        return family
+
+
+def counter(name: str, documentation: str) -> Counter:
+    return _register(Counter, name, documentation)
+
+
+def gauge(name: str, documentation: str) -> Gauge:
+    return _register(Gauge, name, documentation)
+
+
+def histogram(name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, buckets=buckets)
+
+
+# well-known series
+NODE_SECONDS = histogram(
+    "interview_node_duration_seconds", "Time spent in each interview graph node."
+)
+TURN_SECONDS = histogram(
+    "interview_turn_duration_seconds", "Whole interview turn latency (run_step / arun_step)."
+)
+LLM_CALL_SECONDS = histogram(
+    "interview_llm_call_duration_seconds", "Latency of a single LLM call."
+)
+LLM_TOKENS = counter(
+    "interview_llm_tokens_total", "Tokens used by LLM calls, by type (prompt/completion)."
+)
+LLM_RETRIES = counter(
+    "interview_llm_retries_total", "Retried LLM calls, by model and reason."
+)
+EMBEDDING_SECONDS = histogram(
+    "interview_embedding_batch_duration_seconds", "Time to encode one embedding batch."
+)
+OPERATION_SECONDS = histogram(
+    "interview_operation_duration_seconds", "Latency of named operations (see timed())."
+)
+
+
+# ad-hoc helpers
+def increment(name: str, amount: int = 1):
+    counter(f"interview_{prometheus_name(name)}_total", name).inc(amount)
+
+
+def counter_value(name: str) -> float:
+    return counter(f"interview_{prometheus_name(name)}_total", name).value()
+
+
+def set_gauge(name: str, value: float):
+    gauge(f"interview_{prometheus_name(name)}", name).set(value)
+
+
+@contextmanager
+def timed(name: str):
+    with OPERATION_SECONDS.time(operation=name):
+        yield
+
+
+def timed_node(name: str):
+    """
+    Decorator recording a graph node's run time in NODE_SECONDS. Works for
+    sync and async nodes and keeps the signature LangGraph inspects.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with NODE_SECONDS.time(node=name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with NODE_SECONDS.time(node=name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def latency_snapshot() -> dict:
+    return {
+        dict(key)["operation"]: OPERATION_SECONDS.snapshot(**dict(key))
+        for key in list(OPERATION_SECONDS._series)
+    }
+
+
+def render_prometheus() -> str:
+    with _registry_lock:
+        families = list(_families.values())
+
+    lines = []
+    for family in families:
+        lines.extend(family.render())
+    return "\n".join(lines) + "\n"